@@ -1,24 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import select, update
+from typing import List, Optional, Dict, Any, Callable
+import asyncio
 import os
+import time
+import uuid
 
-from app.core.database import get_db, AsyncSessionLocal
+from app.core.database import get_db, get_read_db, AsyncSessionLocal
+from app.core.pagination import paginate, set_next_cursor
 from app.models.animation import Animation, AnimationStatus
 from app.models.explanation import Explanation
-from app.schemas.animation import AnimationCreate, AnimationResponse
-from app.services.animation_service import AnimationService
+from app.schemas.animation import AnimationCreate, AnimationResponse, AnimationSection
+from app.services.animation_service import AnimationService, upgrade_qualities
+from app.services.process_limits import RenderLimitExceeded
+from app.services.llm_pool import LLMClientPool, get_llm_pool
+from app.services.job_queue import job_queue, PRIORITY_BACKGROUND, PRIORITY_UPGRADE
+from app.services.file_delivery import Artifact, artifact_cache
+from app.services.artifact_gc import touch_artifact
+from app.services.storage import get_storage, STORAGE_LOCAL
+from app.services.events import publish_session_event
+from app.core.config import settings
+from app.models.job import JobKind
 
 router = APIRouter()
 
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
 
 @router.post("/", response_model=AnimationResponse, status_code=status.HTTP_201_CREATED)
 async def create_animation(
     animation_data: AnimationCreate,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    llm_pool: LLMClientPool = Depends(get_llm_pool)
 ):
     query = select(Explanation).where(Explanation.id == animation_data.explanation_id)
     result = await db.execute(query)
@@ -36,33 +54,42 @@ async def create_animation(
         description=animation_data.description,
         animation_type=animation_data.animation_type,
         status=AnimationStatus.PENDING,
-        metadata=animation_data.metadata or {}
+        animation_metadata=animation_data.metadata or {}
     )
     
     db.add(animation)
+    
+    if settings.JOB_QUEUE_ENABLED:
+        await db.flush()
+        await job_queue.enqueue(db, JobKind.ANIMATION, animation.id, priority=PRIORITY_BACKGROUND)
+    
     await db.commit()
-    await db.refresh(animation)
+    await publish_animation(db, animation, explanation.session_id)
     
-    background_tasks.add_task(generate_animation, animation.id)
+    if not settings.JOB_QUEUE_ENABLED:
+        background_tasks.add_task(generate_animation, animation.id, llm_pool)
     
     return animation
 
 
 @router.get("/", response_model=List[AnimationResponse])
 async def get_animations(
+    response: Response,
     explanation_id: int = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Animation)
     
     if explanation_id:
         query = query.where(Animation.explanation_id == explanation_id)
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, Animation, cursor, skip, limit)
     result = await db.execute(query)
     animations = result.scalars().all()
+    set_next_cursor(response, animations, limit)
     
     return animations
 
@@ -70,7 +97,7 @@ async def get_animations(
 @router.get("/{animation_id}", response_model=AnimationResponse)
 async def get_animation(
     animation_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Animation).where(Animation.id == animation_id)
     result = await db.execute(query)
@@ -88,36 +115,208 @@ async def get_animation(
 @router.get("/{animation_id}/file")
 async def get_animation_file(
     animation_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    quality: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Animation).where(Animation.id == animation_id)
-    result = await db.execute(query)
-    animation = result.scalar_one_or_none()
-    
-    if not animation:
+    preview = settings.RENDER_PREVIEW_QUALITY
+    quality = quality or preview
+    if quality != preview and quality not in upgrade_qualities():
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Animation not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported quality; available: {', '.join([preview, *upgrade_qualities()])}"
         )
     
-    if not animation.file_path or not os.path.exists(animation.file_path):
+    served = quality
+    artifact = artifact_cache.get(animation_id, f"file/{quality}")
+    if artifact is None:
+        animation = await _get_completed_animation(db, animation_id)
+        metadata = animation.animation_metadata or {}
+        variants = metadata.get("variants", {})
+        
+        if settings.RENDER_UPGRADE_POLICY == "on_demand":
+            # Playing the preview asks for the first upgrade; asking for a tier asks for that tier
+            wanted = [quality] if quality != preview else upgrade_qualities()[:1]
+            if any(upgrade_due(variants.get(wanted_quality), time.time()) for wanted_quality in wanted):
+                background_tasks.add_task(request_upgrades, animation_id, wanted)
+        
+        variant = variants.get(quality, {})
+        if quality != preview and variant.get("status") != "ready":
+            # Not rendered yet: play the preview in the meantime
+            served = preview
+        
+        artifact = artifact_cache.get(animation_id, f"file/{served}")
+        if artifact is None:
+            if served == preview:
+                path, media, storage = animation.file_path, metadata.get("media", {}), metadata.get("storage")
+            else:
+                path, media, storage = variant.get("file_path"), variant.get("media", {}), variant.get("storage")
+            try:
+                artifact = await get_storage(storage or STORAGE_LOCAL).open_artifact(
+                    path or "",
+                    "video/mp4",
+                    f"animation_{animation_id}.mp4" if served == preview else f"animation_{animation_id}_{served}.mp4",
+                    sha256=media.get("sha256")
+                )
+            except FileNotFoundError:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Animation file not found"
+                )
+            artifact_cache.put(animation_id, f"file/{served}", artifact)
+    
+    _touch(animation_id, f"file/{served}", artifact, "Animation file not found")
+    response = await get_storage(artifact.storage).response(request, artifact)
+    response.headers["X-Animation-Quality"] = served
+    return response
+
+
+@router.get("/{animation_id}/thumbnail")
+async def get_animation_thumbnail(
+    animation_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    artifact = artifact_cache.get(animation_id, "thumbnail")
+    if artifact is None:
+        animation = await _get_completed_animation(db, animation_id)
+        storage = (animation.animation_metadata or {}).get("storage") or STORAGE_LOCAL
+        try:
+            artifact = await get_storage(storage).open_artifact(
+                animation.thumbnail_path or "",
+                "image/png",
+                f"thumbnail_{animation_id}.png"
+            )
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Animation thumbnail not found"
+            )
+        artifact_cache.put(animation_id, "thumbnail", artifact)
+    
+    _touch(animation_id, "thumbnail", artifact, "Animation thumbnail not found")
+    return await get_storage(artifact.storage).response(request, artifact)
+
+
+@router.get("/{animation_id}/hls/{name:path}")
+async def get_animation_hls(
+    animation_id: int,
+    name: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    artifact = artifact_cache.get(animation_id, f"hls/{name}")
+    if artifact is None:
+        media_type = HLS_MEDIA_TYPES.get(os.path.splitext(name)[1])
+        if media_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="HLS file not found"
+            )
+        
+        animation = await _get_completed_animation(db, animation_id)
+        hls = (animation.animation_metadata or {}).get("hls")
+        if not hls:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Animation has no HLS output"
+            )
+        
+        # Reject anything that escapes the animation's HLS directory
+        hls_dir = os.path.realpath(hls["dir"])
+        path = os.path.realpath(os.path.join(hls_dir, name))
+        if os.path.commonpath([hls_dir, path]) != hls_dir:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="HLS file not found"
+            )
+        
+        storage = (animation.animation_metadata or {}).get("storage") or STORAGE_LOCAL
+        try:
+            artifact = await get_storage(storage).open_artifact(path, media_type, os.path.basename(path))
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="HLS file not found"
+            )
+        artifact_cache.put(animation_id, f"hls/{name}", artifact)
+    
+    _touch(animation_id, f"hls/{name}", artifact, "HLS file not found")
+    try:
+        return await get_storage(artifact.storage).response(request, artifact)
+    except FileNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Animation file not found"
+            detail="HLS file not found"
         )
+
+
+@router.get("/{animation_id}/sections", response_model=List[AnimationSection])
+async def get_animation_sections(
+    animation_id: int,
+    db: AsyncSession = Depends(get_read_db)
+):
+    animation = await _get_animation(db, animation_id)
+    sections = (animation.animation_metadata or {}).get("sections", [])
     
-    return FileResponse(
-        animation.file_path,
-        media_type="video/mp4",
-        filename=f"animation_{animation_id}.mp4"
-    )
+    return [
+        AnimationSection(
+            index=section["index"],
+            status=section["status"],
+            duration=section.get("duration"),
+            url=f"{settings.API_V1_STR}/animations/{animation_id}/sections/{section['index']}"
+            if section["status"] == "ready" else None
+        )
+        for section in sections
+    ]
 
 
-@router.get("/{animation_id}/thumbnail")
-async def get_animation_thumbnail(
+@router.get("/{animation_id}/sections/{index}")
+async def get_animation_section(
     animation_id: int,
-    db: AsyncSession = Depends(get_db)
+    index: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
 ):
+    artifact = artifact_cache.get(animation_id, f"section/{index}")
+    if artifact is None:
+        # Sections are served while the rest of the animation is still rendering
+        animation = await _get_animation(db, animation_id)
+        sections = (animation.animation_metadata or {}).get("sections", [])
+        section = next((s for s in sections if s["index"] == index and s["status"] == "ready"), None)
+        
+        try:
+            artifact = await get_storage((section or {}).get("storage") or STORAGE_LOCAL).open_artifact(
+                section["path"] if section else "",
+                "video/mp4",
+                f"animation_{animation_id}_section_{index}.mp4"
+            )
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Animation section not found"
+            )
+        artifact_cache.put(animation_id, f"section/{index}", artifact)
+    
+    _touch(animation_id, f"section/{index}", artifact, "Animation section not found")
+    return await get_storage(artifact.storage).response(request, artifact)
+
+
+def _touch(animation_id: int, kind: str, artifact: Artifact, detail: str):
+    """Mark the artifact as recently used for the garbage collector's LRU eviction."""
+    try:
+        touch_artifact(artifact)
+    except FileNotFoundError:
+        # Collected since it was cached (possibly by another process)
+        artifact_cache.discard(animation_id, kind)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail
+        )
+
+
+async def _get_animation(db: AsyncSession, animation_id: int) -> Animation:
     query = select(Animation).where(Animation.id == animation_id)
     result = await db.execute(query)
     animation = result.scalar_one_or_none()
@@ -128,47 +327,296 @@ async def get_animation_thumbnail(
             detail="Animation not found"
         )
     
-    if not animation.thumbnail_path or not os.path.exists(animation.thumbnail_path):
+    return animation
+
+
+async def _get_completed_animation(db: AsyncSession, animation_id: int) -> Animation:
+    animation = await _get_animation(db, animation_id)
+    
+    if animation.status != AnimationStatus.COMPLETED:
+        # Artifacts are only immutable (and cacheable) once the render has finished
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Animation thumbnail not found"
+            detail="Animation file not found"
+        )
+    if (animation.animation_metadata or {}).get("evicted_at"):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Animation files were removed to free disk space"
         )
     
-    return FileResponse(
-        animation.thumbnail_path,
-        media_type="image/png",
-        filename=f"thumbnail_{animation_id}.png"
+    return animation
+
+
+async def publish_animation(db: AsyncSession, animation: Animation, session_id: int):
+    """Refresh server-side timestamps and push the animation to its session's event stream."""
+    await db.refresh(animation)
+    await publish_session_event(
+        session_id,
+        "animation",
+        AnimationResponse.model_validate(animation).model_dump(mode="json")
     )
 
 
-async def generate_animation(animation_id: int):
+async def generate_animation(
+    animation_id: int,
+    llm_pool: Optional[LLMClientPool] = None,
+    priority: int = PRIORITY_BACKGROUND,
+    final_attempt: bool = True
+) -> Optional[str]:
+    """Generate and render the animation; returns the error when that failed.
+
+    Unless this is the ``final_attempt`` a failed animation goes back to pending, since
+    the job queue will run it again.
+    """
+    error = None
     async with AsyncSessionLocal() as db:
-        query = select(Animation).where(Animation.id == animation_id)
+        query = select(Animation, Explanation.session_id).join(Explanation).where(Animation.id == animation_id)
         result = await db.execute(query)
-        animation = result.scalar_one_or_none()
+        row = result.one_or_none()
         
-        if not animation:
-            return
+        if not row:
+            return None
         
+        animation, session_id = row
         animation.status = AnimationStatus.GENERATING
         await db.commit()
+        await publish_animation(db, animation, session_id)
+        
+        async def publish_sections(sections):
+            # Copy so the JSON column sees a changed value on every update
+            animation.animation_metadata = {
+                **(animation.animation_metadata or {}),
+                "sections": [dict(section) for section in sections]
+            }
+            await db.commit()
+            await publish_animation(db, animation, session_id)
         
         try:
-            async with AnimationService() as animation_service:
-                file_path, thumbnail_path, manim_code, duration = await animation_service.generate_animation(
-                    animation.title,
-                    animation.description,
-                    animation.animation_type
-                )
+            async with AnimationService(llm_pool or get_llm_pool()) as animation_service:
+                if animation.manim_code:
+                    # The scene was produced up front (e.g. by the fused explanation pipeline)
+                    file_path, thumbnail_path, manim_code, duration, render_metadata = await animation_service.render_animation(
+                        animation.manim_code,
+                        animation.title,
+                        on_section=publish_sections,
+                        priority=priority
+                    )
+                else:
+                    file_path, thumbnail_path, manim_code, duration, render_metadata = await animation_service.generate_animation(
+                        animation.title,
+                        animation.description,
+                        animation.animation_type,
+                        on_section=publish_sections,
+                        priority=priority
+                    )
             
             animation.file_path = file_path
             animation.thumbnail_path = thumbnail_path
             animation.manim_code = manim_code
             animation.duration = duration
+            animation.animation_metadata = {**(animation.animation_metadata or {}), **render_metadata}
             animation.status = AnimationStatus.COMPLETED
             
         except Exception as e:
-            animation.status = AnimationStatus.FAILED
-            animation.metadata = {"error": str(e)}
+            error = str(e)
+            animation.status = AnimationStatus.FAILED if final_attempt else AnimationStatus.PENDING
+            animation.animation_metadata = {**(animation.animation_metadata or {}), "error": error}
+            if isinstance(e, RenderLimitExceeded):
+                animation.animation_metadata = {**animation.animation_metadata, "render": e.report()}
+        
+        await db.commit()
+        await publish_animation(db, animation, session_id)
+    
+    if animation.status == AnimationStatus.COMPLETED and settings.RENDER_UPGRADE_POLICY == "eager":
+        await request_upgrades(animation_id, upgrade_qualities(), llm_pool)
+    return error
+
+
+async def _update_variants(
+    db: AsyncSession,
+    animation_id: int,
+    change: Callable[[Dict[str, Any], AnimationStatus], Optional[Dict[str, Any]]]
+) -> Optional[Dict[str, Any]]:
+    """Merge ``change(variants, status)`` into the animation's variants with a compare-and-set.
+
+    ``variants_revision`` in the metadata is bumped on every write and checked by the
+    UPDATE, so concurrent requests cannot both claim a tier: the loser re-reads and
+    re-decides. ``change`` returns the tiers to write, or None to leave the row alone.
+    Returns what was written; the caller commits.
+    """
+    revision_column = Animation.animation_metadata["variants_revision"].as_integer()
+    while True:
+        result = await db.execute(
+            select(Animation.animation_metadata, Animation.status).where(Animation.id == animation_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        
+        metadata = row.animation_metadata or {}
+        variants = metadata.get("variants", {})
+        changes = change(variants, row.status)
+        if not changes:
+            return None
+        
+        revision = metadata.get("variants_revision")
+        result = await db.execute(
+            update(Animation)
+            .where(Animation.id == animation_id, revision_column.is_(None) if revision is None else revision_column == revision)
+            .values(animation_metadata={
+                **metadata,
+                "variants": {**variants, **changes},
+                "variants_revision": (revision or 0) + 1
+            })
+        )
+        if result.rowcount == 1:
+            return changes
+        await db.rollback()
+
+
+def upgrade_due(variant: Optional[Dict[str, Any]], now: float) -> bool:
+    """Whether a quality tier should be queued (again).
+    
+    That is when it was never requested, failed with render attempts to spare, or is
+    stuck rendering because its runner died and stopped renewing the claim's lease.
+    """
+    if variant is None:
+        return True
+    if variant["status"] == "failed":
+        return variant.get("attempts", 0) < settings.JOB_MAX_ATTEMPTS
+    return variant["status"] == "rendering" and variant.get("lease_expires_at", 0) < now
+
+
+async def request_upgrades(animation_id: int, qualities: List[str], llm_pool: Optional[LLMClientPool] = None):
+    """Queue re-renders of a completed animation at the ``qualities`` that are due (see :func:`upgrade_due`).
+    
+    Each tier's state is kept under ``variants`` in the animation metadata.
+    """
+    def claim(variants: Dict[str, Any], animation_status: AnimationStatus) -> Optional[Dict[str, Any]]:
+        if animation_status != AnimationStatus.COMPLETED:
+            return None
+        now = time.time()
+        return {
+            quality: {"status": "queued", "attempts": variants.get(quality, {}).get("attempts", 0)}
+            for quality in qualities if upgrade_due(variants.get(quality), now)
+        }
+    
+    async with AsyncSessionLocal() as db:
+        if not await _update_variants(db, animation_id, claim):
+            return
+        if settings.JOB_QUEUE_ENABLED:
+            await job_queue.enqueue(db, JobKind.ANIMATION_UPGRADE, animation_id, priority=PRIORITY_UPGRADE)
+        await db.commit()
+    
+    if not settings.JOB_QUEUE_ENABLED:
+        await upgrade_animation(animation_id, llm_pool)
+
+
+def _renderable(variant: Dict[str, Any], now: float) -> bool:
+    # Queued, or abandoned by a runner whose claim's lease ran out
+    return variant["status"] == "queued" or (variant["status"] == "rendering" and variant.get("lease_expires_at", 0) < now)
+
+
+async def _renew_variant_lease(animation_id: int, quality: str, owner: str):
+    """Keep extending a tier's rendering lease for as long as ``owner`` holds it."""
+    def extend(variants: Dict[str, Any], animation_status: AnimationStatus) -> Optional[Dict[str, Any]]:
+        variant = variants.get(quality, {})
+        if variant.get("lease_owner") != owner:
+            return None
+        return {quality: {**variant, "lease_expires_at": time.time() + settings.JOB_LEASE_SECONDS}}
+    
+    async with AsyncSessionLocal() as db:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            if not await _update_variants(db, animation_id, extend):
+                return
+            await db.commit()
+
+
+async def upgrade_animation(
+    animation_id: int,
+    llm_pool: Optional[LLMClientPool] = None,
+    priority: int = PRIORITY_UPGRADE,
+    final_attempt: bool = True
+) -> Optional[str]:
+    """Render the animation's queued quality variants from its stored (already preflighted) scene.
+    
+    A runner claims a tier under a lease that it renews while rendering, so tiers left
+    behind by a dead runner are picked up again. Returns the last render error. Unless
+    this is the ``final_attempt`` a tier that failed is queued again for the job's next
+    attempt instead of being marked failed.
+    """
+    error = None
+    attempted = set()
+    async with AsyncSessionLocal() as db:
+        query = select(Animation, Explanation.session_id).join(Explanation).where(Animation.id == animation_id)
+        result = await db.execute(query)
+        row = result.one_or_none()
+        
+        if not row:
+            return None
+        
+        animation, session_id = row
         
-        await db.commit()
\ No newline at end of file
+        async def set_variant(quality: str, variant: Dict[str, Any], writable: Callable[[Dict[str, Any]], bool]) -> bool:
+            # Only write while ``writable`` accepts the tier's current state; claims count as attempts
+            def change(variants: Dict[str, Any], animation_status: AnimationStatus) -> Optional[Dict[str, Any]]:
+                current = variants.get(quality)
+                if current is None or not writable(current):
+                    return None
+                attempts = current.get("attempts", 0) + (variant["status"] == "rendering")
+                return {quality: {**variant, "attempts": attempts}}
+            
+            written = await _update_variants(db, animation_id, change)
+            await db.commit()
+            if written:
+                await publish_animation(db, animation, session_id)
+            return bool(written)
+        
+        async with AnimationService(llm_pool or get_llm_pool()) as animation_service:
+            while True:
+                await db.refresh(animation)
+                variants = (animation.animation_metadata or {}).get("variants", {})
+                quality = next(
+                    (q for q, variant in variants.items() if q not in attempted and _renderable(variant, time.time())),
+                    None
+                )
+                if quality is None or animation.status != AnimationStatus.COMPLETED:
+                    return error
+                
+                attempted.add(quality)
+                owner = uuid.uuid4().hex
+                owned = lambda variant: variant.get("lease_owner") == owner
+                claim = {"status": "rendering", "lease_owner": owner, "lease_expires_at": time.time() + settings.JOB_LEASE_SECONDS}
+                if not await set_variant(quality, claim, lambda variant: _renderable(variant, time.time())):
+                    # Another runner claimed this tier first
+                    continue
+                
+                renewal = asyncio.create_task(_renew_variant_lease(animation_id, quality, owner))
+                try:
+                    file_path, thumbnail_path, duration, render_metadata = await animation_service.render_scene(
+                        animation.manim_code, quality
+                    )
+                except Exception as e:
+                    error = str(e)
+                    variant = {"status": "failed" if final_attempt else "queued", "error": error}
+                    if isinstance(e, RenderLimitExceeded):
+                        variant["render"] = e.report()
+                    await set_variant(quality, variant, owned)
+                    continue
+                finally:
+                    renewal.cancel()
+                    await asyncio.gather(renewal, return_exceptions=True)
+                
+                # Written only while the claim is still ours; a runner that took over will report instead
+                await set_variant(quality, {
+                    "status": "ready",
+                    "file_path": file_path,
+                    "thumbnail_path": thumbnail_path,
+                    "duration": duration,
+                    "media": render_metadata.get("media", {}),
+                    "render_cache": render_metadata.get("render_cache"),
+                    "render": render_metadata.get("render"),
+                    "storage": render_metadata.get("storage")
+                }, owned)
@@ -1,23 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, func
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, Optional, AsyncIterator, Dict
+import asyncio
+import time
+import uuid
 
-from app.core.database import get_db, AsyncSessionLocal
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, AsyncSessionLocal
+from app.core.pagination import paginate, set_next_cursor
 from app.models.explanation import Explanation, ExplanationStatus
+from app.models.animation import Animation, AnimationStatus, AnimationType
 from app.models.session import Session
-from app.schemas.explanation import ExplanationCreate, ExplanationResponse
+from app.schemas.explanation import (
+    ExplanationCreate, ExplanationResponse,
+    AnimatedExplanationCreate, AnimatedExplanationResponse,
+    ExplanationBatchCreate, ExplanationBatchResponse, ExplanationBatchProgress
+)
+from app.schemas.animation import AnimationResponse
 from app.services.llm_service import LLMService
+from app.services.llm_pool import LLMClientPool, get_llm_pool
+from app.services.events import event_broker, format_sse, publish_session_event
+from app.services.job_queue import job_queue, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from app.models.job import JobKind
+from app.api.endpoints.animations import generate_animation, publish_animation
 
 router = APIRouter()
 
+# Shared by every in-process batch so concurrent batches cannot flood the LLM API
+batch_semaphore = asyncio.Semaphore(settings.EXPLANATION_BATCH_CONCURRENCY)
+
 
 @router.post("/", response_model=ExplanationResponse, status_code=status.HTTP_201_CREATED)
 async def create_explanation(
     explanation_data: ExplanationCreate,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    llm_pool: LLMClientPool = Depends(get_llm_pool)
 ):
     query = select(Session).where(Session.session_id == explanation_data.session_id)
     result = await db.execute(query)
@@ -33,38 +54,191 @@ async def create_explanation(
         session_id=session.id,
         question=explanation_data.question,
         status=ExplanationStatus.PENDING,
-        metadata=explanation_data.metadata or {}
+        explanation_metadata=explanation_data.metadata or {}
     )
     
     db.add(explanation)
+    
+    if settings.JOB_QUEUE_ENABLED:
+        await db.flush()
+        await job_queue.enqueue(db, JobKind.EXPLANATION, explanation.id, priority=PRIORITY_INTERACTIVE)
+    
     await db.commit()
-    await db.refresh(explanation)
+    await publish_explanation(db, explanation)
     
-    background_tasks.add_task(process_explanation, explanation.id)
+    if not settings.JOB_QUEUE_ENABLED:
+        background_tasks.add_task(process_explanation, explanation.id, llm_pool)
     
     return explanation
 
 
+@router.post("/animated", response_model=AnimatedExplanationResponse, status_code=status.HTTP_201_CREATED)
+async def create_animated_explanation(
+    explanation_data: AnimatedExplanationCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    llm_pool: LLMClientPool = Depends(get_llm_pool)
+):
+    """Create an explanation and its animation together, generated by a single LLM call."""
+    query = select(Session).where(Session.session_id == explanation_data.session_id)
+    result = await db.execute(query)
+    session = result.scalar_one_or_none()
+    
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    explanation = Explanation(
+        session_id=session.id,
+        question=explanation_data.question,
+        status=ExplanationStatus.PENDING,
+        explanation_metadata=explanation_data.metadata or {}
+    )
+    db.add(explanation)
+    await db.flush()
+    
+    animation = Animation(
+        explanation_id=explanation.id,
+        title=explanation_data.question,
+        animation_type=explanation_data.animation_type,
+        status=AnimationStatus.PENDING,
+        animation_metadata={}
+    )
+    db.add(animation)
+    await db.flush()
+    
+    explanation.explanation_metadata = {
+        **explanation.explanation_metadata,
+        "pipeline": "fused",
+        "animation_id": animation.id
+    }
+    
+    if settings.JOB_QUEUE_ENABLED:
+        await job_queue.enqueue(db, JobKind.EXPLANATION, explanation.id, priority=PRIORITY_INTERACTIVE)
+    
+    await db.commit()
+    await publish_explanation(db, explanation)
+    await publish_animation(db, animation, session.id)
+    
+    if not settings.JOB_QUEUE_ENABLED:
+        background_tasks.add_task(process_explanation, explanation.id, llm_pool)
+    
+    return AnimatedExplanationResponse(
+        explanation=ExplanationResponse.model_validate(explanation),
+        animation=AnimationResponse.model_validate(animation)
+    )
+
+
+@router.post("/batch", response_model=ExplanationBatchResponse, status_code=status.HTTP_201_CREATED)
+async def create_explanation_batch(
+    batch_data: ExplanationBatchCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+    llm_pool: LLMClientPool = Depends(get_llm_pool)
+):
+    if len(batch_data.questions) > settings.EXPLANATION_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.EXPLANATION_BATCH_MAX_SIZE} questions"
+        )
+    
+    query = select(Session.id).where(Session.session_id == batch_data.session_id)
+    result = await db.execute(query)
+    session_pk = result.scalar_one_or_none()
+    
+    if session_pk is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    batch_id = uuid.uuid4().hex
+    rows = [
+        {
+            "session_id": session_pk,
+            "question": question,
+            "status": ExplanationStatus.PENDING,
+            "batch_id": batch_id,
+            "explanation_metadata": {**(batch_data.metadata or {}), "batch_id": batch_id, "batch_index": index}
+        }
+        for index, question in enumerate(batch_data.questions)
+    ]
+    
+    # One multi-row INSERT ... RETURNING and one commit for the whole batch
+    result = await db.execute(
+        insert(Explanation).returning(Explanation.id, sort_by_parameter_order=True),
+        rows
+    )
+    explanation_ids = list(result.scalars().all())
+    
+    if settings.JOB_QUEUE_ENABLED:
+        await job_queue.enqueue_many(db, JobKind.EXPLANATION, explanation_ids, priority=PRIORITY_BACKGROUND)
+    
+    await db.commit()
+    
+    result = await db.execute(select(Explanation).where(Explanation.id.in_(explanation_ids)).order_by(Explanation.id))
+    for explanation in result.scalars().all():
+        await publish_session_event(
+            session_pk,
+            "explanation",
+            ExplanationResponse.model_validate(explanation).model_dump(mode="json")
+        )
+    
+    if not settings.JOB_QUEUE_ENABLED:
+        background_tasks.add_task(process_explanation_batch, explanation_ids, llm_pool)
+    
+    return ExplanationBatchResponse(batch_id=batch_id, explanation_ids=explanation_ids)
+
+
+@router.get("/batch/{batch_id}", response_model=ExplanationBatchProgress)
+async def get_explanation_batch(
+    batch_id: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    query = (
+        select(Explanation.status, func.count(Explanation.id))
+        .where(Explanation.batch_id == batch_id)
+        .group_by(Explanation.status)
+    )
+    result = await db.execute(query)
+    counts = {row_status: count for row_status, count in result.all()}
+    
+    total = sum(counts.values())
+    if total == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    
+    progress = {explanation_status.value: counts.get(explanation_status, 0) for explanation_status in ExplanationStatus}
+    return ExplanationBatchProgress(
+        batch_id=batch_id,
+        total=total,
+        done=progress["completed"] + progress["failed"] == total,
+        **progress
+    )
+
+
 @router.get("/", response_model=List[ExplanationResponse])
 async def get_explanations(
+    response: Response,
     session_id: str = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Explanation).options(selectinload(Explanation.animations))
     
     if session_id:
-        session_query = select(Session).where(Session.session_id == session_id)
-        session_result = await db.execute(session_query)
-        session = session_result.scalar_one_or_none()
-        
-        if session:
-            query = query.where(Explanation.session_id == session.id)
+        query = query.join(Session).where(Session.session_id == session_id)
     
-    query = query.offset(skip).limit(limit)
+    query = paginate(query, Explanation, cursor, skip, limit)
     result = await db.execute(query)
     explanations = result.scalars().all()
+    set_next_cursor(response, explanations, limit)
     
     return explanations
 
@@ -72,7 +246,7 @@ async def get_explanations(
 @router.get("/{explanation_id}", response_model=ExplanationResponse)
 async def get_explanation(
     explanation_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Explanation).where(Explanation.id == explanation_id).options(
         selectinload(Explanation.animations)
@@ -89,32 +263,251 @@ async def get_explanation(
     return explanation
 
 
-async def process_explanation(explanation_id: int):
+@router.get("/{explanation_id}/stream")
+async def stream_explanation(explanation_id: int):
+    # A short-lived session rather than the get_db dependency, which would stay open
+    # (idle in transaction) until the stream ends
+    async with AsyncSessionLocal() as db:
+        query = select(Explanation.id).where(Explanation.id == explanation_id)
+        result = await db.execute(query)
+        found = result.scalar_one_or_none() is not None
+    
+    if not found:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Explanation not found"
+        )
+    
+    return StreamingResponse(
+        explanation_events(explanation_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+TERMINAL_STATUSES = (ExplanationStatus.COMPLETED, ExplanationStatus.FAILED)
+
+
+def explanation_channel(explanation_id: int) -> str:
+    return f"explanation:{explanation_id}"
+
+
+async def publish_explanation(db: AsyncSession, explanation: Explanation):
+    """Refresh server-side timestamps and push the explanation to its session's event stream."""
+    await db.refresh(explanation)
+    await publish_session_event(
+        explanation.session_id,
+        "explanation",
+        ExplanationResponse.model_validate(explanation).model_dump(mode="json")
+    )
+
+
+async def _load_explanation_state(explanation_id: int):
+    async with AsyncSessionLocal() as db:
+        query = select(Explanation.explanation_text, Explanation.status).where(Explanation.id == explanation_id)
+        result = await db.execute(query)
+        row = result.one_or_none()
+    
+    if row is None:
+        return "", ExplanationStatus.FAILED
+    return row.explanation_text or "", row.status
+
+
+def _take_contiguous(pending: Dict[int, str], sent: int) -> str:
+    """Pop the buffered deltas that start at or before ``sent``; returns the text they add past it."""
+    text = ""
+    while True:
+        ready = [offset for offset in pending if offset <= sent + len(text)]
+        if not ready:
+            return text
+        for offset in sorted(ready):
+            text += pending.pop(offset)[sent + len(text) - offset:]
+
+
+async def explanation_events(explanation_id: int) -> AsyncIterator[str]:
+    """Yield SSE frames for an explanation: the text so far, then live deltas until it finishes.
+    
+    Live deltas come from the event broker. Deltas ahead of what was sent (the ones in
+    between were published before subscribing, or dropped) are buffered until the
+    database, which holds the periodically flushed text, fills the gap; it is consulted at
+    most once per ``LLM_STREAM_POLL_INTERVAL``, and on status changes.
+    """
+    async with event_broker.subscribe(explanation_channel(explanation_id)) as queue:
+        text, current_status = await _load_explanation_state(explanation_id)
+        sent = len(text)
+        if text:
+            yield format_sse("delta", {"text": text})
+        pending: Dict[int, str] = {}
+        last_sync = time.monotonic()
+        
+        while current_status not in TERMINAL_STATUSES:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.LLM_STREAM_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                message = None
+            
+            if message and message["type"] == "delta":
+                pending[message["offset"]] = message["text"]
+                new_text = _take_contiguous(pending, sent)
+                if new_text:
+                    sent += len(new_text)
+                    yield format_sse("delta", {"text": new_text})
+                if not pending or time.monotonic() - last_sync < settings.LLM_STREAM_POLL_INTERVAL:
+                    continue
+            
+            # Poll timeout, status change or a persisting gap: resynchronise from the database
+            last_sync = time.monotonic()
+            text, current_status = await _load_explanation_state(explanation_id)
+            new_text = text[sent:]
+            new_text += _take_contiguous(pending, sent + len(new_text))
+            if new_text:
+                sent += len(new_text)
+                yield format_sse("delta", {"text": new_text})
+            elif message is None:
+                yield ": keep-alive\n\n"
+        
+        yield format_sse("done", {"status": current_status.value})
+
+
+async def _stream_explanation_text(db: AsyncSession, explanation: Explanation, llm_service: LLMService, priority: int) -> str:
+    """Consume the LLM token stream, publishing every delta and persisting partial text in coalesced batches."""
+    channel = explanation_channel(explanation.id)
+    text = ""
+    flushed_length = 0
+    last_flush = time.monotonic()
+    
+    async for delta in llm_service.stream_explanation(explanation.question, priority=priority):
+        await event_broker.publish(channel, {"type": "delta", "offset": len(text), "text": delta})
+        text += delta
+        
+        now = time.monotonic()
+        if (len(text) - flushed_length >= settings.LLM_STREAM_FLUSH_CHARS
+                or now - last_flush >= settings.LLM_STREAM_FLUSH_INTERVAL):
+            explanation.explanation_text = text
+            await db.commit()
+            await publish_session_event(
+                explanation.session_id,
+                "explanation.delta",
+                {"id": explanation.id, "offset": flushed_length, "text": text[flushed_length:]}
+            )
+            flushed_length = len(text)
+            last_flush = now
+    
+    return text
+
+
+async def process_explanation(
+    explanation_id: int,
+    llm_pool: Optional[LLMClientPool] = None,
+    priority: int = PRIORITY_INTERACTIVE,
+    final_attempt: bool = True
+) -> Optional[str]:
+    """Generate the explanation (and, for the fused pipeline, render its animation).
+
+    Returns the error when that failed. Unless this is the ``final_attempt`` the row goes
+    back to pending instead of failed, since the job queue will run it again.
+    """
     async with AsyncSessionLocal() as db:
         query = select(Explanation).where(Explanation.id == explanation_id)
         result = await db.execute(query)
         explanation = result.scalar_one_or_none()
         
         if not explanation:
-            return
+            return None
+        
+        # Fused pipeline: the explanation and its animation's scene come from one call
+        animation = None
+        if (explanation.explanation_metadata or {}).get("pipeline") == "fused":
+            animation = await db.get(Animation, explanation.explanation_metadata["animation_id"])
+        
+        if explanation.status == ExplanationStatus.COMPLETED:
+            # A retried job whose explanation is already done: only the fused render is left
+            if animation is not None and animation.status != AnimationStatus.COMPLETED:
+                return await generate_animation(animation.id, llm_pool, priority, final_attempt)
+            return None
         
         explanation.status = ExplanationStatus.PROCESSING
         await db.commit()
+        await publish_explanation(db, explanation)
+        
+        scene = None
+        error = None
         
         llm_service = None
         try:
-            llm_service = LLMService()
-            explanation_text = await llm_service.generate_explanation(explanation.question)
+            llm_service = LLMService(llm_pool or get_llm_pool())
+            if animation is not None:
+                scene = await llm_service.generate_explanation_with_scene(
+                    explanation.question,
+                    (animation.animation_type or AnimationType.CONCEPTUAL).value,
+                    priority=priority
+                )
+                explanation_text = scene["explanation"]
+            elif settings.LLM_STREAMING:
+                explanation_text = await _stream_explanation_text(db, explanation, llm_service, priority)
+            else:
+                explanation_text = await llm_service.generate_explanation(explanation.question, priority=priority)
             
             explanation.explanation_text = explanation_text
             explanation.status = ExplanationStatus.COMPLETED
             explanation.llm_provider = llm_service.current_provider
+            explanation.explanation_metadata = {
+                **(explanation.explanation_metadata or {}),
+                "llm_cache": llm_service.cache_report()
+            }
             
         except Exception as e:
-            explanation.status = ExplanationStatus.FAILED
-            explanation.metadata = {"error": str(e)}
+            error = str(e)
+            explanation.status = ExplanationStatus.FAILED if final_attempt else ExplanationStatus.PENDING
+            explanation.explanation_metadata = {**(explanation.explanation_metadata or {}), "error": error}
         finally:
             if llm_service:
                 await llm_service.close()
         
-        await db.commit()
\ No newline at end of file
+        await db.commit()
+        await event_broker.publish(
+            explanation_channel(explanation.id),
+            {"type": "status", "status": explanation.status.value}
+        )
+        await publish_explanation(db, explanation)
+        
+        if animation is not None and (error is None or final_attempt):
+            return await _render_fused_animation(db, animation, explanation, scene, llm_pool, priority, final_attempt) or error
+        return error
+
+
+async def _render_fused_animation(
+    db: AsyncSession,
+    animation: Animation,
+    explanation: Explanation,
+    scene: Optional[dict],
+    llm_pool: Optional[LLMClientPool],
+    priority: int,
+    final_attempt: bool = True
+) -> Optional[str]:
+    """Hand the scene from a fused call straight to the renderer, skipping the script round trip."""
+    if scene is None:
+        animation.status = AnimationStatus.FAILED
+        animation.animation_metadata = {
+            **(animation.animation_metadata or {}),
+            "error": (explanation.explanation_metadata or {}).get("error", "Explanation generation failed")
+        }
+        await db.commit()
+        await publish_animation(db, animation, explanation.session_id)
+        return None
+    
+    animation.manim_code = scene["manim_code"]
+    if scene["title"]:
+        animation.title = scene["title"]
+    await db.commit()
+    
+    return await generate_animation(animation.id, llm_pool, priority, final_attempt)
+
+
+async def process_explanation_batch(explanation_ids: List[int], llm_pool: Optional[LLMClientPool] = None):
+    """Fan a batch out over the shared LLM pool, at most ``EXPLANATION_BATCH_CONCURRENCY`` at a time."""
+    async def process(explanation_id: int):
+        async with batch_semaphore:
+            await process_explanation(explanation_id, llm_pool, PRIORITY_BACKGROUND)
+    
+    await asyncio.gather(*[process(explanation_id) for explanation_id in explanation_ids])
@@ -1,16 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, case, cast, true, Text
 from sqlalchemy.orm import selectinload
-from typing import List
+from typing import List, AsyncIterator, Optional
+import asyncio
+import hashlib
 import uuid
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.pagination import paginate, set_next_cursor
 from app.models.session import Session
-from app.schemas.session import SessionCreate, SessionResponse, SessionUpdate
+from app.models.explanation import Explanation, ExplanationStatus
+from app.models.animation import Animation, AnimationStatus
+from app.schemas.session import SessionCreate, SessionResponse, SessionUpdate, SessionSnapshot
+from app.services.file_delivery import etag_matches
+from app.services.events import event_broker, format_sse, session_channel
 
 router = APIRouter()
 
+# Statuses only move forward, so the sum of ranks grows with every transition
+EXPLANATION_STATUS_RANKS = {
+    ExplanationStatus.PENDING: 0,
+    ExplanationStatus.PROCESSING: 1,
+    ExplanationStatus.COMPLETED: 2,
+    ExplanationStatus.FAILED: 3,
+}
+ANIMATION_STATUS_RANKS = {
+    AnimationStatus.PENDING: 0,
+    AnimationStatus.GENERATING: 1,
+    AnimationStatus.COMPLETED: 2,
+    AnimationStatus.FAILED: 3,
+}
+
 
 @router.post("/", response_model=SessionResponse, status_code=status.HTTP_201_CREATED)
 async def create_session(
@@ -33,20 +56,23 @@ async def create_session(
 
 @router.get("/", response_model=List[SessionResponse])
 async def get_sessions(
+    response: Response,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    query = select(Session).offset(skip).limit(limit)
+    query = paginate(select(Session), Session, cursor, skip, limit)
     result = await db.execute(query)
     sessions = result.scalars().all()
+    set_next_cursor(response, sessions, limit)
     return sessions
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
 async def get_session(
     session_id: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     query = select(Session).where(Session.session_id == session_id).options(
         selectinload(Session.explanations)
@@ -63,6 +89,120 @@ async def get_session(
     return session
 
 
+@router.get("/{session_id}/snapshot", response_model=SessionSnapshot)
+async def get_session_snapshot(
+    session_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """The session with its explanations and their animations, revalidated with a version ETag."""
+    version = await _session_version(db, session_id)
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    session_pk, etag = version
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    query = select(Session).where(Session.id == session_pk).options(
+        selectinload(Session.explanations).selectinload(Explanation.animations)
+    )
+    result = await db.execute(query)
+    session = result.scalar_one()
+    
+    response.headers.update(headers)
+    return session
+
+
+async def _session_version(db: AsyncSession, session_id: str):
+    """Return ``(session pk, weak ETag)`` from one aggregate query, or None if there is no such session.
+    
+    ``updated_at`` alone only has one-second resolution on SQLite, so the stamp also covers
+    row counts, status ranks and content lengths, which change on every streamed flush.
+    """
+    session_pk = select(Session.id).where(Session.session_id == session_id).scalar_subquery()
+    
+    explanation_stats = select(
+        func.count(Explanation.id).label("explanations"),
+        func.max(func.coalesce(Explanation.updated_at, Explanation.created_at)).label("explanations_changed"),
+        func.sum(case(EXPLANATION_STATUS_RANKS, value=Explanation.status, else_=0)).label("explanation_statuses"),
+        func.sum(func.length(func.coalesce(Explanation.explanation_text, ""))).label("explanation_chars"),
+    ).where(Explanation.session_id == session_pk).subquery()
+    
+    animation_stats = select(
+        func.count(Animation.id).label("animations"),
+        func.max(func.coalesce(Animation.updated_at, Animation.created_at)).label("animations_changed"),
+        func.sum(case(ANIMATION_STATUS_RANKS, value=Animation.status, else_=0)).label("animation_statuses"),
+        func.sum(func.length(cast(Animation.animation_metadata, Text))).label("animation_metadata_chars"),
+    ).select_from(Animation).join(Explanation).where(Explanation.session_id == session_pk).subquery()
+    
+    query = (
+        select(Session.id, Session.created_at, Session.updated_at, explanation_stats, animation_stats)
+        .select_from(Session)
+        .join(explanation_stats, true())
+        .join(animation_stats, true())
+        .where(Session.session_id == session_id)
+    )
+    result = await db.execute(query)
+    row = result.one_or_none()
+    if row is None:
+        return None
+    
+    digest = hashlib.sha256(repr(tuple(row)).encode()).hexdigest()[:32]
+    return row.id, f'W/"{digest}"'
+
+
+@router.get("/{session_id}/events")
+async def get_session_events(
+    session_id: str,
+    db: AsyncSession = Depends(get_db)
+):
+    query = select(Session.id).where(Session.session_id == session_id)
+    result = await db.execute(query)
+    session_pk = result.scalar_one_or_none()
+    
+    if session_pk is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+    
+    return StreamingResponse(
+        session_events(session_pk),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def session_events(session_pk: int) -> AsyncIterator[str]:
+    """Yield SSE frames for explanation/animation updates in a session until the client disconnects.
+    
+    ``ready`` is sent once subscribed and ``resync`` whenever events may have been lost;
+    clients reload the session from the REST endpoints on either.
+    """
+    async with event_broker.subscribe(session_channel(session_pk)) as queue:
+        yield format_sse("ready", {})
+        
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=settings.SESSION_EVENTS_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            
+            if message["type"] == "event":
+                yield format_sse(message["event"], message["data"])
+            else:
+                yield format_sse("resync", {})
+
+
 @router.put("/{session_id}", response_model=SessionResponse)
 async def update_session(
     session_id: str,
@@ -20,6 +20,17 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = config("DATABASE_URL", default="sqlite:///./whiteboard_teaching.db")
+    DATABASE_READ_URL: str = config("DATABASE_READ_URL", default="")  # read replica for GET endpoints; empty = DATABASE_URL
+    DB_ECHO: bool = config("DB_ECHO", default=False, cast=bool)
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", default=10, cast=int)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", default=20, cast=int)
+    DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", default=1800, cast=int)
+    DB_POOL_TIMEOUT: float = config("DB_POOL_TIMEOUT", default=30.0, cast=float)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = config("DB_PREPARED_STATEMENT_CACHE_SIZE", default=500, cast=int)
+    SQLITE_JOURNAL_MODE: str = config("SQLITE_JOURNAL_MODE", default="WAL")
+    SQLITE_SYNCHRONOUS: str = config("SQLITE_SYNCHRONOUS", default="NORMAL")
+    SQLITE_MMAP_SIZE: int = config("SQLITE_MMAP_SIZE", default=256 * 1024 ** 2, cast=int)
+    SQLITE_BUSY_TIMEOUT: float = config("SQLITE_BUSY_TIMEOUT", default=5.0, cast=float)
     
     # Redis
     REDIS_URL: str = config("REDIS_URL", default="redis://localhost:6379")
@@ -37,6 +48,52 @@ class Settings(BaseSettings):
     # Animation settings
     ANIMATION_OUTPUT_DIR: str = config("ANIMATION_OUTPUT_DIR", default="./animations")
     MAX_ANIMATION_DURATION: int = config("MAX_ANIMATION_DURATION", default=300, cast=int)
+    SCENE_REPAIR_ATTEMPTS: int = config("SCENE_REPAIR_ATTEMPTS", default=2, cast=int)  # LLM repairs of a scene that fails preflight
+    SCENE_ALLOWED_IMPORTS: str = config("SCENE_ALLOWED_IMPORTS", default="manim,math,random,numpy,itertools,functools,typing,colour")
+    RENDER_POOL_ENABLED: bool = config("RENDER_POOL_ENABLED", default=True, cast=bool)
+    RENDER_POOL_SIZE: int = config("RENDER_POOL_SIZE", default=0, cast=int)  # 0 = CPU count - 1
+    RENDER_POOL_RECYCLE_AFTER: int = config("RENDER_POOL_RECYCLE_AFTER", default=20, cast=int)
+    RENDER_CACHE_MAX_BYTES: int = config("RENDER_CACHE_MAX_BYTES", default=2 * 1024 ** 3, cast=int)  # 0 disables
+    PROGRESSIVE_RENDER: bool = config("PROGRESSIVE_RENDER", default=False, cast=bool)
+    RENDER_PREVIEW_QUALITY: str = config("RENDER_PREVIEW_QUALITY", default="low")  # low | medium | high | production | 4k
+    RENDER_UPGRADE_QUALITIES: str = config("RENDER_UPGRADE_QUALITIES", default="medium,high")
+    RENDER_UPGRADE_POLICY: str = config("RENDER_UPGRADE_POLICY", default="on_demand")  # eager | on_demand | off
+    RENDER_TIMEOUT: float = config("RENDER_TIMEOUT", default=600.0, cast=float)  # wall-clock seconds per render, 0 disables
+    RENDER_CPU_SECONDS: int = config("RENDER_CPU_SECONDS", default=900, cast=int)  # per manim process, 0 disables
+    RENDER_MEMORY_MB: int = config("RENDER_MEMORY_MB", default=4096, cast=int)  # address space per manim process, 0 disables
+    FFMPEG_TIMEOUT: float = config("FFMPEG_TIMEOUT", default=300.0, cast=float)
+    ARTIFACT_CACHE_MAX_ENTRIES: int = config("ARTIFACT_CACHE_MAX_ENTRIES", default=4096, cast=int)
+    HLS_ENABLED: bool = config("HLS_ENABLED", default=False, cast=bool)
+    HLS_SEGMENT_SECONDS: int = config("HLS_SEGMENT_SECONDS", default=4, cast=int)
+    HLS_LADDER: str = config("HLS_LADDER", default="")  # e.g. "720:2500,480:1200,240:400"; empty = source resolution only
+    
+    # Artifact Storage
+    STORAGE_BACKEND: str = config("STORAGE_BACKEND", default="local")  # local | s3
+    S3_BUCKET: str = config("S3_BUCKET", default="")
+    S3_PREFIX: str = config("S3_PREFIX", default="")
+    S3_ENDPOINT_URL: Optional[str] = config("S3_ENDPOINT_URL", default=None)  # e.g. MinIO; None = AWS
+    S3_REGION: str = config("S3_REGION", default="us-east-1")
+    S3_ACCESS_KEY_ID: Optional[str] = config("S3_ACCESS_KEY_ID", default=None)
+    S3_SECRET_ACCESS_KEY: Optional[str] = config("S3_SECRET_ACCESS_KEY", default=None)
+    S3_PRESIGN_EXPIRES: int = config("S3_PRESIGN_EXPIRES", default=3600, cast=int)
+    S3_MULTIPART_THRESHOLD_MB: int = config("S3_MULTIPART_THRESHOLD_MB", default=16, cast=int)
+    S3_MULTIPART_CHUNK_MB: int = config("S3_MULTIPART_CHUNK_MB", default=8, cast=int)
+    
+    # Artifact Retention
+    ARTIFACT_GC_ENABLED: bool = config("ARTIFACT_GC_ENABLED", default=True, cast=bool)
+    ARTIFACT_GC_INTERVAL: float = config("ARTIFACT_GC_INTERVAL", default=600.0, cast=float)
+    ARTIFACT_DISK_QUOTA_BYTES: int = config("ARTIFACT_DISK_QUOTA_BYTES", default=10 * 1024 ** 3, cast=int)  # 0 = no quota
+    ARTIFACT_RETENTION_DAYS: float = config("ARTIFACT_RETENTION_DAYS", default=0.0, cast=float)  # since last access, 0 = forever
+    ARTIFACT_GC_GRACE_SECONDS: float = config("ARTIFACT_GC_GRACE_SECONDS", default=3600.0, cast=float)
+    ARTIFACT_ACCESS_RESOLUTION: float = config("ARTIFACT_ACCESS_RESOLUTION", default=60.0, cast=float)
+    
+    # Job Queue / Workers
+    JOB_QUEUE_ENABLED: bool = config("JOB_QUEUE_ENABLED", default=False, cast=bool)  # False runs jobs as in-process background tasks
+    WORKER_CONCURRENCY: int = config("WORKER_CONCURRENCY", default=2, cast=int)
+    JOB_LEASE_SECONDS: int = config("JOB_LEASE_SECONDS", default=120, cast=int)
+    JOB_HEARTBEAT_INTERVAL: float = config("JOB_HEARTBEAT_INTERVAL", default=30.0, cast=float)
+    JOB_MAX_ATTEMPTS: int = config("JOB_MAX_ATTEMPTS", default=3, cast=int)
+    JOB_POLL_INTERVAL: float = config("JOB_POLL_INTERVAL", default=1.0, cast=float)
     
     # Security
     SECRET_KEY: str = config("SECRET_KEY", default="your-secret-key-change-in-production")
@@ -50,6 +107,56 @@ class Settings(BaseSettings):
     LLM_TIMEOUT: float = config("LLM_TIMEOUT", default=60.0, cast=float)
     LLM_TEMPERATURE: float = config("LLM_TEMPERATURE", default=0.7, cast=float)
     LLM_MAX_TOKENS: int = config("LLM_MAX_TOKENS", default=1500, cast=int)
+    PIPELINE_MAX_TOKENS: int = config("PIPELINE_MAX_TOKENS", default=3000, cast=int)  # fused explanation + scene responses
+    
+    # LLM Client Pool
+    LLM_POOL_MAX_CONNECTIONS: int = config("LLM_POOL_MAX_CONNECTIONS", default=100, cast=int)
+    LLM_POOL_MAX_KEEPALIVE_CONNECTIONS: int = config("LLM_POOL_MAX_KEEPALIVE_CONNECTIONS", default=20, cast=int)
+    LLM_POOL_KEEPALIVE_EXPIRY: float = config("LLM_POOL_KEEPALIVE_EXPIRY", default=30.0, cast=float)
+    LLM_POOL_HTTP2: bool = config("LLM_POOL_HTTP2", default=False, cast=bool)
+    LLM_DEFAULT_MODEL_CONCURRENCY: int = config("LLM_DEFAULT_MODEL_CONCURRENCY", default=8, cast=int)
+    LLM_MODEL_CONCURRENCY: str = config("LLM_MODEL_CONCURRENCY", default="")  # e.g. "gpt-4o-mini=16,o3=4"
+    
+    # LLM Scheduler (rate limits per model, retries for 429/5xx/network errors)
+    LLM_DEFAULT_RPM: int = config("LLM_DEFAULT_RPM", default=0, cast=int)  # requests per minute; 0 = unlimited
+    LLM_DEFAULT_TPM: int = config("LLM_DEFAULT_TPM", default=0, cast=int)  # tokens per minute; 0 = unlimited
+    LLM_RATE_LIMITS: str = config("LLM_RATE_LIMITS", default="")  # e.g. "gpt-4o-mini=500:200000,o3=50:30000"
+    LLM_MAX_RETRIES: int = config("LLM_MAX_RETRIES", default=4, cast=int)
+    LLM_RETRY_BASE_DELAY: float = config("LLM_RETRY_BASE_DELAY", default=1.0, cast=float)
+    LLM_RETRY_MAX_DELAY: float = config("LLM_RETRY_MAX_DELAY", default=30.0, cast=float)  # longer Retry-After values fail the call
+    
+    # LLM Routing (several endpoints/models, hedged requests, circuit breakers)
+    LLM_TARGETS: str = config("LLM_TARGETS", default="")  # e.g. "a=https://api.a.com/v1|gpt-4o-mini,b=https://api.b.com/v1"; empty = UNIFIED_LLM_BASE_URL
+    LLM_LATENCY_WINDOW: int = config("LLM_LATENCY_WINDOW", default=200, cast=int)
+    LLM_HEDGE_ENABLED: bool = config("LLM_HEDGE_ENABLED", default=True, cast=bool)
+    LLM_HEDGE_PERCENTILE: float = config("LLM_HEDGE_PERCENTILE", default=95.0, cast=float)
+    LLM_HEDGE_MIN_SAMPLES: int = config("LLM_HEDGE_MIN_SAMPLES", default=20, cast=int)
+    LLM_HEDGE_MIN_DELAY: float = config("LLM_HEDGE_MIN_DELAY", default=0.5, cast=float)
+    LLM_BREAKER_FAILURES: int = config("LLM_BREAKER_FAILURES", default=5, cast=int)
+    LLM_BREAKER_COOLDOWN: float = config("LLM_BREAKER_COOLDOWN", default=30.0, cast=float)
+    
+    # LLM Response Cache
+    LLM_CACHE_ENABLED: bool = config("LLM_CACHE_ENABLED", default=True, cast=bool)
+    LLM_CACHE_BACKEND: str = config("LLM_CACHE_BACKEND", default="memory")  # memory or redis (uses REDIS_URL)
+    LLM_CACHE_TTL: int = config("LLM_CACHE_TTL", default=86400, cast=int)
+    LLM_CACHE_MAX_ENTRIES: int = config("LLM_CACHE_MAX_ENTRIES", default=1000, cast=int)
+    
+    # Request Coalescing (identical in-flight LLM calls and renders run once per process)
+    REQUEST_COALESCING_ENABLED: bool = config("REQUEST_COALESCING_ENABLED", default=True, cast=bool)
+    
+    # Explanation Streaming
+    LLM_STREAMING: bool = config("LLM_STREAMING", default=True, cast=bool)
+    LLM_STREAM_FLUSH_INTERVAL: float = config("LLM_STREAM_FLUSH_INTERVAL", default=0.5, cast=float)
+    LLM_STREAM_FLUSH_CHARS: int = config("LLM_STREAM_FLUSH_CHARS", default=400, cast=int)
+    LLM_STREAM_POLL_INTERVAL: float = config("LLM_STREAM_POLL_INTERVAL", default=1.0, cast=float)
+    
+    # Explanation Batches
+    EXPLANATION_BATCH_MAX_SIZE: int = config("EXPLANATION_BATCH_MAX_SIZE", default=50, cast=int)
+    EXPLANATION_BATCH_CONCURRENCY: int = config("EXPLANATION_BATCH_CONCURRENCY", default=4, cast=int)
+    
+    # Live Events
+    EVENT_BROKER_BACKEND: str = config("EVENT_BROKER_BACKEND", default="memory")  # memory or redis (uses REDIS_URL)
+    SESSION_EVENTS_KEEPALIVE: float = config("SESSION_EVENTS_KEEPALIVE", default=15.0, cast=float)
     
     # API Response Messages
     API_ROOT_MESSAGE: str = config("API_ROOT_MESSAGE", default="Whiteboard Teaching AI API")
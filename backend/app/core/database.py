@@ -1,37 +1,110 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
 
 from app.core.config import settings
 
-# Async database setup
-if settings.DATABASE_URL.startswith("sqlite"):
-    async_engine = create_async_engine(
-        settings.DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://"),
-        echo=True
-    )
-else:
-    async_engine = create_async_engine(
-        settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
-        echo=True
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers proceed while a job commits; NORMAL sync is durable across app crashes in WAL mode
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT * 1000)}")
+    cursor.close()
+
+
+def _apply_sqlite_query_only(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def create_engine_for_url(url: str) -> AsyncEngine:
+    """Build an async engine with the profile that suits the database behind ``url``."""
+    if url.startswith("sqlite"):
+        engine = create_async_engine(
+            url.replace("sqlite://", "sqlite+aiosqlite://"),
+            echo=settings.DB_ECHO,
+            connect_args={"timeout": settings.SQLITE_BUSY_TIMEOUT}
+        )
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        return engine
+    
+    return create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=settings.DB_ECHO,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
     )
 
+
+# Async database setup
+async_engine = create_engine_for_url(settings.DATABASE_URL)
+
 AsyncSessionLocal = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 
+
+def create_read_engine() -> AsyncEngine:
+    """Engine on which writes fail, as they would on a replica, even without DATABASE_READ_URL."""
+    url = settings.DATABASE_READ_URL or settings.DATABASE_URL
+    if url.startswith("sqlite"):
+        engine = create_engine_for_url(url)
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_query_only)
+        return engine
+    # Without a replica this shares the primary's pool; the option is reset on check-in
+    engine = create_engine_for_url(url) if settings.DATABASE_READ_URL else async_engine
+    return engine.execution_options(postgresql_readonly=True)
+
+
+# Read-only sessions for GET endpoints; a replica when DATABASE_READ_URL is set
+read_engine = create_read_engine()
+
+AsyncReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
 async def init_db():
     # Import models to ensure they are registered with Base
-    from app.models import Session, Explanation, Animation
+    from app.models import Session, Explanation, Animation, Job
     
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all skips tables that already exist, so add columns and indexes introduced since
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+
+
+def _add_missing_columns(connection):
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            # Only nullable columns can be added to tables that already hold rows
+            if column.name not in existing and column.nullable:
+                column_type = column.type.compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
+
+def _create_missing_indexes(connection):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
 
 
 async def get_db():
@@ -39,4 +112,12 @@ async def get_db():
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
+
+
+async def get_read_db():
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Optional, Sequence
+import base64
+import json
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Select, select, func, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(row) -> str:
+    payload = {"created_at": row.created_at.isoformat() if row.created_at else None, "id": row.id}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            "created_at": datetime.fromisoformat(payload["created_at"]) if payload["created_at"] else None,
+            "id": int(payload["id"]),
+        }
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def paginate(query: Select, model, cursor: Optional[str], skip: int, limit: int) -> Select:
+    """Order ``query`` by ``(created_at, id)`` and apply a keyset cursor (or the legacy offset).
+
+    The cursor row's ``created_at`` is read back from the database rather than compared as a
+    bound parameter, so the comparison never depends on how the driver formats datetimes;
+    the value embedded in the cursor is only used if that row has since been deleted.
+    """
+    query = query.order_by(model.created_at, model.id)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        cursor_created_at = func.coalesce(
+            select(model.created_at).where(model.id == position["id"]).scalar_subquery(),
+            position["created_at"]
+        )
+        query = query.where(tuple_(model.created_at, model.id) > tuple_(cursor_created_at, position["id"]))
+    elif skip:
+        query = query.offset(skip)
+
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int):
+    """Advertise the cursor for the following page when this one is full."""
+    if rows and len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1])
@@ -7,12 +7,37 @@ import uvicorn
 from app.api import router as api_router
 from app.core.config import settings
 from app.core.database import init_db
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.llm_pool import init_llm_pool, close_llm_pool, get_llm_pool
+from app.services.render_cache import get_render_cache
+from app.services.llm_cache import get_llm_cache
+from app.services.llm_service import get_llm_scheduler
+from app.services.llm_router import get_llm_router
+from app.services.job_queue import job_queue
+from app.services.render_pool import start_render_pool, shutdown_render_pool, get_render_pool
+from app.services.file_delivery import artifact_cache
+from app.services.storage import get_storage
+from app.services.single_flight import llm_flight, render_flight
+from app.services.events import event_broker
+from app.services.artifact_gc import artifact_gc
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    if settings.JOB_QUEUE_ENABLED:
+        await job_queue.requeue_expired()
+    app.state.llm_pool = await init_llm_pool()
+    if not settings.JOB_QUEUE_ENABLED:
+        # Renders run in this process only when no separate workers are used
+        await start_render_pool()
+    # Workers collect their own output directories; the API also collects the bucket
+    artifact_gc.start(remote=True)
     yield
+    await artifact_gc.stop()
+    await close_llm_pool()
+    await event_broker.close()
+    shutdown_render_pool()
 
 
 app = FastAPI(
@@ -28,6 +53,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 app.mount(settings.STATIC_MOUNT_PATH, StaticFiles(directory=settings.STATIC_DIR), name="static")
@@ -44,6 +70,23 @@ async def health_check():
     return {"status": settings.API_HEALTH_MESSAGE}
 
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "llm_pool": get_llm_pool().stats(),
+        "render_cache": get_render_cache().stats(),
+        "llm_scheduler": get_llm_scheduler().stats(),
+        "llm_router": get_llm_router().stats(),
+        "llm_cache": get_llm_cache().stats() if get_llm_cache() else None,
+        "render_pool": get_render_pool().stats() if get_render_pool() else None,
+        "artifact_cache": artifact_cache.stats(),
+        "storage": get_storage().stats(),
+        "disk": artifact_gc.stats(),
+        "llm_coalescing": llm_flight.stats(),
+        "render_coalescing": render_flight.stats(),
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
@@ -1,5 +1,6 @@
 from .session import Session
 from .explanation import Explanation
 from .animation import Animation
+from .job import Job
 
-__all__ = ["Session", "Explanation", "Animation"]
\ No newline at end of file
+__all__ = ["Session", "Explanation", "Animation", "Job"]
\ No newline at end of file
@@ -1,9 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Enum, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Enum, Float, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
 
 from app.core.database import Base
+from app.core.config import settings
 
 
 class AnimationStatus(str, enum.Enum):
@@ -37,4 +38,16 @@ class Animation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    explanation = relationship("Explanation", back_populates="animations")
\ No newline at end of file
+    explanation = relationship("Explanation", back_populates="animations")
+
+    __table_args__ = (
+        # Keyset pagination order, unfiltered and within an explanation (also covers the FK)
+        Index("ix_animations_created_at_id", "created_at", "id"),
+        Index("ix_animations_explanation_id_created_at_id", "explanation_id", "created_at", "id"),
+    )
+
+    @property
+    def hls_playlist_url(self):
+        if not (self.animation_metadata or {}).get("hls"):
+            return None
+        return f"{settings.API_V1_STR}/animations/{self.id}/hls/{self.animation_metadata['hls']['playlist']}"
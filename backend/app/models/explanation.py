@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -23,8 +23,22 @@ class Explanation(Base):
     status = Column(Enum(ExplanationStatus), default=ExplanationStatus.PENDING)
     llm_provider = Column(String)
     explanation_metadata = Column(JSON, default=dict)
+    batch_id = Column(String)  # Set for explanations created through POST /explanations/batch
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     session = relationship("Session", back_populates="explanations")
-    animations = relationship("Animation", back_populates="explanation", cascade="all, delete-orphan")
\ No newline at end of file
+    animations = relationship(
+        "Animation",
+        back_populates="explanation",
+        cascade="all, delete-orphan",
+        order_by="[Animation.created_at, Animation.id]"
+    )
+
+    __table_args__ = (
+        # Keyset pagination order, unfiltered and within a session (also covers the FK)
+        Index("ix_explanations_created_at_id", "created_at", "id"),
+        Index("ix_explanations_session_id_created_at_id", "session_id", "created_at", "id"),
+        # Batch progress counts per status straight from the index
+        Index("ix_explanations_batch_id_status", "batch_id", "status"),
+    )
\ No newline at end of file
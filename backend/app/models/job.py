@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Enum, Index
+from sqlalchemy.sql import func
+import enum
+
+from app.core.database import Base
+
+
+class JobKind(str, enum.Enum):
+    EXPLANATION = "explanation"
+    ANIMATION = "animation"
+    ANIMATION_UPGRADE = "animation_upgrade"
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(Enum(JobKind), nullable=False)
+    target_id = Column(Integer, nullable=False)
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    priority = Column(Integer, default=0, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, nullable=False)
+    lease_owner = Column(String)
+    lease_expires_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    job_metadata = Column(JSON, default=dict)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_jobs_status_priority_id", "status", "priority", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 
@@ -16,4 +16,14 @@ class Session(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    explanations = relationship("Explanation", back_populates="session", cascade="all, delete-orphan")
\ No newline at end of file
+    explanations = relationship(
+        "Explanation",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        order_by="[Explanation.created_at, Explanation.id]"
+    )
+
+    __table_args__ = (
+        # Keyset pagination order
+        Index("ix_sessions_created_at_id", "created_at", "id"),
+    )
\ No newline at end of file
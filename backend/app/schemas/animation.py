@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from app.models.animation import AnimationStatus, AnimationType
@@ -23,9 +23,18 @@ class AnimationResponse(AnimationBase):
     file_path: Optional[str] = None
     duration: Optional[float] = None
     thumbnail_path: Optional[str] = None
+    hls_playlist_url: Optional[str] = None
     manim_code: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    metadata: Optional[Dict[str, Any]] = Field(default=None, validation_alias='animation_metadata')
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class AnimationSection(BaseModel):
+    index: int
+    status: str
+    duration: Optional[float] = None
+    url: Optional[str] = None
@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 from app.models.explanation import ExplanationStatus
+from app.models.animation import AnimationType
+from app.schemas.animation import AnimationResponse
 
 
 class ExplanationBase(BaseModel):
@@ -22,6 +24,37 @@ class ExplanationResponse(ExplanationBase):
     llm_provider: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
+    metadata: Optional[Dict[str, Any]] = Field(default=None, validation_alias='explanation_metadata')
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class AnimatedExplanationCreate(ExplanationCreate):
+    animation_type: AnimationType = AnimationType.CONCEPTUAL
+
+
+class AnimatedExplanationResponse(BaseModel):
+    explanation: ExplanationResponse
+    animation: AnimationResponse
+
+
+class ExplanationBatchCreate(BaseModel):
+    session_id: str
+    questions: List[str] = Field(min_length=1)
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class ExplanationBatchResponse(BaseModel):
+    batch_id: str
+    explanation_ids: List[int]
+
+
+class ExplanationBatchProgress(BaseModel):
+    batch_id: str
+    total: int
+    pending: int
+    processing: int
+    completed: int
+    failed: int
+    done: bool
@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 
+from app.schemas.explanation import ExplanationResponse
+from app.schemas.animation import AnimationResponse
+
 
 class SessionBase(BaseModel):
     title: str
@@ -28,4 +31,12 @@ class SessionResponse(SessionBase):
     
     class Config:
         from_attributes = True
-        allow_population_by_field_name = True
\ No newline at end of file
+        allow_population_by_field_name = True
+
+
+class ExplanationSnapshot(ExplanationResponse):
+    animations: List[AnimationResponse] = []
+
+
+class SessionSnapshot(SessionResponse):
+    explanations: List[ExplanationSnapshot] = []
@@ -1,21 +1,62 @@
 import os
 import asyncio
-import subprocess
+import json
 from pathlib import Path
-from typing import Tuple, Optional
-import tempfile
+from typing import Tuple, Optional, Dict, Any, List, Callable, Awaitable
+import shutil
+import textwrap
+import time
 import uuid
 
 from app.core.config import settings
 from app.services.llm_service import LLMService
+from app.services.llm_pool import LLMClientPool
+from app.services.job_queue import PRIORITY_BACKGROUND
+from app.services.render_cache import get_render_cache, link_or_copy
+from app.services.single_flight import render_flight
+from app.services.media_processing import postprocess_video, package_hls, parse_hls_ladder, probe_video, concat_videos
+from app.services.scene_sections import section_count, section_script
+from app.services.scene_preflight import extract_construct_body, preflight_scene, strip_code_fences
+from app.services.render_pool import get_render_pool, RenderPoolUnavailable, expected_movie_path
+from app.services.storage import get_storage, directory_files
+from app.services.process_limits import run_limited, RenderLimitExceeded, TERMINATION_COMPLETED, TERMINATION_FAILED, TERMINATION_TIMEOUT
 from app.models.animation import AnimationType
 
+# Render tiers and the Manim quality flag for each; the flags are part of the render cache key
+QUALITY_TIERS = {
+    "low": "-ql",
+    "medium": "-qm",
+    "high": "-qh",
+    "production": "-qp",
+    "4k": "-qk",
+}
+
+
+def render_flags(quality: str) -> List[str]:
+    return [QUALITY_TIERS[quality]]
+
+
+def upgrade_qualities() -> List[str]:
+    """Tiers that may be rendered after the preview, in the order they are offered."""
+    qualities = [quality.strip() for quality in settings.RENDER_UPGRADE_QUALITIES.split(",")]
+    return [
+        quality for quality in qualities
+        if quality in QUALITY_TIERS and quality != settings.RENDER_PREVIEW_QUALITY
+    ]
+
+# Used when the LLM's script has no usable construct method
+DEFAULT_SCENE_BODY = '''# Default animation content
+explanation = Text("Understanding the concept...", color=BLACK)
+explanation.scale(0.8)
+self.play(Write(explanation))
+self.wait(2)'''
+
 
 class AnimationService:
-    def __init__(self):
+    def __init__(self, llm_pool: Optional[LLMClientPool] = None):
         self.output_dir = Path(settings.ANIMATION_OUTPUT_DIR)
         self.output_dir.mkdir(exist_ok=True)
-        self.llm_service = LLMService()
+        self.llm_service = LLMService(llm_pool)
     
     async def __aenter__(self):
         return self
@@ -27,22 +68,144 @@ class AnimationService:
         self, 
         title: str, 
         description: str, 
-        animation_type: AnimationType
-    ) -> Tuple[str, str, str, float]:
-        animation_id = str(uuid.uuid4())
-        
+        animation_type: AnimationType,
+        on_section: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Tuple[str, str, str, float, Dict[str, Any]]:
+        """Generate a scene with the LLM, then render and post-process it."""
         explanation = f"Title: {title}\nDescription: {description}"
-        manim_code = await self.llm_service.generate_animation_script(explanation, animation_type.value)
+        manim_code = await self.llm_service.generate_animation_script(explanation, animation_type.value, priority=priority)
         
+        return await self.render_animation(manim_code, title, on_section, priority)
+    
+    async def render_animation(
+        self,
+        manim_code: str,
+        title: str,
+        on_section: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Tuple[str, str, str, float, Dict[str, Any]]:
+        """Preflight, render and post-process an existing scene at the preview quality.
+
+        With ``PROGRESSIVE_RENDER`` each section is rendered as its own clip and
+        ``on_section`` is awaited with the section list whenever one changes state.
+        """
         manim_code = self._enhance_manim_code(manim_code, title)
+        manim_code, preflight = await self._preflight(manim_code, priority)
+        
+        quality = settings.RENDER_PREVIEW_QUALITY
+        file_path, thumbnail_path, duration, metadata = await self.render_scene(manim_code, quality, on_section)
+        
+        metadata = {**metadata, "preflight": preflight, "quality": quality}
+        return file_path, thumbnail_path, manim_code, duration, metadata
+    
+    async def render_scene(
+        self,
+        manim_code: str,
+        quality: str,
+        on_section: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+    ) -> Tuple[str, str, float, Dict[str, Any]]:
+        """Render a final (already preflighted) scene at ``quality``, reusing cached or in-flight renders.
+
+        Sections and HLS are only produced for the preview tier; higher tiers are a
+        single re-render of the same scene.
+        """
+        animation_id = str(uuid.uuid4())
+        preview = quality == settings.RENDER_PREVIEW_QUALITY
+        
+        render_cache = get_render_cache()
+        cache_key = render_cache.make_key(manim_code, render_flags(quality))
+        file_path = str(self.output_dir / f"animation_{animation_id}.mp4")
+        thumbnail_path = str(self.output_dir / f"thumbnail_{animation_id}.png")
+        
+        cached = await render_cache.get(cache_key, file_path, thumbnail_path)
+        if cached is not None:
+            duration = cached["duration"]
+            metadata = {
+                "render_cache": {"key": cache_key, "hit": True},
+                "media": cached.get("media", {})
+            }
+            if settings.HLS_ENABLED and preview:
+                metadata.update(await self._package_hls(file_path, animation_id, cache_key))
+            storage = get_storage()
+            await storage.save([file_path, thumbnail_path])
+            metadata["storage"] = storage.name
+            return file_path, thumbnail_path, duration, metadata
+        
+        async def render():
+            return await self._render_and_package(
+                manim_code, animation_id, quality, cache_key, thumbnail_path, on_section if preview else None
+            )
+        
+        # Identical scenes requested at the same moment share one render
+        if settings.REQUEST_COALESCING_ENABLED:
+            (rendered_path, rendered_thumbnail, duration, metadata), coalesced = await render_flight.do(cache_key, render)
+        else:
+            (rendered_path, rendered_thumbnail, duration, metadata), coalesced = await render(), False
+        
+        if coalesced:
+            # Each animation keeps its own files; sections and HLS output are shared read-only
+            await asyncio.to_thread(link_or_copy, rendered_path, file_path)
+            await asyncio.to_thread(link_or_copy, rendered_thumbnail, thumbnail_path)
+            metadata = {**metadata, "render_cache": {**metadata["render_cache"], "coalesced": True}}
+        else:
+            file_path = rendered_path
         
-        file_path = await self._render_animation(manim_code, animation_id)
-        thumbnail_path = await self._generate_thumbnail(file_path, animation_id)
-        duration = await self._get_video_duration(file_path)
+        storage = get_storage()
+        await storage.save([file_path, thumbnail_path])
+        metadata = {**metadata, "storage": storage.name}
+        return file_path, thumbnail_path, duration, metadata
+    
+    async def _render_and_package(
+        self,
+        manim_code: str,
+        animation_id: str,
+        quality: str,
+        cache_key: str,
+        thumbnail_path: str,
+        on_section: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]]
+    ) -> Tuple[str, str, float, Dict[str, Any]]:
+        """Render, post-process, cache and (optionally) package a scene that missed the render cache."""
+        preview = quality == settings.RENDER_PREVIEW_QUALITY
+        sections = None
+        if settings.PROGRESSIVE_RENDER and preview:
+            file_path, sections, usage = await self._render_progressive(manim_code, animation_id, quality, on_section)
+        else:
+            file_path, usage = await self._render_animation(manim_code, animation_id, quality)
+        media_info = await postprocess_video(file_path, thumbnail_path, self.output_dir)
+        duration = media_info.get("duration")
         
-        return file_path, thumbnail_path, manim_code, duration
+        await get_render_cache().put(cache_key, file_path, thumbnail_path, {"duration": duration, "media": media_info})
+        metadata = {
+            "render_cache": {"key": cache_key, "hit": False},
+            "media": media_info,
+            "render": {"termination": TERMINATION_COMPLETED, **usage}
+        }
+        if sections is not None:
+            metadata["sections"] = sections
+        if settings.HLS_ENABLED and preview:
+            metadata.update(await self._package_hls(file_path, animation_id, cache_key))
+        return file_path, thumbnail_path, duration, metadata
+    
+    async def _package_hls(self, file_path: str, animation_id: str, cache_key: str) -> Dict[str, Any]:
+        """Package ``file_path`` as HLS, linking the segments from the render cache when it has them."""
+        ladder = parse_hls_ladder(settings.HLS_LADDER)
+        fingerprint = json.dumps([ladder, settings.HLS_SEGMENT_SECONDS])
+        hls_dir = self.output_dir / "hls" / animation_id
+        render_cache = get_render_cache()
+        try:
+            hls = await render_cache.get_hls(cache_key, str(hls_dir), fingerprint)
+            if hls is None:
+                hls = await package_hls(file_path, hls_dir, ladder, settings.HLS_SEGMENT_SECONDS)
+                await render_cache.put_hls(cache_key, hls, fingerprint)
+            await get_storage().save(directory_files(hls["dir"]))
+        except Exception as e:
+            # The mp4 remains playable; HLS is an optional extra deliverable
+            return {"hls_error": str(e)}
+        return {"hls": hls}
     
     def _enhance_manim_code(self, manim_code: str, title: str) -> str:
+        body = extract_construct_body(manim_code) or DEFAULT_SCENE_BODY
         base_template = f'''from manim import *
 
 class WhiteboardAnimation(Scene):
@@ -51,153 +214,182 @@ class WhiteboardAnimation(Scene):
         self.camera.background_color = WHITE
         
         # Title
-        title = Text("{title}", color=BLACK, font_size=48)
+        title = Text({title!r}, color=BLACK, font_size=48)
         title.to_edge(UP)
         self.play(Write(title))
         self.wait(1)
         
-        {self._extract_construct_body(manim_code)}
+{textwrap.indent(body, " " * 8)}
         
         # End with a brief pause
         self.wait(2)
 '''
         return base_template
     
-    def _extract_construct_body(self, manim_code: str) -> str:
-        if "def construct(self):" in manim_code:
-            lines = manim_code.split('\n')
-            construct_start = -1
-            for i, line in enumerate(lines):
-                if "def construct(self):" in line:
-                    construct_start = i + 1
-                    break
-            
-            if construct_start != -1:
-                construct_body = []
-                indent_level = None
-                for line in lines[construct_start:]:
-                    if line.strip() == "":
-                        construct_body.append(line)
-                        continue
-                    
-                    current_indent = len(line) - len(line.lstrip())
-                    if indent_level is None and line.strip():
-                        indent_level = current_indent
-                    
-                    if line.strip() and current_indent < indent_level:
-                        break
-                    
-                    construct_body.append(line[indent_level:] if indent_level else line)
-                
-                return '\n'.join(construct_body)
+    async def _preflight(self, manim_code: str, priority: int) -> Tuple[str, Dict[str, Any]]:
+        """Validate the final scene, asking the LLM to repair it a bounded number of times.
+
+        Runs before anything is rendered, so a broken script costs an LLM call rather
+        than a Manim start-up; raises if the scene still fails after the last repair.
+        """
+        report = await asyncio.to_thread(preflight_scene, manim_code)
+        repairs = 0
+        while report["problems"] and repairs < settings.SCENE_REPAIR_ATTEMPTS:
+            repairs += 1
+            repaired = await self.llm_service.repair_animation_script(manim_code, report["problems"], priority=priority)
+            manim_code = strip_code_fences(repaired)
+            report = await asyncio.to_thread(preflight_scene, manim_code)
         
-        return '''
-        # Default animation content
-        explanation = Text("Understanding the concept...", color=BLACK)
-        explanation.scale(0.8)
-        self.play(Write(explanation))
-        self.wait(2)
-        '''
+        report["repairs"] = repairs
+        if report["problems"]:
+            raise Exception("Scene failed preflight: " + "; ".join(report["problems"]))
+        return manim_code, report
     
-    async def _render_animation(self, manim_code: str, animation_id: str) -> str:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            script_path = os.path.join(temp_dir, f"animation_{animation_id}.py")
+    async def _render_animation(self, manim_code: str, animation_id: str, quality: str) -> Tuple[str, Dict[str, Any]]:
+        # Each job renders in its own workspace so concurrent renders never see each other's files
+        workspace = self.output_dir / "work" / animation_id
+        media_dir = workspace / "media"
+        media_dir.mkdir(parents=True, exist_ok=True)
+        
+        try:
+            script_path = str(workspace / "scene.py")
             
             with open(script_path, 'w') as f:
                 f.write(manim_code)
             
             output_file = self.output_dir / f"animation_{animation_id}.mp4"
+            movie_path, usage = await self._render_script(script_path, media_dir, quality, settings.RENDER_TIMEOUT)
             
-            cmd = [
-                "manim",
-                "-pql",  # Preview quality, low resolution for faster rendering
-                "--media_dir", str(self.output_dir),
-                script_path,
-                "WhiteboardAnimation"
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                raise Exception(f"Manim rendering failed: {stderr.decode()}")
-            
-            # Find the generated file (Manim creates files in subdirectories)
-            for root, dirs, files in os.walk(self.output_dir):
-                for file in files:
-                    if file.endswith(".mp4") and "WhiteboardAnimation" in file:
-                        source_path = os.path.join(root, file)
-                        os.rename(source_path, str(output_file))
-                        return str(output_file)
+            if not os.path.exists(movie_path):
+                raise Exception("Animation file not found after rendering")
             
-            raise Exception("Animation file not found after rendering")
+            os.replace(movie_path, output_file)
+            return str(output_file), usage
+        finally:
+            # Drops the script, partial movie files and Tex/text intermediates
+            shutil.rmtree(workspace, ignore_errors=True)
     
-    async def _generate_thumbnail(self, video_path: str, animation_id: str) -> str:
-        thumbnail_path = self.output_dir / f"thumbnail_{animation_id}.png"
-        
-        cmd = [
-            "ffmpeg",
-            "-i", video_path,
-            "-ss", "00:00:02",  # Take screenshot at 2 seconds
-            "-vframes", "1",
-            "-y",  # Overwrite existing file
-            str(thumbnail_path)
-        ]
-        
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+    async def _render_progressive(
+        self,
+        manim_code: str,
+        animation_id: str,
+        quality: str,
+        on_section: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]]
+    ) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+        """Render section by section, publishing each clip as soon as it is encoded.
+
+        Sections are rendered in order so the first one is playable as early as possible;
+        the clips are then joined into the full video without re-encoding. All sections
+        share one ``RENDER_TIMEOUT`` deadline.
+        """
+        workspace = self.output_dir / "work" / animation_id
+        media_dir = workspace / "media"
+        sections_dir = self.output_dir / "sections" / animation_id
+        media_dir.mkdir(parents=True, exist_ok=True)
+        sections_dir.mkdir(parents=True, exist_ok=True)
         
-        await process.communicate()
+        sections = [{"index": i, "status": "pending"} for i in range(section_count(manim_code))]
+        deadline = time.monotonic() + settings.RENDER_TIMEOUT if settings.RENDER_TIMEOUT else None
+        usage = {"wall_seconds": 0.0, "cpu_seconds": 0.0, "max_rss_mb": 0.0}
         
-        if process.returncode != 0:
-            # If ffmpeg fails, create a simple placeholder thumbnail
-            from PIL import Image, ImageDraw, ImageFont
+        try:
+            for section in sections:
+                index = section["index"]
+                section["status"] = "rendering"
+                if on_section:
+                    await on_section(sections)
+                
+                script_path = str(workspace / f"section_{index}.py")
+                with open(script_path, 'w') as f:
+                    f.write(section_script(manim_code, index))
+                
+                try:
+                    timeout = 0
+                    if deadline is not None:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            raise RenderLimitExceeded("Manim rendering stopped: timeout", TERMINATION_TIMEOUT, usage)
+                    movie_path, section_usage = await self._render_script(script_path, media_dir, quality, timeout)
+                except Exception:
+                    section["status"] = "failed"
+                    if on_section:
+                        await on_section(sections)
+                    raise
+                
+                usage = {
+                    "wall_seconds": round(usage["wall_seconds"] + section_usage.get("wall_seconds", 0), 3),
+                    "cpu_seconds": round(usage["cpu_seconds"] + section_usage.get("cpu_seconds", 0), 3),
+                    "max_rss_mb": max(usage["max_rss_mb"], section_usage.get("max_rss_mb", 0)),
+                    "runner": section_usage.get("runner"),
+                }
+                
+                if os.path.exists(movie_path):
+                    clip_path = sections_dir / f"section_{index}.mp4"
+                    os.replace(movie_path, clip_path)
+                    media_info = await probe_video(str(clip_path))
+                    storage = get_storage()
+                    await storage.save([str(clip_path)])
+                    section.update(
+                        status="ready", path=str(clip_path), duration=media_info.get("duration"), storage=storage.name
+                    )
+                else:
+                    # Nothing was animated in this section
+                    section["status"] = "empty"
+                
+                if on_section:
+                    await on_section(sections)
             
-            img = Image.new('RGB', (1920, 1080), color='white')
-            draw = ImageDraw.Draw(img)
+            clip_paths = [section["path"] for section in sections if section["status"] == "ready"]
+            if not clip_paths:
+                raise Exception("Animation file not found after rendering")
             
+            output_file = str(self.output_dir / f"animation_{animation_id}.mp4")
+            await concat_videos(clip_paths, output_file)
+            return output_file, sections, usage
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+    
+    async def _render_script(
+        self,
+        script_path: str,
+        media_dir: Path,
+        quality: str,
+        timeout: float
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Render the scene in ``script_path``; return where Manim wrote the movie and the resources it used."""
+        flags = render_flags(quality)
+        # Prefer the warm in-process renderers; fall back to the manim CLI
+        render_pool = get_render_pool()
+        if render_pool is not None:
             try:
-                font = ImageFont.truetype("arial.ttf", 72)
-            except:
-                font = ImageFont.load_default()
-            
-            draw.text((960, 540), "Animation Thumbnail", fill='black', 
-                     font=font, anchor='mm')
-            
-            img.save(thumbnail_path)
+                return await render_pool.render(
+                    script_path, "WhiteboardAnimation", str(media_dir), flags, timeout
+                )
+            except RenderPoolUnavailable:
+                pass
         
-        return str(thumbnail_path)
+        usage = await self._render_with_cli(script_path, media_dir, flags, timeout)
+        return expected_movie_path(str(media_dir), script_path, "WhiteboardAnimation", flags), usage
     
-    async def _get_video_duration(self, video_path: str) -> float:
+    async def _render_with_cli(self, script_path: str, media_dir: Path, flags: List[str], timeout: float) -> Dict[str, Any]:
         cmd = [
-            "ffprobe",
-            "-v", "quiet",
-            "-show_entries", "format=duration",
-            "-of", "csv=p=0",
-            video_path
+            "manim",
+            *flags,
+            "--media_dir", str(media_dir),
+            script_path,
+            "WhiteboardAnimation"
         ]
         
-        try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode == 0:
-                duration_str = stdout.decode().strip()
-                return float(duration_str)
-        except:
-            pass
+        result = await run_limited(
+            cmd,
+            timeout=timeout,
+            cpu_seconds=settings.RENDER_CPU_SECONDS,
+            memory_bytes=settings.RENDER_MEMORY_MB * 1024 * 1024
+        )
+        usage = {**result.usage, "runner": "cli"}
         
-        return 30.0  # Default duration if detection fails
\ No newline at end of file
+        if result.termination == TERMINATION_FAILED:
+            raise Exception(f"Manim rendering failed: {result.stderr}")
+        if result.termination != TERMINATION_COMPLETED:
+            raise RenderLimitExceeded(f"Manim rendering stopped: {result.termination}", result.termination, usage)
+        return usage
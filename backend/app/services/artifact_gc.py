@@ -0,0 +1,414 @@
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Set, Tuple
+import asyncio
+import logging
+import os
+import shutil
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.engine import Row
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.animation import Animation, AnimationStatus
+from app.services.file_delivery import Artifact, artifact_cache
+from app.services.storage import STORAGE_LOCAL, get_storage, storage_key
+
+logger = logging.getLogger(__name__)
+
+# Sub-directories holding one artifact directory per render
+ARTIFACT_DIRS = ("hls", "sections")
+WORK_DIR = "work"
+# Managed elsewhere: the render cache has its own byte budget
+SKIPPED_NAMES = {"render_cache", "placeholder_thumbnail.png"}
+
+
+def touch_artifact(artifact: Artifact):
+    """Record an access to a locally stored artifact; its mtime is the collector's LRU clock.
+
+    At most one ``utime`` per ``ARTIFACT_ACCESS_RESOLUTION`` seconds per artifact, since
+    players issue many range requests for the same file. Raises FileNotFoundError
+    when the file has been collected.
+    """
+    if artifact.storage != STORAGE_LOCAL:
+        return
+    now = time.time()
+    if now - artifact.touched_at < settings.ARTIFACT_ACCESS_RESOLUTION:
+        return
+    os.utime(artifact.path)
+    artifact.touched_at = now
+
+
+Inode = Tuple[int, int]
+
+
+class ArtifactUnit:
+    """A top-level render output: one file, or one directory under ``hls/`` or ``sections/``."""
+
+    def __init__(self, path: str, links: Dict[Inode, int], last_access: float):
+        self.path = path
+        # Hard links to each inode found within this unit
+        self.links = links
+        self.last_access = last_access
+
+
+class InodeTable:
+    """Sizes of the files behind the scanned units, accounting for hard links.
+
+    Coalesced renders and render cache hits are hard links, so removing a unit frees an
+    inode only once every link to it is gone. Inodes also linked from outside the scanned
+    units (the render cache, work directories, the placeholder thumbnail) are pinned:
+    removing units never frees them, so they do not count towards usage either.
+    """
+
+    def __init__(self):
+        self.sizes: Dict[Inode, int] = {}
+        self.nlinks: Dict[Inode, int] = {}
+        self.scanned: Dict[Inode, int] = {}
+        self.remaining: Dict[Inode, int] = {}
+
+    def add(self, inode: Inode, stat: os.stat_result):
+        self.sizes[inode] = stat.st_size
+        self.nlinks[inode] = stat.st_nlink
+        self.scanned[inode] = self.scanned.get(inode, 0) + 1
+        self.remaining[inode] = self.scanned[inode]
+
+    def copy(self) -> "InodeTable":
+        table = InodeTable()
+        table.sizes, table.nlinks, table.scanned = self.sizes, self.nlinks, self.scanned
+        table.remaining = dict(self.remaining)
+        return table
+
+    def pinned(self, inode: Inode) -> bool:
+        return self.nlinks[inode] > self.scanned[inode]
+
+    def usage(self) -> int:
+        return sum(
+            self.sizes[inode] for inode, remaining in self.remaining.items()
+            if remaining and not self.pinned(inode)
+        )
+
+    def release(self, unit: ArtifactUnit) -> int:
+        """Account for removing ``unit``; returns the bytes that actually become free."""
+        freed = 0
+        for inode, count in unit.links.items():
+            self.remaining[inode] -= count
+            if self.remaining[inode] == 0 and not self.pinned(inode):
+                freed += self.sizes[inode]
+        return freed
+
+
+def animation_paths(animation: Row) -> Set[str]:
+    """Absolute paths of every artifact unit an animation row refers to."""
+    metadata = animation.animation_metadata or {}
+    paths = [animation.file_path, animation.thumbnail_path]
+    for variant in metadata.get("variants", {}).values():
+        paths += [variant.get("file_path"), variant.get("thumbnail_path")]
+    paths.append((metadata.get("hls") or {}).get("dir"))
+    paths += [os.path.dirname(section["path"]) for section in metadata.get("sections", []) if section.get("path")]
+    return {os.path.abspath(path) for path in paths if path}
+
+
+def _remove(path: str):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class ArtifactGC:
+    """Keeps ``ANIMATION_OUTPUT_DIR`` within its disk quota and retention period.
+
+    Each pass removes, oldest first:
+
+    - orphans: outputs no animation row refers to (failed renders, deleted sessions,
+      temporary files), once older than ``ARTIFACT_GC_GRACE_SECONDS`` so that renders
+      still in flight are never touched;
+    - work directories left behind by crashed renders;
+    - local copies of artifacts that live in remote storage;
+    - whole completed animations, least recently accessed first, while usage exceeds
+      ``ARTIFACT_DISK_QUOTA_BYTES`` or once unused for ``ARTIFACT_RETENTION_DAYS``.
+
+    Evicted animations keep their row (with ``evicted_at`` in its metadata) but their
+    files are gone. The render cache and the placeholder thumbnail are left alone.
+
+    Every process with an output directory runs it: the API and each worker. With
+    ``remote`` (the API) a pass also deletes bucket objects under ``S3_PREFIX`` that no
+    live animation refers to once past the grace period, which covers failed, evicted
+    and deleted animations. Animations held remotely are never evicted; expire them
+    with the bucket's lifecycle rules if needed.
+    """
+
+    def __init__(self):
+        self.root = os.path.abspath(settings.ANIMATION_OUTPUT_DIR)
+        self.remote = False
+        self.runs = 0
+        self.removed_orphans = 0
+        self.removed_work_dirs = 0
+        self.removed_remote_objects = 0
+        self.evicted_animations = 0
+        self.freed_bytes = 0
+        self.usage_bytes = 0
+        self.last_run: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, remote: bool = True):
+        self.remote = remote
+        if settings.ARTIFACT_GC_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run_forever())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run_forever(self):
+        while True:
+            try:
+                await self.collect()
+            except Exception:
+                logger.exception("Artifact garbage collection failed")
+            await asyncio.sleep(settings.ARTIFACT_GC_INTERVAL)
+
+    async def collect(self):
+        """Run one collection pass."""
+        async with AsyncSessionLocal() as db:
+            # Only the columns that locate files; descriptions and generated code are not needed
+            result = await db.execute(select(
+                Animation.id,
+                Animation.status,
+                Animation.file_path,
+                Animation.thumbnail_path,
+                Animation.animation_metadata
+            ))
+            animations = result.all()
+
+            units, inodes = await asyncio.to_thread(self._scan)
+            now = time.time()
+
+            # Only completed and in-flight animations keep their files
+            live = [
+                animation for animation in animations
+                if animation.status != AnimationStatus.FAILED and not (animation.animation_metadata or {}).get("evicted_at")
+            ]
+            references: Dict[str, List[Row]] = {}
+            for animation in live:
+                for path in animation_paths(animation):
+                    references.setdefault(path, []).append(animation)
+
+            removable = []
+            for unit in units.values():
+                owners = references.get(unit.path, [])
+                if now - unit.last_access < settings.ARTIFACT_GC_GRACE_SECONDS:
+                    continue
+                if not owners:
+                    removable.append(unit)
+                    self.removed_orphans += 1
+                elif all(self._stored_remotely(owner) for owner in owners):
+                    removable.append(unit)
+            await asyncio.to_thread(self._remove_units, removable, inodes)
+            for unit in removable:
+                del units[unit.path]
+
+            self.removed_work_dirs += await asyncio.to_thread(self._remove_stale_work_dirs, now)
+
+            evicted = self._choose_evictions(live, units, inodes, references, now)
+            marked, changed = [], []
+            for animation, paths in evicted:
+                (marked if await self._mark_evicted(db, animation) else changed).append((animation, paths))
+            # Marked before removal: from here on the rows answer 410 instead of pointing at missing files
+            await db.commit()
+
+            # Rows written since they were read keep their files, including those shared with evicted ones
+            kept = set().union(*(animation_paths(animation) for animation, _ in changed))
+            for animation, paths in marked:
+                await asyncio.to_thread(
+                    self._remove_units,
+                    [units.pop(path) for path in paths if path in units and path not in kept],
+                    inodes
+                )
+                artifact_cache.discard(animation.id)
+            self.evicted_animations += len(marked)
+
+        if self.remote and settings.STORAGE_BACKEND != STORAGE_LOCAL:
+            self.removed_remote_objects += await asyncio.to_thread(self._remove_remote_orphans, live, now)
+
+        self.usage_bytes = inodes.usage()
+        self.runs += 1
+        self.last_run = datetime.now(timezone.utc).isoformat()
+
+    async def _mark_evicted(self, db: AsyncSession, animation: Row) -> bool:
+        """Set ``evicted_at`` unless the row changed since it was read.
+
+        A compare-and-set on ``variants_revision`` (as used by upgrade claims), so a quality
+        tier written in the meantime is neither overwritten nor has its files removed.
+        """
+        metadata = animation.animation_metadata or {}
+        revision = metadata.get("variants_revision")
+        revision_column = Animation.animation_metadata["variants_revision"].as_integer()
+        result = await db.execute(
+            update(Animation)
+            .where(Animation.id == animation.id, revision_column.is_(None) if revision is None else revision_column == revision)
+            .values(animation_metadata={
+                **metadata,
+                "evicted_at": datetime.now(timezone.utc).isoformat(),
+                "variants_revision": (revision or 0) + 1
+            })
+        )
+        return result.rowcount == 1
+
+    def _stored_remotely(self, animation: Row) -> bool:
+        metadata = animation.animation_metadata or {}
+        return animation.status == AnimationStatus.COMPLETED and metadata.get("storage", STORAGE_LOCAL) != STORAGE_LOCAL
+
+    def _choose_evictions(
+        self,
+        live: List[Row],
+        units: Dict[str, ArtifactUnit],
+        inodes: InodeTable,
+        references: Dict[str, List[Row]],
+        now: float
+    ) -> List[Tuple[Row, List[str]]]:
+        completed = []
+        for animation in live:
+            if animation.status != AnimationStatus.COMPLETED:
+                continue
+            paths = [path for path in animation_paths(animation) if path in units]
+            if paths:
+                completed.append((max(units[path].last_access for path in paths), animation, paths))
+        completed.sort(key=lambda item: item[0])
+
+        # Dry run; collect() releases the units for real as it removes them
+        pending = inodes.copy()
+
+        usage = pending.usage()
+        retention = settings.ARTIFACT_RETENTION_DAYS * 86400
+        evicted = []
+        evicted_ids = set()
+        for last_access, animation, paths in completed:
+            over_quota = settings.ARTIFACT_DISK_QUOTA_BYTES and usage > settings.ARTIFACT_DISK_QUOTA_BYTES
+            expired = retention and now - last_access > retention
+            if not (over_quota or expired):
+                # Sorted oldest first, so nothing after this one is due either
+                break
+            if not expired and all(pending.pinned(inode) for path in paths for inode in units[path].links):
+                # Everything is shared with the render cache: evicting would free nothing
+                continue
+            evicted_ids.add(animation.id)
+            # Coalesced renders share HLS and section directories; keep those still in use
+            owned = [
+                path for path in paths
+                if all(owner.id in evicted_ids for owner in references.get(path, []))
+            ]
+            usage -= sum(pending.release(units[path]) for path in owned)
+            evicted.append((animation, owned))
+        return evicted
+
+    def _scan(self) -> Tuple[Dict[str, ArtifactUnit], InodeTable]:
+        units = {}
+        inodes = InodeTable()
+        if not os.path.isdir(self.root):
+            return units, inodes
+
+        for entry in os.scandir(self.root):
+            if entry.name in SKIPPED_NAMES or entry.name == WORK_DIR:
+                continue
+            if entry.is_file(follow_symlinks=False):
+                units[entry.path] = self._unit(entry.path, [entry.path], inodes)
+            elif entry.name in ARTIFACT_DIRS and entry.is_dir(follow_symlinks=False):
+                for child in os.scandir(entry.path):
+                    files = [child.path] if child.is_file(follow_symlinks=False) else [
+                        os.path.join(root, name) for root, _, names in os.walk(child.path) for name in names
+                    ]
+                    units[child.path] = self._unit(child.path, files, inodes)
+        return units, inodes
+
+    @staticmethod
+    def _unit(path: str, files: List[str], inodes: InodeTable) -> ArtifactUnit:
+        links: Dict[Inode, int] = {}
+        last_access = 0.0
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            last_access = max(last_access, stat.st_mtime)
+            inode = (stat.st_dev, stat.st_ino)
+            links[inode] = links.get(inode, 0) + 1
+            inodes.add(inode, stat)
+        if not files:
+            try:
+                last_access = os.stat(path).st_mtime
+            except FileNotFoundError:
+                pass
+        return ArtifactUnit(path, links, last_access)
+
+    def _remove_units(self, units: List[ArtifactUnit], inodes: InodeTable):
+        for unit in units:
+            _remove(unit.path)
+            self.freed_bytes += inodes.release(unit)
+
+    def _remove_remote_orphans(self, live: List[Row], now: float) -> int:
+        storage = get_storage()
+        referenced = set()
+        for animation in live:
+            for path in animation_paths(animation):
+                try:
+                    referenced.add(storage_key(path))
+                except ValueError:
+                    pass
+
+        def orphaned(key: str) -> bool:
+            # Referenced directly, or through the HLS or sections directory that holds it
+            parts = key.split("/")
+            return not any("/".join(parts[:depth]) in referenced for depth in range(1, len(parts) + 1))
+
+        orphans = [
+            key for key, modified in storage.list_objects()
+            if now - modified >= settings.ARTIFACT_GC_GRACE_SECONDS and orphaned(key)
+        ]
+        storage.delete_objects(orphans)
+        return len(orphans)
+
+    def _remove_stale_work_dirs(self, now: float) -> int:
+        # A live render cannot outlast RENDER_TIMEOUT, so older workspaces belong to crashed processes
+        max_age = max(settings.ARTIFACT_GC_GRACE_SECONDS, settings.RENDER_TIMEOUT * 2)
+        work_dir = os.path.join(self.root, WORK_DIR)
+        removed = 0
+        if not os.path.isdir(work_dir):
+            return removed
+        for entry in os.scandir(work_dir):
+            try:
+                age = now - entry.stat(follow_symlinks=False).st_mtime
+            except FileNotFoundError:
+                continue
+            if age > max_age:
+                _remove(entry.path)
+                removed += 1
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        disk = shutil.disk_usage(self.root) if os.path.isdir(self.root) else None
+        return {
+            "enabled": settings.ARTIFACT_GC_ENABLED,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "usage_bytes": self.usage_bytes,
+            "quota_bytes": settings.ARTIFACT_DISK_QUOTA_BYTES,
+            "removed_orphans": self.removed_orphans,
+            "removed_work_dirs": self.removed_work_dirs,
+            "removed_remote_objects": self.removed_remote_objects,
+            "evicted_animations": self.evicted_animations,
+            "freed_bytes": self.freed_bytes,
+            "disk_total_bytes": disk.total if disk else None,
+            "disk_free_bytes": disk.free if disk else None,
+        }
+
+
+artifact_gc = ArtifactGC()
@@ -0,0 +1,140 @@
+from typing import Dict, Set, Any, Optional
+from contextlib import asynccontextmanager
+import asyncio
+import json
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Delivered in place of dropped messages so consumers know to resynchronise
+OVERFLOW_MESSAGE = {"type": "overflow"}
+
+
+class EventBroker:
+    """In-process publish/subscribe hub used to push live updates to streaming endpoints."""
+
+    name = "memory"
+
+    def __init__(self, max_queue_size: int = 1000):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        self._dispatch(channel, message)
+
+    def _dispatch(self, channel: str, message: Dict[str, Any]):
+        for queue in list(self._subscribers.get(channel, ())):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumers lose their backlog and resynchronise from the database
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(OVERFLOW_MESSAGE)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[channel]
+
+    async def close(self):
+        pass
+
+
+class RedisEventBroker(EventBroker):
+    """Event broker fanned out through Redis pub/sub so API processes see events from workers.
+
+    Each process runs one pattern subscription and dispatches incoming messages to its
+    local subscribers; publishing falls back to local delivery if Redis is unreachable.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "events:", max_queue_size: int = 1000):
+        import redis.asyncio as redis
+
+        super().__init__(max_queue_size)
+        self.client = redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, message: Dict[str, Any]):
+        try:
+            await self.client.publish(self.prefix + channel, json.dumps(message))
+        except Exception as e:
+            logger.warning("Redis publish failed, delivering locally only: %s", e)
+            self._dispatch(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with super().subscribe(channel) as queue:
+            yield queue
+
+    async def _listen(self):
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.prefix}*")
+                async for item in pubsub.listen():
+                    if item["type"] == "pmessage":
+                        self._dispatch(item["channel"][len(self.prefix):], json.loads(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Redis event subscription lost, reconnecting: %s", e)
+                # Anything published meanwhile is missed; tell every subscriber to resynchronise
+                for channel in list(self._subscribers):
+                    self._dispatch(channel, OVERFLOW_MESSAGE)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        await self.client.close()
+
+
+def create_event_broker() -> EventBroker:
+    if settings.EVENT_BROKER_BACKEND == "redis":
+        try:
+            return RedisEventBroker(settings.REDIS_URL)
+        except ImportError:
+            logger.warning("redis package is not installed; using the in-process event broker")
+    if settings.JOB_QUEUE_ENABLED:
+        # Workers publish from their own processes, so API streams would never see their updates
+        logger.warning(
+            "JOB_QUEUE_ENABLED with the in-process event broker: session event streams will miss "
+            "updates from workers; set EVENT_BROKER_BACKEND=redis"
+        )
+    return EventBroker()
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode a Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def session_channel(session_id: int) -> str:
+    return f"session:{session_id}"
+
+
+async def publish_session_event(session_id: int, event: str, data: Dict[str, Any]):
+    """Push a resource update to everyone watching the session's event stream."""
+    await event_broker.publish(session_channel(session_id), {"type": "event", "event": event, "data": data})
+
+
+event_broker = create_event_broker()
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import os
+import secrets
+
+from fastapi import Request
+from fastapi.responses import Response, FileResponse, StreamingResponse
+
+from app.core.config import settings
+from app.services.media_processing import hash_file
+
+# Rendered artifacts never change once written, so they may be cached forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 16
+
+
+class Artifact:
+    """A servable file with the validators computed once per process."""
+
+    __slots__ = ("path", "media_type", "filename", "size", "etag", "storage", "touched_at")
+
+    def __init__(self, path: str, media_type: str, filename: str, size: int, etag: str, storage: str = "local"):
+        self.path = path
+        self.media_type = media_type
+        self.filename = filename
+        self.size = size
+        self.etag = etag
+        self.storage = storage
+        self.touched_at = 0.0
+
+
+class ArtifactCache:
+    """Bounded in-memory map of (animation id, kind) to servable artifact.
+
+    Only completed animations are cached, so repeat requests for a file or thumbnail
+    skip the database lookup and the content hash entirely.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, str], Artifact]" = OrderedDict()
+
+    def get(self, animation_id: int, kind: str) -> Optional[Artifact]:
+        artifact = self._entries.get((animation_id, kind))
+        if artifact is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end((animation_id, kind))
+        return artifact
+
+    def put(self, animation_id: int, kind: str, artifact: Artifact):
+        self._entries[(animation_id, kind)] = artifact
+        self._entries.move_to_end((animation_id, kind))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, animation_id: int, kind: Optional[str] = None):
+        for key in [key for key in self._entries if key[0] == animation_id and kind in (None, key[1])]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+artifact_cache = ArtifactCache(settings.ARTIFACT_CACHE_MAX_ENTRIES)
+
+
+async def load_artifact(path: str, media_type: str, filename: str, sha256: Optional[str] = None) -> Artifact:
+    """Stat and (unless the hash is already known) hash ``path``; raises FileNotFoundError."""
+    size = os.stat(path).st_size
+    if sha256 is None:
+        sha256 = await asyncio.to_thread(hash_file, path)
+    return Artifact(path, media_type, filename, size, f'"{sha256}"')
+
+
+def parse_range_header(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a ``bytes=`` Range header into inclusive (start, end) pairs.
+
+    Returns None when the header should be ignored (malformed, not bytes, too many ranges)
+    and an empty list when no range is satisfiable.
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs:
+        return None
+
+    ranges = []
+    for spec in specs.split(","):
+        start, sep, end = spec.strip().partition("-")
+        if not sep:
+            return None
+        try:
+            if start == "":
+                # Suffix range: the last N bytes
+                length = int(end)
+                if length <= 0:
+                    continue
+                ranges.append((max(size - length, 0), size - 1))
+            else:
+                first = int(start)
+                last = int(end) if end else size - 1
+                if end and last < first:
+                    return None
+                if first < size:
+                    ranges.append((first, min(last, size - 1)))
+        except ValueError:
+            return None
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    return _coalesce(ranges)
+
+
+def _coalesce(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    candidates = [tag.strip() for tag in header.split(",")]
+    opaque_tag = etag.removeprefix("W/")
+    return "*" in candidates or any(tag.removeprefix("W/") == opaque_tag for tag in candidates)
+
+
+async def _read_ranges(path: str, parts: List[Tuple[Optional[bytes], int, int]]):
+    with open(path, "rb") as f:
+        for prefix, start, end in parts:
+            if prefix:
+                yield prefix
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+
+def artifact_response(request: Request, artifact: Artifact) -> Response:
+    """Serve ``artifact`` honouring If-None-Match, Range and If-Range."""
+    headers = {
+        "ETag": artifact.etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, artifact.etag):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == artifact.etag):
+        ranges = parse_range_header(range_header, artifact.size)
+        if ranges == []:
+            del headers["Cache-Control"]
+            headers["Content-Range"] = f"bytes */{artifact.size}"
+            return Response(status_code=416, headers=headers)
+        if ranges:
+            return _partial_response(artifact, ranges, headers)
+
+    return FileResponse(
+        artifact.path,
+        media_type=artifact.media_type,
+        filename=artifact.filename,
+        headers=headers
+    )
+
+
+def _partial_response(artifact: Artifact, ranges: List[Tuple[int, int]], headers: Dict[str, str]) -> Response:
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{artifact.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _read_ranges(artifact.path, [(None, start, end)]),
+            status_code=206,
+            media_type=artifact.media_type,
+            headers=headers
+        )
+
+    boundary = secrets.token_hex(16)
+    parts = []
+    length = 0
+    for start, end in ranges:
+        prefix = (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {artifact.media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{artifact.size}\r\n\r\n"
+        ).encode("latin-1")
+        parts.append((prefix, start, end))
+        length += len(prefix) + end - start + 1
+    closing = f"\r\n--{boundary}--\r\n".encode("latin-1")
+    parts.append((closing, 0, -1))
+    length += len(closing)
+
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _read_ranges(artifact.path, parts),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers
+    )
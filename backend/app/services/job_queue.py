@@ -0,0 +1,261 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+from sqlalchemy import select, update, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.job import Job, JobKind, JobStatus
+from app.models.explanation import Explanation, ExplanationStatus
+from app.models.animation import Animation, AnimationStatus
+
+# Lower values are claimed first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+PRIORITY_UPGRADE = 20
+
+LEASE_EXPIRED_ERROR = "Lease expired"
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """Durable job queue stored in the ``jobs`` table.
+
+    Workers claim jobs under a time-limited lease which they extend with heartbeats.
+    A job whose lease expires (its worker crashed or was killed) becomes claimable again,
+    so work survives restarts and can be spread across any number of worker processes.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self.session_factory = session_factory
+        self.lease_seconds = settings.JOB_LEASE_SECONDS
+
+    async def enqueue(
+        self,
+        db: AsyncSession,
+        kind: JobKind,
+        target_id: int,
+        priority: int = PRIORITY_BACKGROUND,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Job:
+        """Add a job to ``db``; it becomes visible to workers when the caller commits."""
+        job = Job(
+            kind=kind,
+            target_id=target_id,
+            status=JobStatus.QUEUED,
+            priority=priority,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+            job_metadata=metadata or {}
+        )
+        db.add(job)
+        return job
+
+    async def enqueue_many(
+        self,
+        db: AsyncSession,
+        kind: JobKind,
+        target_ids: List[int],
+        priority: int = PRIORITY_BACKGROUND
+    ) -> List[Job]:
+        """Add one job per target to ``db``; flushed together as a single multi-row insert."""
+        jobs = [
+            Job(
+                kind=kind,
+                target_id=target_id,
+                status=JobStatus.QUEUED,
+                priority=priority,
+                max_attempts=settings.JOB_MAX_ATTEMPTS,
+                job_metadata={}
+            )
+            for target_id in target_ids
+        ]
+        db.add_all(jobs)
+        return jobs
+
+    def _claimable(self, now: datetime):
+        return or_(
+            Job.status == JobStatus.QUEUED,
+            and_(
+                Job.status == JobStatus.RUNNING,
+                Job.lease_expires_at < now,
+                Job.attempts < Job.max_attempts
+            )
+        )
+
+    async def claim(self, worker_id: str, limit: int = 1) -> List[Job]:
+        async with self.session_factory() as db:
+            if db.bind.dialect.name == "postgresql":
+                return await self._claim_skip_locked(db, worker_id, limit)
+            return await self._claim_compare_and_set(db, worker_id, limit)
+
+    async def _claim_skip_locked(self, db: AsyncSession, worker_id: str, limit: int) -> List[Job]:
+        now = utcnow()
+        query = (
+            select(Job)
+            .where(self._claimable(now))
+            .order_by(Job.priority, Job.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(query)
+        jobs = result.scalars().all()
+
+        for job in jobs:
+            self._lease(job, worker_id, now)
+
+        await db.commit()
+        return list(jobs)
+
+    async def _claim_compare_and_set(self, db: AsyncSession, worker_id: str, limit: int) -> List[Job]:
+        # SQLite has no row locks; it serialises writers instead, so a conditional UPDATE
+        # that re-checks claimability acts as an atomic compare-and-set per job.
+        now = utcnow()
+        query = (
+            select(Job.id)
+            .where(self._claimable(now))
+            .order_by(Job.priority, Job.id)
+            .limit(limit * 2)
+        )
+        result = await db.execute(query)
+        candidate_ids = result.scalars().all()
+
+        claimed_ids = []
+        for job_id in candidate_ids:
+            if len(claimed_ids) >= limit:
+                break
+
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, self._claimable(now))
+                .values(
+                    status=JobStatus.RUNNING,
+                    lease_owner=worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    attempts=Job.attempts + 1
+                )
+            )
+            await db.commit()
+            if result.rowcount == 1:
+                claimed_ids.append(job_id)
+
+        if not claimed_ids:
+            return []
+
+        result = await db.execute(select(Job).where(Job.id.in_(claimed_ids)).order_by(Job.priority, Job.id))
+        return list(result.scalars().all())
+
+    def _lease(self, job: Job, worker_id: str, now: datetime):
+        job.status = JobStatus.RUNNING
+        job.lease_owner = worker_id
+        job.lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        job.attempts += 1
+
+    async def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend the lease; returns False if the job is no longer owned by this worker."""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.lease_owner == worker_id, Job.status == JobStatus.RUNNING)
+                .values(lease_expires_at=utcnow() + timedelta(seconds=self.lease_seconds))
+            )
+            await db.commit()
+            return result.rowcount == 1
+
+    async def complete(self, job_id: int, worker_id: str):
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.lease_owner == worker_id)
+                .values(status=JobStatus.COMPLETED, lease_expires_at=None)
+            )
+            await db.commit()
+
+    async def fail(self, job_id: int, worker_id: str, error: str):
+        """Record a failed attempt, requeueing the job until it runs out of attempts."""
+        async with self.session_factory() as db:
+            result = await db.execute(select(Job).where(Job.id == job_id, Job.lease_owner == worker_id))
+            job = result.scalar_one_or_none()
+            if not job:
+                return
+
+            job.last_error = error
+            job.lease_owner = None
+            job.lease_expires_at = None
+            job.status = JobStatus.QUEUED if job.attempts < job.max_attempts else JobStatus.FAILED
+            await db.commit()
+
+    async def requeue_expired(self) -> int:
+        """Startup reconciliation: return jobs with expired leases to the queue (or fail exhausted ones)."""
+        await self.fail_expired()
+        now = utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Job)
+                .where(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now, Job.attempts < Job.max_attempts)
+                .values(status=JobStatus.QUEUED, lease_owner=None, lease_expires_at=None)
+            )
+            await db.commit()
+            return result.rowcount
+
+    async def fail_expired(self) -> int:
+        """Fail jobs whose last attempt lost its lease, together with the row they were producing.
+
+        Such jobs are no longer claimable, so without this their explanation or animation
+        would stay in progress forever. Workers call it periodically.
+        """
+        now = utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Job.id, Job.kind, Job.target_id)
+                .where(Job.status == JobStatus.RUNNING, Job.lease_expires_at < now, Job.attempts >= Job.max_attempts)
+            )
+            failed = 0
+            for job_id, kind, target_id in result.all():
+                # Conditional, so concurrent sweeps (or a late heartbeat) fail each job once
+                claimed = await db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.lease_expires_at < now)
+                    .values(status=JobStatus.FAILED, lease_owner=None, lease_expires_at=None, last_error=LEASE_EXPIRED_ERROR)
+                )
+                if claimed.rowcount == 1:
+                    await self._fail_target(db, kind, target_id)
+                    failed += 1
+            await db.commit()
+            return failed
+
+    async def _fail_target(self, db: AsyncSession, kind: JobKind, target_id: int):
+        if kind == JobKind.EXPLANATION:
+            explanation = await db.get(Explanation, target_id)
+            if explanation and explanation.status not in (ExplanationStatus.COMPLETED, ExplanationStatus.FAILED):
+                explanation.status = ExplanationStatus.FAILED
+                explanation.explanation_metadata = {**(explanation.explanation_metadata or {}), "error": LEASE_EXPIRED_ERROR}
+            return
+
+        animation = await db.get(Animation, target_id)
+        if animation is None:
+            return
+        metadata = animation.animation_metadata or {}
+        if kind == JobKind.ANIMATION_UPGRADE:
+            # The animation itself is complete; only the tiers still being rendered failed
+            variants = {
+                quality: variant if variant.get("status") in ("ready", "failed") else {
+                    "status": "failed",
+                    "error": LEASE_EXPIRED_ERROR,
+                    "attempts": variant.get("attempts", 0)
+                }
+                for quality, variant in metadata.get("variants", {}).items()
+            }
+            # Bump the revision so that runners' compare-and-set writes re-read the tiers
+            animation.animation_metadata = {
+                **metadata,
+                "variants": variants,
+                "variants_revision": metadata.get("variants_revision", 0) + 1
+            }
+        elif animation.status not in (AnimationStatus.COMPLETED, AnimationStatus.FAILED):
+            animation.status = AnimationStatus.FAILED
+            animation.animation_metadata = {**metadata, "error": LEASE_EXPIRED_ERROR}
+
+job_queue = JobQueue()
@@ -0,0 +1,161 @@
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+import hashlib
+import json
+import logging
+import time
+import unicodedata
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TRAILING_PUNCTUATION = ".?!;:,。？！"
+
+
+def normalize_question(question: str) -> str:
+    """Normalize a user's question so trivially different phrasings share a cache entry.
+
+    Case, Unicode width, runs of whitespace and trailing punctuation on each line are ignored,
+    so "What is a derivative?" and "what is a  derivative" normalize identically. Only apply
+    it to free text: case and indentation are significant in code.
+    """
+    lines = []
+    for line in unicodedata.normalize("NFKC", question).casefold().splitlines():
+        line = " ".join(line.split()).rstrip(TRAILING_PUNCTUATION).rstrip()
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry expiry."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Redis-backed cache shared between processes.
+
+    Expiry uses Redis TTLs; LRU eviction is delegated to the server's
+    ``maxmemory-policy`` (``allkeys-lru`` or ``volatile-lru``).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "llm_cache:"):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: str, ttl: int):
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+
+class LLMCache:
+    """Exact-match cache for LLM completions keyed on prompt, model, temperature and token limit."""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_latency = 0.0
+
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: float, max_tokens: Optional[int]) -> str:
+        """Hash the prompt verbatim; callers normalize the user's question before templating it in."""
+        digest = hashlib.sha256()
+        digest.update(f"{model}\0{temperature}\0{max_tokens}\0".encode("utf-8"))
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"content", "latency"}`` for a cached completion, or None."""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning("LLM cache lookup failed, falling back to in-memory cache: %s", e)
+            self.backend = MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+            value = None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        entry = json.loads(value)
+        self.hits += 1
+        self.saved_latency += entry["latency"]
+        return entry
+
+    async def set(self, key: str, content: str, latency: float):
+        try:
+            await self.backend.set(key, json.dumps({"content": content, "latency": latency}), self.ttl)
+        except Exception as e:
+            logger.warning("LLM cache store failed: %s", e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hit_ratio,
+            "saved_latency_seconds": self.saved_latency,
+        }
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Return the process-wide LLM cache, or None when caching is disabled."""
+    global _llm_cache
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    if _llm_cache is None:
+        if settings.LLM_CACHE_BACKEND == "redis":
+            try:
+                backend = RedisCacheBackend(settings.REDIS_URL)
+            except ImportError:
+                logger.warning("redis package is not installed; using the in-memory LLM cache")
+                backend = MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+        else:
+            backend = MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES)
+        _llm_cache = LLMCache(backend, settings.LLM_CACHE_TTL)
+    return _llm_cache
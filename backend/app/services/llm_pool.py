@@ -0,0 +1,147 @@
+from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager
+import asyncio
+import logging
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def parse_model_limits(value: str) -> Dict[str, int]:
+    """Parse "model=limit,model=limit" into a mapping."""
+    limits = {}
+    for item in value.split(','):
+        if '=' in item:
+            model, limit = item.rsplit('=', 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+class LLMClientPool:
+    """Process-wide pooled HTTP client shared by every LLMService instance.
+
+    Keeps TCP/TLS connections alive between calls and caps the number of
+    concurrent requests per model so one busy model cannot starve the others.
+    """
+
+    def __init__(self):
+        self.http2 = settings.LLM_POOL_HTTP2
+        self.limits = httpx.Limits(
+            max_connections=settings.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_POOL_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.LLM_POOL_KEEPALIVE_EXPIRY
+        )
+        self._client = self._create_client()
+        self.model_limits = parse_model_limits(settings.LLM_MODEL_CONCURRENCY)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._stats = {
+            "requests": 0,
+            "hits": 0,
+            "misses": 0,
+            "waits": 0,
+        }
+
+    def _create_client(self) -> httpx.AsyncClient:
+        if self.http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("LLM_POOL_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+                self.http2 = False
+
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.LLM_TIMEOUT),
+            limits=self.limits,
+            http2=self.http2,
+            headers={
+                "Authorization": f"Bearer {settings.UNIFIED_LLM_API_KEY}",
+                "Content-Type": "application/json"
+            }
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    def _semaphore(self, model: str) -> asyncio.Semaphore:
+        if model not in self._semaphores:
+            limit = self.model_limits.get(model, settings.LLM_DEFAULT_MODEL_CONCURRENCY)
+            self._semaphores[model] = asyncio.Semaphore(max(1, limit))
+        return self._semaphores[model]
+
+    @asynccontextmanager
+    async def slot(self, model: str):
+        """Reserve a per-model request slot and yield request extensions that track connection reuse."""
+        semaphore = self._semaphore(model)
+        if semaphore.locked():
+            self._stats["waits"] += 1
+
+        async with semaphore:
+            self._in_flight[model] = self._in_flight.get(model, 0) + 1
+            connected = False
+
+            async def trace(event_name: str, info: Dict[str, Any]):
+                nonlocal connected
+                if event_name.startswith("connection.connect_tcp"):
+                    connected = True
+
+            try:
+                yield {"trace": trace}
+            finally:
+                self._in_flight[model] -= 1
+                self._stats["requests"] += 1
+                self._stats["misses" if connected else "hits"] += 1
+
+    async def post(self, model: str, url: str, **kwargs) -> httpx.Response:
+        async with self.slot(model) as extensions:
+            return await self.client.post(url, extensions=extensions, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, model: str, url: str, **kwargs):
+        async with self.slot(model) as extensions:
+            async with self.client.stream("POST", url, extensions=extensions, **kwargs) as response:
+                yield response
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self._stats["requests"]
+        return {
+            **self._stats,
+            "hit_ratio": self._stats["hits"] / requests if requests else 0.0,
+            "in_flight": {model: count for model, count in self._in_flight.items() if count},
+            "http2": self.http2,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+    async def close(self):
+        await self._client.aclose()
+
+
+_llm_pool: Optional[LLMClientPool] = None
+
+
+async def init_llm_pool() -> LLMClientPool:
+    global _llm_pool
+    if _llm_pool is None:
+        _llm_pool = LLMClientPool()
+    return _llm_pool
+
+
+async def close_llm_pool():
+    global _llm_pool
+    if _llm_pool is not None:
+        await _llm_pool.close()
+        _llm_pool = None
+
+
+def get_llm_pool() -> LLMClientPool:
+    """Return the shared pool, creating it lazily when the app lifespan has not run (e.g. scripts)."""
+    global _llm_pool
+    if _llm_pool is None:
+        _llm_pool = LLMClientPool()
+    return _llm_pool
@@ -0,0 +1,323 @@
+from collections import deque
+from typing import Optional, Dict, Any, List, Callable, Awaitable, AsyncIterator, TypeVar
+import asyncio
+import logging
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+def parse_llm_targets(value: str) -> List["LLMTarget"]:
+    """Parse "name=base_url|model,..." into targets; the model is optional.
+
+    An empty value yields the single UNIFIED_LLM_BASE_URL target serving every model.
+    """
+    targets = []
+    for item in value.split(','):
+        name, sep, spec = item.strip().partition('=')
+        if not sep:
+            continue
+        base_url, _, model = spec.partition('|')
+        targets.append(LLMTarget(name.strip(), base_url.strip().rstrip('/'), model.strip() or None))
+    return targets or [LLMTarget("unified", settings.UNIFIED_LLM_BASE_URL, None)]
+
+
+def is_target_failure(error: BaseException) -> bool:
+    # Rejected requests (bad payload, auth) are our fault, not a sign that the target is unhealthy
+    return getattr(error, "retryable", True)
+
+
+class LLMTarget:
+    """One upstream endpoint (optionally pinned to a model) with rolling health statistics."""
+
+    def __init__(self, name: str, base_url: str, model: Optional[str]):
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.breaker = BREAKER_CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+        self._latencies: Dict[str, deque] = {}
+        self._outcomes: deque = deque(maxlen=settings.LLM_LATENCY_WINDOW)
+
+    def serves(self, model: str) -> bool:
+        return self.model is None or self.model == model
+
+    def latencies(self, kind: str) -> deque:
+        if kind not in self._latencies:
+            self._latencies[kind] = deque(maxlen=settings.LLM_LATENCY_WINDOW)
+        return self._latencies[kind]
+
+    def percentile(self, kind: str, percentile: float) -> Optional[float]:
+        samples = sorted(self.latencies(kind))
+        if not samples:
+            return None
+        return samples[min(int(len(samples) * percentile / 100), len(samples) - 1)]
+
+    @property
+    def error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def available(self, now: float) -> bool:
+        if self.breaker == BREAKER_OPEN and now - self.opened_at >= settings.LLM_BREAKER_COOLDOWN:
+            # Let a single probe request through to test whether the target recovered
+            self.breaker = BREAKER_HALF_OPEN
+        if self.breaker == BREAKER_HALF_OPEN:
+            return not self.probing
+        return self.breaker == BREAKER_CLOSED
+
+    def record(self, kind: str, latency: float, ok: bool):
+        self.requests += 1
+        self._outcomes.append(ok)
+        if ok:
+            self.latencies(kind).append(latency)
+            self.consecutive_failures = 0
+            if self.breaker != BREAKER_CLOSED:
+                logger.info("LLM target %s recovered; closing its circuit breaker", self.name)
+            self.breaker = BREAKER_CLOSED
+            return
+
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.breaker == BREAKER_HALF_OPEN or self.consecutive_failures >= settings.LLM_BREAKER_FAILURES:
+            if self.breaker != BREAKER_OPEN:
+                logger.warning("LLM target %s is failing; opening its circuit breaker", self.name)
+            self.breaker = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "model": self.model,
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": self.error_rate,
+            "breaker": self.breaker,
+            "latency": {
+                kind: {"p50": self.percentile(kind, 50), "p95": self.percentile(kind, 95), "samples": len(samples)}
+                for kind, samples in self._latencies.items()
+            },
+        }
+
+
+class LLMRouter:
+    """Routes each LLM request to the fastest healthy target and hedges slow ones.
+
+    Targets are ranked by rolling p50 latency. When the chosen target has not answered
+    within its ``LLM_HEDGE_PERCENTILE`` latency, the same request is sent to the next
+    target and whichever answers first wins; the other is cancelled. Targets pinned to
+    another model rank behind those serving the requested model and act as fallbacks.
+    Targets that keep failing are taken out of rotation by a circuit breaker until a
+    probe succeeds. Streams are hedged on time to the first delta only.
+    """
+
+    def __init__(self, targets: List[LLMTarget]):
+        self.targets = targets
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    def candidates(self, model: str, kind: str) -> List[LLMTarget]:
+        """Targets to try for ``model``, best first.
+
+        Targets that serve ``model`` rank ahead of targets pinned to another model; those
+        follow as fallbacks (answering with their own model) for hedging and failover.
+        """
+        if not self.targets:
+            # Imported here: llm_service imports this module
+            from app.services.llm_service import LLMAPIError
+            raise LLMAPIError("No LLM targets are configured", model=model)
+
+        now = time.monotonic()
+        healthy = [target for target in self.targets if target.available(now)]
+        if not healthy:
+            # Everything is tripped: fail open to the target that tripped longest ago
+            return sorted(self.targets, key=lambda target: (not target.serves(model), target.opened_at))[:1]
+        return sorted(healthy, key=lambda target: (not target.serves(model), self.expected_latency(target, kind)))
+
+    @staticmethod
+    def expected_latency(target: LLMTarget, kind: str) -> float:
+        # Failures cost roughly a timeout; targets without samples rank first so that each one gets measured
+        return (target.percentile(kind, 50) or 0.0) + target.error_rate * settings.LLM_TIMEOUT
+
+    def hedge_delay(self, target: LLMTarget, kind: str) -> Optional[float]:
+        if not settings.LLM_HEDGE_ENABLED or len(target.latencies(kind)) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(target.percentile(kind, settings.LLM_HEDGE_PERCENTILE), settings.LLM_HEDGE_MIN_DELAY)
+
+    async def call(
+        self,
+        model: str,
+        attempt: Callable[[LLMTarget, str], Awaitable[T]],
+        on_winner: Optional[Callable[[LLMTarget], None]] = None
+    ) -> T:
+        """Run ``attempt(target, target_model)`` on the best target, hedging and failing over as needed."""
+        targets = self.candidates(model, "call")
+        racers: Dict[asyncio.Task, LLMTarget] = {}
+        backups = iter(targets[1:])
+        errors: List[BaseException] = []
+
+        def start(target: LLMTarget):
+            racers[asyncio.create_task(self._timed(target, model, attempt))] = target
+
+        start(targets[0])
+        delay = self.hedge_delay(targets[0], "call") if len(targets) > 1 else None
+        hedged = False
+        try:
+            while racers:
+                done, _ = await asyncio.wait(racers, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                delay = None
+                if not done:
+                    backup = next(backups, None)
+                    if backup is not None:
+                        self.hedges += 1
+                        hedged = True
+                        start(backup)
+                    continue
+
+                for task in done:
+                    target = racers.pop(task)
+                    if task.exception() is None:
+                        if hedged and target is not targets[0]:
+                            self.hedge_wins += 1
+                        if on_winner:
+                            on_winner(target)
+                        return task.result()
+                    errors.append(task.exception())
+
+                if not racers and is_target_failure(errors[-1]):
+                    backup = next(backups, None)
+                    if backup is not None:
+                        self.failovers += 1
+                        start(backup)
+        finally:
+            await self._cancel(racers)
+
+        raise errors[-1]
+
+    async def _timed(self, target: LLMTarget, model: str, attempt: Callable[[LLMTarget, str], Awaitable[T]]) -> T:
+        if target.breaker == BREAKER_HALF_OPEN:
+            target.probing = True
+        started = time.monotonic()
+        try:
+            result = await attempt(target, target.model or model)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if is_target_failure(e):
+                target.record("call", time.monotonic() - started, False)
+            raise
+        finally:
+            target.probing = False
+        target.record("call", time.monotonic() - started, True)
+        return result
+
+    async def stream(
+        self,
+        model: str,
+        open_stream: Callable[[LLMTarget, str], AsyncIterator[T]],
+        on_winner: Optional[Callable[[LLMTarget], None]] = None
+    ) -> AsyncIterator[T]:
+        """Like :meth:`call` for streams: the first target to produce a chunk wins."""
+        targets = self.candidates(model, "first_chunk")
+        racers: Dict[asyncio.Task, Any] = {}
+        backups = iter(targets[1:])
+        errors: List[BaseException] = []
+        winner = None
+
+        def start(target: LLMTarget):
+            if target.breaker == BREAKER_HALF_OPEN:
+                target.probing = True
+            iterator = open_stream(target, target.model or model).__aiter__()
+            racers[asyncio.ensure_future(iterator.__anext__())] = (target, iterator, time.monotonic())
+
+        start(targets[0])
+        delay = self.hedge_delay(targets[0], "first_chunk") if len(targets) > 1 else None
+        hedged = False
+        try:
+            while racers and winner is None:
+                done, _ = await asyncio.wait(racers, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+                delay = None
+                if not done:
+                    backup = next(backups, None)
+                    if backup is not None:
+                        self.hedges += 1
+                        hedged = True
+                        start(backup)
+                    continue
+
+                for task in done:
+                    target, iterator, started = racers.pop(task)
+                    target.probing = False
+                    error = task.exception()
+                    if error is None or isinstance(error, StopAsyncIteration):
+                        target.record("first_chunk", time.monotonic() - started, True)
+                        winner = (target, iterator, None if error else task.result())
+                        break
+                    if is_target_failure(error):
+                        target.record("first_chunk", time.monotonic() - started, False)
+                    errors.append(error)
+
+                if winner is None and not racers and is_target_failure(errors[-1]):
+                    backup = next(backups, None)
+                    if backup is not None:
+                        self.failovers += 1
+                        start(backup)
+        finally:
+            await self._cancel(racers)
+
+        if winner is None:
+            raise errors[-1]
+
+        target, iterator, first_chunk = winner
+        if hedged and target is not targets[0]:
+            self.hedge_wins += 1
+        if on_winner:
+            on_winner(target)
+        if first_chunk is None:
+            return
+
+        yield first_chunk
+        async for chunk in iterator:
+            yield chunk
+
+    @staticmethod
+    async def _cancel(racers: Dict[asyncio.Task, Any]):
+        for task in racers:
+            task.cancel()
+        await asyncio.gather(*racers, return_exceptions=True)
+        for value in racers.values():
+            if isinstance(value, tuple):
+                value[0].probing = False
+                await value[1].aclose()
+            else:
+                value.probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "targets": {target.name: target.stats() for target in self.targets},
+        }
+
+
+_llm_router: Optional[LLMRouter] = None
+
+
+def get_llm_router() -> LLMRouter:
+    global _llm_router
+    if _llm_router is None:
+        _llm_router = LLMRouter(parse_llm_targets(settings.LLM_TARGETS))
+    return _llm_router
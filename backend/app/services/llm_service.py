@@ -1,13 +1,273 @@
-from typing import Optional, Dict, Any, List
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple, Callable
 import asyncio
+import heapq
 import httpx
+import itertools
 import json
+import random
+import time
 
 from app.core.config import settings
+from app.services.llm_pool import LLMClientPool
+from app.services.llm_cache import LLMCache, get_llm_cache, normalize_question
+from app.services.single_flight import llm_flight
+from app.services.job_queue import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from app.services.llm_router import LLMTarget, get_llm_router
+from app.services.scene_preflight import SCENE_CLASS, allowed_imports
 
+# Throttling, timeouts, conflicts and server errors are worth another attempt
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class LLMAPIError(Exception):
+    """A failed LLM API call, classified so the scheduler can decide whether to retry it."""
+
+    def __init__(
+        self,
+        message: str,
+        model: Optional[str] = None,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.model = model
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limits(value: str) -> Dict[str, Tuple[int, int]]:
+    """Parse "model=rpm:tpm,model=rpm:tpm" into a mapping; 0 means unlimited."""
+    limits = {}
+    for item in value.split(','):
+        if '=' in item:
+            model, limit = item.rsplit('=', 1)
+            rpm, _, tpm = limit.partition(':')
+            limits[model.strip()] = (int(rpm or 0), int(tpm or 0))
+    return limits
+
+
+def estimate_tokens(payload: Dict[str, Any]) -> int:
+    """Rough upper bound on the tokens a request will consume: ~4 characters per prompt token plus the completion budget."""
+    prompt_chars = sum(len(message["content"]) for message in payload["messages"])
+    return prompt_chars // 4 + payload["max_tokens"]
+
+
+def parse_scene_response(content: str) -> Dict[str, str]:
+    """Validate and split a combined explanation + scene response."""
+    text = content.strip()
+    # Tolerate a Markdown code fence or prose around the object
+    start, end = text.find("{"), text.rfind("}")
+    try:
+        data = json.loads(text[start:end + 1] if start != -1 else text)
+    except json.JSONDecodeError as e:
+        raise Exception(f"Invalid combined response: {e}")
+    
+    if not isinstance(data, dict):
+        raise Exception("Invalid combined response: expected a JSON object")
+    for key in ("explanation", "manim_code"):
+        if not isinstance(data.get(key), str) or not data[key].strip():
+            raise Exception(f"Invalid combined response: missing {key}")
+    if "def construct(self" not in data["manim_code"]:
+        raise Exception("Invalid combined response: manim_code has no construct method")
+    
+    title = data.get("title")
+    return {
+        "title": title.strip() if isinstance(title, str) else "",
+        "explanation": data["explanation"].strip(),
+        "manim_code": data["manim_code"],
+    }
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units evenly over a minute, holding at most a minute's worth."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.available = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` units are available (0 when they are available now)."""
+        self._refill()
+        # A single request larger than the bucket only waits for a full bucket
+        amount = min(amount, self.capacity)
+        return max(amount - self.available, 0.0) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+
+class ModelLane:
+    """Admission state for one model: its buckets, cooldown and waiting requests by priority."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.cooldown_until = 0.0
+        self.condition = asyncio.Condition()
+        self.waiters: List[Tuple[int, int]] = []
+
+    def delay(self, tokens: int) -> float:
+        delay = max(self.cooldown_until - time.monotonic(), 0.0)
+        if self.requests:
+            delay = max(delay, self.requests.delay(1))
+        if self.tokens:
+            delay = max(delay, self.tokens.delay(tokens))
+        return delay
+
+    def take(self, tokens: int):
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+
+
+class LLMScheduler:
+    """Admits LLM requests under per-model rate limits and decides how failed calls are retried.
+
+    Each model has request-per-minute and token-per-minute buckets. Waiting requests are
+    admitted strictly by priority (lower first, FIFO within a priority), so interactive
+    explanations overtake queued background work. A 429 with Retry-After pauses the whole
+    model rather than only the request that received it.
+    """
 
-class LLMService:
     def __init__(self):
+        self.model_limits = parse_rate_limits(settings.LLM_RATE_LIMITS)
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.base_delay = settings.LLM_RETRY_BASE_DELAY
+        self.max_delay = settings.LLM_RETRY_MAX_DELAY
+        self._lanes: Dict[str, ModelLane] = {}
+        self._sequence = itertools.count()
+        self._stats = {
+            "admitted": 0,
+            "delayed": 0,
+            "retries": 0,
+            "throttled": 0,
+            "gave_up": 0,
+        }
+
+    def _lane(self, model: str) -> ModelLane:
+        if model not in self._lanes:
+            rpm, tpm = self.model_limits.get(model, (settings.LLM_DEFAULT_RPM, settings.LLM_DEFAULT_TPM))
+            self._lanes[model] = ModelLane(rpm, tpm)
+        return self._lanes[model]
+
+    async def acquire(self, model: str, tokens: int, priority: int = PRIORITY_INTERACTIVE):
+        """Wait until this request is the most urgent one for ``model`` and the model has capacity."""
+        lane = self._lane(model)
+        entry = (priority, next(self._sequence))
+        delayed = False
+
+        async with lane.condition:
+            heapq.heappush(lane.waiters, entry)
+            try:
+                while True:
+                    timeout = None
+                    if lane.waiters[0] == entry:
+                        timeout = lane.delay(tokens)
+                        if timeout <= 0:
+                            heapq.heappop(lane.waiters)
+                            lane.take(tokens)
+                            break
+                    delayed = True
+                    try:
+                        await asyncio.wait_for(lane.condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                lane.waiters.remove(entry)
+                heapq.heapify(lane.waiters)
+                raise
+            finally:
+                # The head of the queue changed (or capacity was used); let the next request re-check
+                lane.condition.notify_all()
+
+        self._stats["admitted"] += 1
+        if delayed:
+            self._stats["delayed"] += 1
+
+    def settle(self, model: str, estimated: int, actual: int):
+        """Return over-estimated tokens to the model's bucket once the real usage is known."""
+        lane = self._lane(model)
+        if lane.tokens and actual < estimated:
+            lane.tokens.give_back(estimated - actual)
+
+    def retry_delay(self, model: str, error: LLMAPIError, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after ``error``, or None when the call should fail."""
+        if error.status_code == 429:
+            self._stats["throttled"] += 1
+
+        if not error.retryable or attempt >= self.max_retries:
+            if error.retryable:
+                self._stats["gave_up"] += 1
+            return None
+
+        if error.retry_after is not None:
+            if error.retry_after > self.max_delay:
+                self._stats["gave_up"] += 1
+                return None
+            # The server said when to come back; hold every request for this model until then
+            lane = self._lane(model)
+            lane.cooldown_until = max(lane.cooldown_until, time.monotonic() + error.retry_after)
+            self._stats["retries"] += 1
+            return 0.0
+
+        self._stats["retries"] += 1
+        # Full jitter keeps retrying clients from synchronising
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            **self._stats,
+            "waiting": {model: len(lane.waiters) for model, lane in self._lanes.items() if lane.waiters},
+            "cooling_down": {
+                model: round(lane.cooldown_until - now, 3)
+                for model, lane in self._lanes.items() if lane.cooldown_until > now
+            },
+        }
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _llm_scheduler
+    if _llm_scheduler is None:
+        _llm_scheduler = LLMScheduler()
+    return _llm_scheduler
+
+
+class LLMService:
+    def __init__(self, pool: Optional[LLMClientPool] = None, cache: Optional[LLMCache] = None):
         if not settings.UNIFIED_LLM_API_KEY:
             raise ValueError("UNIFIED_LLM_API_KEY is not configured")
         
@@ -16,19 +276,69 @@ class LLMService:
         self.default_model = settings.UNIFIED_LLM_DEFAULT_MODEL
         self.current_provider = "unified"
         
-        # HTTP client for async requests
-        self.client = httpx.AsyncClient(
-            timeout=httpx.Timeout(settings.LLM_TIMEOUT),
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-        )
+        # Shared HTTP client pool; a private one is created (and closed) when none is injected
+        self._owns_pool = pool is None
+        self.pool = pool or LLMClientPool()
+        
+        # Exact-match response cache (None when LLM_CACHE_ENABLED is off)
+        self.cache = cache or get_llm_cache()
+        
+        # Per-model rate limits, priority admission and retry policy, shared process-wide
+        self.scheduler = get_llm_scheduler()
+        
+        # Picks the upstream endpoint per call and hedges slow ones (LLM_TARGETS)
+        self.router = get_llm_router()
+        self.last_call: Dict[str, Any] = {}
     
-    async def generate_explanation(self, question: str, model: Optional[str] = None) -> str:
+    async def generate_explanation(self, question: str, model: Optional[str] = None, priority: int = PRIORITY_INTERACTIVE) -> str:
         """Generate an educational explanation using the unified LLM API."""
         
-        prompt = f"""You are an expert educational AI that creates clear, engaging explanations for whiteboard teaching.
+        return await self._cached_call(
+            self._explanation_prompt(question),
+            model or self.default_model,
+            priority=priority,
+            key_prompt=self._explanation_prompt(normalize_question(question))
+        )
+    
+    async def stream_explanation(self, question: str, model: Optional[str] = None, priority: int = PRIORITY_INTERACTIVE) -> AsyncIterator[str]:
+        """Stream an educational explanation token by token using the unified LLM API."""
+        
+        prompt = self._explanation_prompt(question)
+        model = model or self.default_model
+        key = self._cache_key(self._explanation_prompt(normalize_question(question)), model, None, None)
+        
+        if self.cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                self._record_call(cache_hit=True, latency=0.0, saved_latency=cached["latency"])
+                yield cached["content"]
+                return
+        
+        started = time.monotonic()
+        
+        async def produce() -> AsyncIterator[Tuple[str, str]]:
+            content = ""
+            async for delta in self._stream_unified_api(prompt, model, priority=priority):
+                content += delta
+                # The provider travels with each delta so coalesced consumers report it too
+                yield delta, self.current_provider
+            if self.cache:
+                await self.cache.set(key, content, time.monotonic() - started)
+        
+        # Identical questions asked at the same moment share one upstream stream
+        if settings.REQUEST_COALESCING_ENABLED:
+            deltas, coalesced = llm_flight.stream(key, produce)
+        else:
+            deltas, coalesced = produce(), False
+        
+        async for delta, provider in deltas:
+            self.current_provider = provider
+            yield delta
+        
+        self._record_call(cache_hit=False, latency=time.monotonic() - started, saved_latency=0.0, coalesced=coalesced)
+    
+    def _explanation_prompt(self, question: str) -> str:
+        return f"""You are an expert educational AI that creates clear, engaging explanations for whiteboard teaching.
 
 Question: {question}
 
@@ -40,26 +350,140 @@ Please provide a comprehensive explanation that would be suitable for whiteboard
 5. Be structured in a way that builds understanding progressively
 
 Focus on creating content that would work well with visual animations and whiteboard illustrations."""
-
-        return await self._call_unified_api(prompt, model or self.default_model)
     
-    async def _call_unified_api(self, prompt: str, model: str, temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> str:
-        """Make a call to the unified LLM API using OpenAI-compatible format."""
+    async def _cached_call(
+        self,
+        prompt: str,
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        validate: Optional[Callable[[str], Any]] = None,
+        key_prompt: Optional[str] = None
+    ) -> str:
+        """Call the unified LLM API through the exact-match response cache.
+        
+        ``validate`` raises for unusable content, which is then neither cached nor shared
+        as a success with coalesced callers. ``key_prompt`` (default: ``prompt``) is what
+        the cache key is computed from, e.g. the prompt built around the normalized question.
+        """
+        
+        key = self._cache_key(key_prompt or prompt, model, temperature, max_tokens)
+        
+        if self.cache:
+            cached = await self.cache.get(key)
+            if cached is not None and self._is_valid(cached["content"], validate):
+                self._record_call(cache_hit=True, latency=0.0, saved_latency=cached["latency"])
+                return cached["content"]
+        
+        started = time.monotonic()
         
-        payload = {
+        async def call() -> Tuple[str, str]:
+            content = await self._call_unified_api(prompt, model, temperature, max_tokens, priority)
+            if validate:
+                validate(content)
+            if self.cache:
+                await self.cache.set(key, content, time.monotonic() - started)
+            return content, self.current_provider
+        
+        # Identical prompts in flight at the same moment share one upstream call
+        if settings.REQUEST_COALESCING_ENABLED:
+            (content, self.current_provider), coalesced = await llm_flight.do(key, call)
+        else:
+            (content, self.current_provider), coalesced = await call(), False
+        
+        self._record_call(cache_hit=False, latency=time.monotonic() - started, saved_latency=0.0, coalesced=coalesced)
+        return content
+    
+    @staticmethod
+    def _cache_key(prompt: str, model: str, temperature: Optional[float], max_tokens: Optional[int]) -> str:
+        # Resolve defaults the same way as _build_payload, so that the key matches the request sent
+        return LLMCache.make_key(
+            prompt,
+            model,
+            settings.LLM_TEMPERATURE if temperature is None else temperature,
+            max_tokens or settings.LLM_MAX_TOKENS
+        )
+    
+    @staticmethod
+    def _is_valid(content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        # Entries cached before validation existed may hold a bad response; refetch those
+        if validate is None:
+            return True
+        try:
+            validate(content)
+        except Exception:
+            return False
+        return True
+    
+    def _record_call(self, cache_hit: bool, latency: float, saved_latency: float, coalesced: bool = False):
+        self.last_call = {
+            "cache_hit": cache_hit,
+            "coalesced": coalesced,
+            "latency_seconds": latency,
+            "saved_latency_seconds": saved_latency,
+        }
+    
+    def cache_report(self) -> Dict[str, Any]:
+        """Describe the most recent call for explanation_metadata, including the cache-wide hit ratio."""
+        report = dict(self.last_call)
+        if self.cache:
+            report["hit_ratio"] = self.cache.hit_ratio
+        return report
+    
+    def _build_payload(self, prompt: str, model: str, temperature: Optional[float], max_tokens: Optional[int], stream: bool) -> Dict[str, Any]:
+        return {
             "model": model,
             "messages": [
                 {"role": "system", "content": settings.LLM_SYSTEM_MESSAGE},
                 {"role": "user", "content": prompt}
             ],
-            "temperature": temperature or settings.LLM_TEMPERATURE,
+            "temperature": settings.LLM_TEMPERATURE if temperature is None else temperature,
             "max_tokens": max_tokens or settings.LLM_MAX_TOKENS,
-            "stream": False
+            "stream": stream
         }
+    
+    async def _call_unified_api(
+        self,
+        prompt: str,
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> str:
+        """Make a call to the unified LLM API using OpenAI-compatible format, retrying transient failures."""
         
+        payload = self._build_payload(prompt, model, temperature, max_tokens, stream=False)
+        estimated_tokens = estimate_tokens(payload)
+        
+        async def attempt_target(target: LLMTarget, target_model: str) -> str:
+            await self.scheduler.acquire(target_model, estimated_tokens, priority)
+            content, usage = await self._post_completion(target, {**payload, "model": target_model})
+            if usage.get("total_tokens"):
+                self.scheduler.settle(target_model, estimated_tokens, usage["total_tokens"])
+            return content
+        
+        attempt = 0
+        while True:
+            try:
+                return await self.router.call(model, attempt_target, on_winner=self._use_target)
+            except LLMAPIError as e:
+                delay = self.scheduler.retry_delay(e.model or model, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+    
+    def _use_target(self, target: LLMTarget):
+        self.current_provider = target.name
+    
+    async def _post_completion(self, target: LLMTarget, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Send one completion request to ``target``; returns the content and the reported token usage."""
+        model = payload["model"]
         try:
-            response = await self.client.post(
-                f"{self.base_url}/chat/completions",
+            response = await self.pool.post(
+                model,
+                f"{target.base_url}/chat/completions",
                 json=payload
             )
             response.raise_for_status()
@@ -67,20 +491,113 @@ Focus on creating content that would work well with visual animations and whiteb
             data = response.json()
             
             if "choices" not in data or not data["choices"]:
-                raise Exception("Invalid response format: no choices found")
+                raise LLMAPIError("Invalid response format: no choices found", model=model)
             
-            return data["choices"][0]["message"]["content"]
+            return data["choices"][0]["message"]["content"], data.get("usage") or {}
             
+        except LLMAPIError:
+            raise
         except httpx.HTTPStatusError as e:
-            raise Exception(f"HTTP error {e.response.status_code}: {e.response.text}")
+            raise self._status_error(e, model)
         except httpx.RequestError as e:
-            raise Exception(f"Request error: {str(e)}")
-        except KeyError as e:
-            raise Exception(f"Invalid response format: missing key {e}")
+            raise LLMAPIError(f"Request error: {str(e)}", model=model, retryable=True)
+        except (KeyError, TypeError) as e:
+            raise LLMAPIError(f"Invalid response format: missing key {e}", model=model)
         except Exception as e:
-            raise Exception(f"Unified LLM API call failed: {str(e)}")
+            raise LLMAPIError(f"Unified LLM API call failed: {str(e)}", model=model)
+    
+    @staticmethod
+    def _status_error(error: httpx.HTTPStatusError, model: str) -> LLMAPIError:
+        response = error.response
+        return LLMAPIError(
+            f"HTTP error {response.status_code}: {response.text}",
+            model=model,
+            status_code=response.status_code,
+            retryable=response.status_code in RETRYABLE_STATUS_CODES,
+            retry_after=parse_retry_after(response.headers.get("retry-after"))
+        )
+    
+    async def _stream_unified_api(
+        self,
+        prompt: str,
+        model: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """Stream content deltas from the unified LLM API's OpenAI-compatible SSE response.
+        
+        Failures are retried only until the first delta arrives; after that a retry
+        would repeat text the caller has already consumed.
+        """
+        
+        payload = self._build_payload(prompt, model, temperature, max_tokens, stream=True)
+        estimated_tokens = estimate_tokens(payload)
+        
+        async def open_target(target: LLMTarget, target_model: str) -> AsyncIterator[str]:
+            await self.scheduler.acquire(target_model, estimated_tokens, priority)
+            async for delta in self._stream_completion(target, {**payload, "model": target_model}):
+                yield delta
+        
+        attempt = 0
+        while True:
+            started = False
+            try:
+                async for delta in self.router.stream(model, open_target, on_winner=self._use_target):
+                    started = True
+                    yield delta
+                return
+            except LLMAPIError as e:
+                delay = None if started else self.scheduler.retry_delay(e.model or model, e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
     
-    async def generate_animation_script(self, explanation: str, animation_type: str, model: Optional[str] = None) -> str:
+    async def _stream_completion(self, target: LLMTarget, payload: Dict[str, Any]) -> AsyncIterator[str]:
+        model = payload["model"]
+        try:
+            async with self.pool.stream(
+                model,
+                f"{target.base_url}/chat/completions",
+                json=payload
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    chunk = json.loads(data)
+                    if not chunk.get("choices"):
+                        continue
+                    
+                    delta = chunk["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+            
+        except httpx.HTTPStatusError as e:
+            raise self._status_error(e, model)
+        except httpx.RequestError as e:
+            raise LLMAPIError(f"Request error: {str(e)}", model=model, retryable=True)
+        except json.JSONDecodeError as e:
+            raise LLMAPIError(f"Invalid stream chunk: {str(e)}", model=model)
+        except Exception as e:
+            raise LLMAPIError(f"Unified LLM API stream failed: {str(e)}", model=model)
+    
+    async def generate_animation_script(
+        self,
+        explanation: str,
+        animation_type: str,
+        model: Optional[str] = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> str:
         """Generate a Manim animation script using the unified LLM API."""
         
         prompt = f"""Based on the following explanation, generate a detailed Manim animation script that will create an engaging whiteboard-style educational animation.
@@ -97,8 +614,75 @@ Generate Python code using the Manim library that creates a step-by-step animate
 
 Return only the Python Manim code, ready to execute."""
 
-        return await self._call_unified_api(prompt, model or self.default_model)
+        return await self._cached_call(prompt, model or self.default_model, priority=priority)
+    
+    async def repair_animation_script(
+        self,
+        manim_code: str,
+        problems: List[str],
+        model: Optional[str] = None,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> str:
+        """Ask the LLM to fix a Manim script that failed preflight checks."""
+        
+        issues = "\n".join(f"- {problem}" for problem in problems)
+        prompt = f"""The following Manim animation script failed validation before rendering.
+
+Script:
+```python
+{manim_code}
+```
+
+Problems:
+{issues}
+
+Fix every problem while keeping the animation's content and the `{SCENE_CLASS}(Scene)` class. Only import from these modules: {", ".join(sorted(allowed_imports()))}. Keep the animation within {settings.MAX_ANIMATION_DURATION} seconds, and return only the complete corrected Python code."""
+
+        return await self._cached_call(prompt, model or self.default_model, priority=priority)
+    
+    async def generate_explanation_with_scene(
+        self,
+        question: str,
+        animation_type: str,
+        model: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ) -> Dict[str, str]:
+        """Generate an explanation and its Manim scene in a single call.
+
+        Returns ``{"title", "explanation", "manim_code"}``; raises if the response is not valid.
+        """
+        
+        content = await self._cached_call(
+            self._scene_prompt(question, animation_type),
+            model or self.default_model,
+            max_tokens=settings.PIPELINE_MAX_TOKENS,
+            priority=priority,
+            validate=parse_scene_response,
+            key_prompt=self._scene_prompt(normalize_question(question), animation_type)
+        )
+        return parse_scene_response(content)
+    
+    def _scene_prompt(self, question: str, animation_type: str) -> str:
+        return f"""You are an expert educational AI that creates clear, engaging explanations for whiteboard teaching, together with a Manim animation that illustrates them.
+
+Question: {question}
+Animation Type: {animation_type}
+
+The explanation should:
+1. Start with a clear, simple definition or overview
+2. Break down complex concepts into digestible steps
+3. Use analogies and examples where helpful
+4. Highlight key points and relationships
+5. Be structured in a way that builds understanding progressively
+
+The animation should follow the explanation step by step, using clear, readable text and diagrams, visual elements like arrows, shapes and colors, smooth transitions between concepts, and be approximately 30-60 seconds long.
+
+Respond with a single JSON object and nothing else, with these keys:
+- "title": a short title for the animation
+- "explanation": the explanation text
+- "manim_code": complete Python code defining `class WhiteboardAnimation(Scene)` with a `construct(self)` method"""
     
     async def close(self):
-        """Close the HTTP client connection."""
-        await self.client.aclose()
\ No newline at end of file
+        """Close the HTTP client connection unless it belongs to the shared pool."""
+        if self._owns_pool:
+            await self.pool.close()
\ No newline at end of file
@@ -0,0 +1,242 @@
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+
+from app.core.config import settings
+from app.services.render_cache import link_or_copy
+from app.services.process_limits import run_limited
+
+POSTER_TIME = 2.0  # seconds into the video used for the thumbnail
+
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+BITRATE_PATTERN = re.compile(r"bitrate: (\d+) kb/s")
+VIDEO_STREAM_PATTERN = re.compile(r"Stream #0:\d+.*?: Video: (\w+).*?, (\d{2,5})x(\d{2,5})")
+FPS_PATTERN = re.compile(r"([\d.]+) fps")
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_media_info(ffmpeg_log: str) -> Dict[str, Any]:
+    """Extract duration, resolution and bitrate of input #0 from ffmpeg's stderr banner."""
+    input_log = ffmpeg_log.split("Output #0", 1)[0]
+    info: Dict[str, Any] = {}
+
+    match = DURATION_PATTERN.search(input_log)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    match = BITRATE_PATTERN.search(input_log)
+    if match:
+        info["bitrate_kbps"] = int(match.group(1))
+
+    for line in input_log.splitlines():
+        match = VIDEO_STREAM_PATTERN.search(line)
+        if match:
+            info["video_codec"] = match.group(1)
+            info["width"] = int(match.group(2))
+            info["height"] = int(match.group(3))
+            fps = FPS_PATTERN.search(line)
+            if fps:
+                info["fps"] = float(fps.group(1))
+            break
+
+    return info
+
+
+async def postprocess_video(video_path: str, thumbnail_path: str, placeholder_dir: Path) -> Dict[str, Any]:
+    """Single ffmpeg pass over a freshly rendered video.
+
+    Remuxes with ``+faststart`` (moov atom first, so playback starts before the download
+    finishes), extracts the poster frame and reports duration/resolution/bitrate parsed
+    from the same invocation, replacing separate ffmpeg and ffprobe runs.
+    """
+    remuxed_path = f"{video_path}.faststart.mp4"
+
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-y",
+        "-i", video_path,
+        # Output 1: stream copy with the index moved to the front
+        "-map", "0",
+        "-c", "copy",
+        "-movflags", "+faststart",
+        remuxed_path,
+        # Output 2: poster frame
+        "-map", "0:v:0",
+        "-ss", str(POSTER_TIME),
+        "-frames:v", "1",
+        "-update", "1",
+        thumbnail_path,
+    ]
+
+    try:
+        result = await run_limited(cmd, timeout=settings.FFMPEG_TIMEOUT)
+        log = result.stderr
+        returncode = result.returncode
+    except FileNotFoundError:
+        log = ""
+        returncode = -1
+
+    info = parse_media_info(log)
+
+    if returncode == 0 and os.path.exists(remuxed_path):
+        os.replace(remuxed_path, video_path)
+        info["faststart"] = True
+    else:
+        if os.path.exists(remuxed_path):
+            os.remove(remuxed_path)
+        info["faststart"] = False
+
+    if not os.path.exists(thumbnail_path):
+        link_or_copy(str(placeholder_thumbnail(placeholder_dir)), thumbnail_path)
+        info["placeholder_thumbnail"] = True
+
+    info["size_bytes"] = os.path.getsize(video_path)
+    info["sha256"] = await asyncio.to_thread(hash_file, video_path)
+    return info
+
+
+async def probe_video(video_path: str) -> Dict[str, Any]:
+    """Media info for ``video_path`` from ffmpeg's input banner (no ffprobe needed)."""
+    result = await run_limited(["ffmpeg", "-hide_banner", "-i", video_path], timeout=settings.FFMPEG_TIMEOUT)
+    return parse_media_info(result.stderr)
+
+
+async def concat_videos(clip_paths: List[str], output_path: str):
+    """Join clips encoded with identical settings into one file without re-encoding."""
+    list_path = f"{output_path}.concat.txt"
+    with open(list_path, "w") as f:
+        for clip_path in clip_paths:
+            escaped = os.path.abspath(clip_path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+    try:
+        result = await run_limited([
+            "ffmpeg", "-hide_banner", "-y",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy", output_path,
+        ], timeout=settings.FFMPEG_TIMEOUT)
+    finally:
+        os.remove(list_path)
+
+    if result.returncode != 0:
+        raise Exception(f"Joining sections failed ({result.termination}): {result.stderr[-2000:]}")
+
+
+def placeholder_thumbnail(directory: Path) -> Path:
+    """Return the shared placeholder thumbnail, drawing it only the first time."""
+    path = directory / "placeholder_thumbnail.png"
+    if path.exists():
+        return path
+
+    from PIL import Image, ImageDraw, ImageFont
+
+    img = Image.new('RGB', (1920, 1080), color='white')
+    draw = ImageDraw.Draw(img)
+
+    try:
+        font = ImageFont.truetype("arial.ttf", 72)
+    except OSError:
+        font = ImageFont.load_default()
+
+    draw.text((960, 540), "Animation Thumbnail", fill='black',
+              font=font, anchor='mm')
+
+    temp_path = directory / f"placeholder_thumbnail.{os.getpid()}.png"
+    img.save(temp_path)
+    os.replace(temp_path, path)
+    return path
+
+
+HLS_PLAYLIST = "master.m3u8"
+HLS_SOURCE_KBPS = 1500  # bitrate of the single source-resolution rendition
+
+
+def parse_hls_ladder(value: str) -> List[Tuple[Optional[int], int]]:
+    """Parse "480:1200,240:400" (height:video kbps) into renditions.
+
+    An empty ladder means a single rendition at the source resolution.
+    """
+    ladder = []
+    for item in value.split(','):
+        if ':' in item:
+            height, kbps = item.split(':', 1)
+            ladder.append((int(height), int(kbps)))
+    return ladder or [(None, HLS_SOURCE_KBPS)]
+
+
+async def package_hls(
+    video_path: str,
+    hls_dir: Path,
+    ladder: List[Tuple[Optional[int], int]],
+    segment_seconds: int
+) -> Dict[str, Any]:
+    """Cut ``video_path`` into HLS segments under ``hls_dir`` with a master playlist.
+
+    Every rendition gets its own ``v<n>/index.m3u8``; keyframes are forced on segment
+    boundaries so segments stay short regardless of the source GOP.
+    """
+    staging_dir = hls_dir.with_name(f"{hls_dir.name}.tmp")
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir(parents=True)
+
+    split = f"[0:v]split={len(ladder)}" + "".join(f"[s{i}]" for i in range(len(ladder)))
+    filters = [split]
+    cmd = ["ffmpeg", "-hide_banner", "-y", "-i", video_path]
+    codec_args = []
+    for i, (height, kbps) in enumerate(ladder):
+        filters.append(f"[s{i}]scale=-2:{height}[v{i}]" if height else f"[s{i}]null[v{i}]")
+        codec_args += [
+            "-map", f"[v{i}]",
+            f"-b:v:{i}", f"{kbps}k",
+            f"-maxrate:v:{i}", f"{kbps * 3 // 2}k",
+            f"-bufsize:v:{i}", f"{kbps * 2}k",
+        ]
+
+    cmd += [
+        "-filter_complex", ";".join(filters),
+        *codec_args,
+        "-c:v", "libx264",
+        "-preset", "veryfast",
+        "-pix_fmt", "yuv420p",
+        "-an",
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})",
+        "-f", "hls",
+        "-hls_time", str(segment_seconds),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", str(staging_dir / "v%v" / "seg_%03d.ts"),
+        "-master_pl_name", HLS_PLAYLIST,
+        "-var_stream_map", " ".join(f"v:{i}" for i in range(len(ladder))),
+        str(staging_dir / "v%v" / "index.m3u8"),
+    ]
+
+    result = await run_limited(cmd, timeout=settings.FFMPEG_TIMEOUT)
+
+    if result.returncode != 0 or not (staging_dir / HLS_PLAYLIST).exists():
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise Exception(f"HLS packaging failed ({result.termination}): {result.stderr[-2000:]}")
+
+    shutil.rmtree(hls_dir, ignore_errors=True)
+    os.replace(staging_dir, hls_dir)
+
+    return {
+        "dir": str(hls_dir),
+        "playlist": HLS_PLAYLIST,
+        "segment_seconds": segment_seconds,
+        "renditions": [
+            {"playlist": f"v{i}/index.m3u8", "height": height, "bitrate_kbps": kbps}
+            for i, (height, kbps) in enumerate(ladder)
+        ],
+    }
@@ -0,0 +1,191 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+import asyncio
+import functools
+import os
+import signal
+import subprocess
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; renders then run without rlimits
+    resource = None
+
+TERMINATION_COMPLETED = "completed"
+TERMINATION_FAILED = "failed"
+TERMINATION_TIMEOUT = "timeout"
+TERMINATION_CPU_LIMIT = "cpu_limit"
+TERMINATION_MEMORY_LIMIT = "memory_limit"
+TERMINATION_KILLED = "killed"
+
+# Seconds between the soft CPU limit (SIGXCPU) and the hard one (SIGKILL)
+CPU_LIMIT_GRACE = 5
+
+# Only the tail of stderr is kept for error messages
+STDERR_TAIL_BYTES = 64 * 1024
+
+MEMORY_ERROR_MARKERS = ("MemoryError", "Cannot allocate memory", "std::bad_alloc", "Out of memory")
+
+# Blocking wait4 calls where pidfds are unavailable; kept off the default executor,
+# which the render cache and storage use for short file operations
+_wait_executor = ThreadPoolExecutor(thread_name_prefix="process-wait")
+
+
+class RenderLimitExceeded(Exception):
+    """A render was stopped by its wall-clock deadline or a resource limit."""
+
+    def __init__(self, message: str, termination: str, usage: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.termination = termination
+        self.usage = usage or {}
+
+    def __reduce__(self):
+        # Keep the extra attributes when raised inside a render pool worker
+        return type(self), (str(self), self.termination, self.usage)
+
+    def report(self) -> Dict[str, Any]:
+        return {"termination": self.termination, **self.usage}
+
+
+class ProcessResult:
+    def __init__(self, returncode: int, stderr: str, termination: str, usage: Dict[str, Any]):
+        self.returncode = returncode
+        self.stderr = stderr
+        self.termination = termination
+        self.usage = usage
+
+
+def usage_from_rusage(rusage, wall_seconds: float) -> Dict[str, Any]:
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(rusage.ru_utime + rusage.ru_stime, 3),
+        # ru_maxrss is in kilobytes on Linux
+        "max_rss_mb": round(rusage.ru_maxrss / 1024, 1),
+    }
+
+
+def is_memory_error(stderr: str) -> bool:
+    return any(marker in stderr for marker in MEMORY_ERROR_MARKERS)
+
+
+def _limit_resources(pid: int, cpu_seconds: int, memory_bytes: int):
+    """Apply the rlimits to a started child.
+
+    Set from the parent with prlimit rather than a ``preexec_fn``, which is not safe
+    to run between fork and exec in a threaded server. The child runs unlimited for
+    the moment between spawn and this call.
+    """
+    if resource is None:
+        return
+    try:
+        if cpu_seconds:
+            resource.prlimit(pid, resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + CPU_LIMIT_GRACE))
+        if memory_bytes:
+            resource.prlimit(pid, resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    except ProcessLookupError:
+        pass
+
+
+def _wait_for_exit(pid: int) -> asyncio.Future:
+    """Future for ``os.wait4(pid, 0)`` that, on Linux, holds no thread while the child runs.
+
+    The loop watches a pidfd, which becomes readable once the child exits; the wait4
+    after that returns at once.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        pidfd = os.pidfd_open(pid)
+    except (AttributeError, OSError):
+        # Not Linux, or a kernel older than 5.3
+        return loop.run_in_executor(_wait_executor, os.wait4, pid, 0)
+
+    future = loop.create_future()
+
+    def on_exit():
+        loop.remove_reader(pidfd)
+        os.close(pidfd)
+        try:
+            future.set_result(os.wait4(pid, 0))
+        except OSError as e:
+            future.set_exception(e)
+
+    loop.add_reader(pidfd, on_exit)
+    return future
+
+
+def _record_exit(process: subprocess.Popen, waiter: asyncio.Future):
+    # wait4 reaped the child; give Popen its real status so it never waits on the pid itself
+    if not waiter.cancelled() and waiter.exception() is None:
+        process.returncode = os.waitstatus_to_exitcode(waiter.result()[1])
+
+
+def _kill_group(pid: int):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def run_limited(
+    cmd: List[str],
+    timeout: float = 0,
+    cpu_seconds: int = 0,
+    memory_bytes: int = 0
+) -> ProcessResult:
+    """Run ``cmd`` in its own process group under a wall-clock deadline and rlimits.
+
+    On timeout or cancellation the whole group is killed, so helpers the command
+    spawned (LaTeX, ffmpeg) die with it. The child is reaped with ``wait4`` to
+    report its own CPU time and peak memory. Zero disables a limit.
+    """
+    with tempfile.TemporaryFile() as stderr_file:
+        started = time.monotonic()
+        process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr_file,
+            process_group=0
+        )
+        _limit_resources(process.pid, cpu_seconds, memory_bytes)
+        waiter = _wait_for_exit(process.pid)
+        waiter.add_done_callback(functools.partial(_record_exit, process))
+
+        timed_out = False
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=timeout or None)
+            if not done:
+                timed_out = True
+                _kill_group(process.pid)
+            _, status, rusage = await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The waiter still reaps the killed group leader and records its status
+            _kill_group(process.pid)
+            raise
+        # Leftover grandchildren keep the group alive after the leader exits
+        _kill_group(process.pid)
+
+        stderr_file.seek(max(0, os.fstat(stderr_file.fileno()).st_size - STDERR_TAIL_BYTES))
+        stderr = stderr_file.read().decode(errors="replace")
+
+    usage = usage_from_rusage(rusage, time.monotonic() - started)
+    returncode = os.waitstatus_to_exitcode(status)
+    process.returncode = returncode
+    if timed_out:
+        termination = TERMINATION_TIMEOUT
+    elif returncode == 0:
+        termination = TERMINATION_COMPLETED
+    elif cpu_seconds and (
+        returncode == -signal.SIGXCPU or (returncode == -signal.SIGKILL and usage["cpu_seconds"] >= cpu_seconds)
+    ):
+        termination = TERMINATION_CPU_LIMIT
+    elif memory_bytes and is_memory_error(stderr):
+        termination = TERMINATION_MEMORY_LIMIT
+    elif returncode < 0:
+        termination = TERMINATION_KILLED
+    else:
+        termination = TERMINATION_FAILED
+
+    return ProcessResult(returncode, stderr, termination, usage)
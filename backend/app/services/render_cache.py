@@ -0,0 +1,254 @@
+from pathlib import Path
+from typing import Optional, Dict, Any, Sequence, List, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+from app.core.config import settings
+
+
+def link_or_copy(source: str, destination: str):
+    """Hard-link ``source`` to ``destination`` (copying across filesystems), replacing it atomically.
+
+    The mtime is refreshed: links share it with their source, and the artifact collector
+    would otherwise see a freshly materialized file as old as the cache entry it came from.
+    """
+    temp_path = f"{destination}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copy2(source, temp_path)
+    os.utime(temp_path)
+    os.replace(temp_path, destination)
+
+
+def link_tree(source: str, destination: str, exclude: Sequence[str] = ()):
+    """Hard-link every file under ``source`` into a new directory that replaces ``destination``."""
+    staging = f"{destination}.{uuid.uuid4().hex}.tmp"
+    try:
+        for root, _, names in os.walk(source):
+            target_dir = os.path.join(staging, os.path.relpath(root, source))
+            os.makedirs(target_dir, exist_ok=True)
+            for name in names:
+                if name not in exclude:
+                    link_or_copy(os.path.join(root, name), os.path.join(target_dir, name))
+        shutil.rmtree(destination, ignore_errors=True)
+        os.replace(staging, destination)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def tree_size(directory: Path) -> int:
+    size = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            try:
+                size += os.stat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                pass
+    return size
+
+
+# Written into a cached HLS directory; records the ladder the segments were cut with
+HLS_ENTRY = "entry.json"
+
+
+class RenderCache:
+    """Content-addressed cache of rendered animations.
+
+    Entries are keyed by a hash of the final Manim source plus the render flags and
+    stored as ``<key>.mp4``, ``<key>.png`` and ``<key>.json`` files, plus the packaged
+    HLS output in a ``<key>.hls`` directory when there is one. The filesystem is
+    the index: every write is an atomic rename and the video's mtime is the LRU clock,
+    so several API or worker processes can share one cache directory safely.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(manim_code: str, flags: Sequence[str]) -> str:
+        digest = hashlib.sha256()
+        digest.update(manim_code.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(" ".join(flags).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _paths(self, key: str) -> Tuple[Path, Path, Path]:
+        return (
+            self.cache_dir / f"{key}.mp4",
+            self.cache_dir / f"{key}.png",
+            self.cache_dir / f"{key}.json",
+        )
+
+    async def get(self, key: str, video_path: str, thumbnail_path: str) -> Optional[Dict[str, Any]]:
+        """Materialize a cached render at the given paths and return its metadata, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        try:
+            entry = await asyncio.to_thread(self._get, key, video_path, thumbnail_path)
+        except (OSError, ValueError):
+            # Missing or half-evicted entry (possibly removed by another process)
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def _get(self, key: str, video_path: str, thumbnail_path: str) -> Optional[Dict[str, Any]]:
+        cached_video, cached_thumbnail, cached_meta = self._paths(key)
+        if not cached_meta.exists():
+            return None
+
+        with open(cached_meta) as f:
+            entry = json.load(f)
+
+        link_or_copy(str(cached_video), video_path)
+        link_or_copy(str(cached_thumbnail), thumbnail_path)
+        os.utime(cached_video)
+        return entry
+
+    def _hls_dir(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.hls"
+
+    async def get_hls(self, key: str, hls_dir: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Link cached HLS output for ``key`` into ``hls_dir`` if it was cut with the same ladder."""
+        if not self.enabled:
+            return None
+
+        try:
+            return await asyncio.to_thread(self._get_hls, key, hls_dir, fingerprint)
+        except (OSError, ValueError):
+            return None
+
+    def _get_hls(self, key: str, hls_dir: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        cached_dir = self._hls_dir(key)
+        with open(cached_dir / HLS_ENTRY) as f:
+            entry = json.load(f)
+        if entry["fingerprint"] != fingerprint:
+            return None
+
+        link_tree(str(cached_dir), hls_dir, exclude=(HLS_ENTRY,))
+        return {**entry["hls"], "dir": hls_dir}
+
+    async def put_hls(self, key: str, hls: Dict[str, Any], fingerprint: str):
+        if not self.enabled:
+            return
+
+        async with self._lock:
+            await asyncio.to_thread(self._put_hls, key, hls, fingerprint)
+
+    def _put_hls(self, key: str, hls: Dict[str, Any], fingerprint: str):
+        if not self._paths(key)[2].exists():
+            # Evicted (or never stored) meanwhile; an orphaned directory would never be reclaimed
+            return
+
+        staging = f"{self._hls_dir(key)}.{uuid.uuid4().hex}.tmp"
+        try:
+            link_tree(hls["dir"], staging)
+            with open(os.path.join(staging, HLS_ENTRY), 'w') as f:
+                json.dump({"fingerprint": fingerprint, "hls": {k: v for k, v in hls.items() if k != "dir"}}, f)
+            shutil.rmtree(self._hls_dir(key), ignore_errors=True)
+            os.replace(staging, self._hls_dir(key))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self._evict()
+
+    async def put(self, key: str, video_path: str, thumbnail_path: str, metadata: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        async with self._lock:
+            await asyncio.to_thread(self._put, key, video_path, thumbnail_path, metadata)
+
+    def _put(self, key: str, video_path: str, thumbnail_path: str, metadata: Dict[str, Any]):
+        cached_video, cached_thumbnail, cached_meta = self._paths(key)
+        link_or_copy(video_path, str(cached_video))
+        link_or_copy(thumbnail_path, str(cached_thumbnail))
+
+        # Metadata is written last: its presence marks the entry as complete
+        temp_meta = f"{cached_meta}.{uuid.uuid4().hex}.tmp"
+        with open(temp_meta, 'w') as f:
+            json.dump(metadata, f)
+        os.replace(temp_meta, cached_meta)
+
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for meta_path in self.cache_dir.glob("*.json"):
+            key = meta_path.stem
+            size = 0
+            last_access = 0.0
+            for path in self._paths(key):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                size += stat.st_size
+                if path.suffix == ".mp4":
+                    last_access = stat.st_mtime
+            size += tree_size(self._hls_dir(key))
+            entries.append((last_access, size, key))
+        return entries
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            # Remove metadata first so concurrent readers see a miss rather than a partial entry
+            for path in reversed(self._paths(key)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            shutil.rmtree(self._hls_dir(key), ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+_render_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache(
+            os.path.join(settings.ANIMATION_OUTPUT_DIR, "render_cache"),
+            settings.RENDER_CACHE_MAX_BYTES
+        )
+    return _render_cache
@@ -0,0 +1,246 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Sequence, Tuple, Dict, Any
+import asyncio
+import importlib.util
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+
+from app.core.config import settings
+from app.services.process_limits import (
+    resource,
+    usage_from_rusage,
+    RenderLimitExceeded,
+    TERMINATION_TIMEOUT,
+    TERMINATION_CPU_LIMIT,
+    TERMINATION_MEMORY_LIMIT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Manim CLI quality flags and their equivalent config values
+QUALITY_FLAGS = {
+    "-ql": "low_quality",
+    "-qm": "medium_quality",
+    "-qh": "high_quality",
+    "-qp": "production_quality",
+    "-qk": "fourk_quality",
+}
+
+# Output sub-directory Manim uses for each quality ("{pixel_height}p{frame_rate}")
+QUALITY_DIRS = {
+    "-ql": "480p15",
+    "-qm": "720p30",
+    "-qh": "1080p60",
+    "-qp": "1440p60",
+    "-qk": "2160p60",
+}
+
+
+def expected_movie_path(media_dir: str, script_path: str, scene_name: str, flags: Sequence[str]) -> str:
+    """Where Manim writes the final movie: ``<media_dir>/videos/<script stem>/<quality>/<Scene>.mp4``."""
+    quality_dir = next((QUALITY_DIRS[flag] for flag in flags if flag in QUALITY_DIRS), QUALITY_DIRS["-ql"])
+    module_name = os.path.splitext(os.path.basename(script_path))[0]
+    return os.path.join(media_dir, "videos", module_name, quality_dir, f"{scene_name}.mp4")
+
+
+class RenderPoolUnavailable(Exception):
+    """The warm pool cannot render right now; callers should fall back to the manim CLI."""
+
+
+class _LimitReached(BaseException):
+    # A BaseException so that scene code catching Exception cannot swallow it
+    def __init__(self, termination: str):
+        super().__init__(termination)
+        self.termination = termination
+
+
+def _raise_limit(termination: str):
+    def handler(signum, frame):
+        raise _LimitReached(termination)
+    return handler
+
+
+def _init_worker():
+    # Pay for the heavy imports (numpy, cairo, pango, moderngl) once per worker, not per render
+    import manim  # noqa: F401
+
+    if resource is not None and settings.RENDER_MEMORY_MB:
+        # Caps the whole worker process, which is then recycled as usual
+        limit = settings.RENDER_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _render_scene(
+    script_path: str,
+    scene_name: str,
+    media_dir: str,
+    quality: str,
+    timeout: float,
+    cpu_seconds: int
+) -> Tuple[str, Dict[str, Any]]:
+    """Render ``scene_name`` from ``script_path`` in-process; return the movie file path and resource usage.
+
+    The deadline and CPU budget are enforced with SIGALRM and a raised soft RLIMIT_CPU,
+    both of which interrupt the scene between Python bytecodes.
+    """
+    started = time.monotonic()
+    before = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+    previous_cpu_limit = None
+
+    def usage() -> Dict[str, Any]:
+        if before is None:
+            return {"wall_seconds": round(time.monotonic() - started, 3), "runner": "pool"}
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        result = usage_from_rusage(after, time.monotonic() - started)
+        result["cpu_seconds"] = round(result["cpu_seconds"] - before.ru_utime - before.ru_stime, 3)
+        return {**result, "runner": "pool"}
+
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_limit(TERMINATION_TIMEOUT))
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    if cpu_seconds and resource is not None:
+        signal.signal(signal.SIGXCPU, _raise_limit(TERMINATION_CPU_LIMIT))
+        previous_cpu_limit = resource.getrlimit(resource.RLIMIT_CPU)
+        used = before.ru_utime + before.ru_stime
+        resource.setrlimit(resource.RLIMIT_CPU, (math.ceil(used) + cpu_seconds, previous_cpu_limit[1]))
+
+    try:
+        from manim import tempconfig
+        from manim.constants import QUALITIES
+
+        with open(script_path) as f:
+            source = f.read()
+
+        namespace = {"__name__": os.path.splitext(os.path.basename(script_path))[0]}
+        exec(compile(source, script_path, "exec"), namespace)
+
+        # tempconfig only applies keys stored in the config dict, so expand the quality preset
+        preset = QUALITIES[quality]
+        with tempconfig({
+            "input_file": script_path,
+            "media_dir": media_dir,
+            "pixel_height": preset["pixel_height"],
+            "pixel_width": preset["pixel_width"],
+            "frame_rate": preset["frame_rate"],
+            "progress_bar": "none",
+            "verbosity": "WARNING",
+        }):
+            scene = namespace[scene_name]()
+            scene.render()
+            return str(scene.renderer.file_writer.movie_file_path), usage()
+    except _LimitReached as e:
+        raise RenderLimitExceeded(f"Manim rendering stopped: {e.termination}", e.termination, usage()) from None
+    except MemoryError:
+        raise RenderLimitExceeded(
+            f"Manim rendering stopped: {TERMINATION_MEMORY_LIMIT}", TERMINATION_MEMORY_LIMIT, usage()
+        ) from None
+    except Exception as e:
+        # Re-raise as a plain, always-picklable exception carrying the scene traceback
+        raise RuntimeError(f"Manim rendering failed: {e}\n{traceback.format_exc()}") from None
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        if previous_cpu_limit is not None:
+            resource.setrlimit(resource.RLIMIT_CPU, previous_cpu_limit)
+
+
+def default_pool_size() -> int:
+    return settings.RENDER_POOL_SIZE or max(1, (os.cpu_count() or 2) - 1)
+
+
+class RenderPool:
+    """Process pool of pre-imported Manim renderers.
+
+    Workers are recycled after ``RENDER_POOL_RECYCLE_AFTER`` renders to bound memory
+    growth from Manim/cairo leaks. A broken pool is rebuilt and the render reported as
+    unavailable so the caller can fall back to the CLI.
+    """
+
+    def __init__(self, size: int, recycle_after: int):
+        self.size = size
+        self.recycle_after = recycle_after
+        self.renders = 0
+        self.fallbacks = 0
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            max_tasks_per_child=self.recycle_after or None
+        )
+
+    async def warm_up(self):
+        """Start every worker now so the first render does not pay the import cost."""
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*[loop.run_in_executor(self._executor, _ping) for _ in range(self.size)])
+        except BrokenProcessPool:
+            logger.warning("Manim render pool failed to start; renders will use the manim CLI")
+
+    async def render(
+        self,
+        script_path: str,
+        scene_name: str,
+        media_dir: str,
+        flags: Sequence[str],
+        timeout: float = 0
+    ) -> Tuple[str, Dict[str, Any]]:
+        quality = next((QUALITY_FLAGS[flag] for flag in flags if flag in QUALITY_FLAGS), "low_quality")
+        loop = asyncio.get_running_loop()
+
+        try:
+            movie_path, usage = await loop.run_in_executor(
+                self._executor, _render_scene, script_path, scene_name, media_dir, quality,
+                timeout, settings.RENDER_CPU_SECONDS
+            )
+        except BrokenProcessPool:
+            self.fallbacks += 1
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            raise RenderPoolUnavailable("Manim render worker died")
+
+        self.renders += 1
+        return movie_path, usage
+
+    def stats(self):
+        return {"size": self.size, "renders": self.renders, "fallbacks": self.fallbacks}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_render_pool: Optional[RenderPool] = None
+
+
+def get_render_pool() -> Optional[RenderPool]:
+    """Return the shared render pool, or None when disabled or Manim is not importable here."""
+    global _render_pool
+    if _render_pool is None:
+        if not settings.RENDER_POOL_ENABLED or importlib.util.find_spec("manim") is None:
+            return None
+        _render_pool = RenderPool(default_pool_size(), settings.RENDER_POOL_RECYCLE_AFTER)
+    return _render_pool
+
+
+async def start_render_pool():
+    render_pool = get_render_pool()
+    if render_pool is not None:
+        await render_pool.warm_up()
+
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
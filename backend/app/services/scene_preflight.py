@@ -0,0 +1,203 @@
+from typing import Optional, List, Set, Dict, Any
+import ast
+import builtins
+import logging
+import re
+import textwrap
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Manim's defaults for self.wait() and an animation's run_time
+DEFAULT_WAIT_SECONDS = 1.0
+DEFAULT_RUN_TIME = 1.0
+
+# The renderers look the scene up by this name
+SCENE_CLASS = "WhiteboardAnimation"
+
+DISALLOWED_CALLS = {"__import__", "eval", "exec", "compile", "open", "breakpoint", "input"}
+
+CODE_FENCE = re.compile(r"```[\w+-]*\n(.*?)```", re.DOTALL)
+
+_manim_names: Optional[Set[str]] = None
+
+
+def strip_code_fences(text: str) -> str:
+    """Return the first fenced code block in ``text``, or ``text`` itself when there is none."""
+    match = CODE_FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def extract_construct_body(manim_code: str) -> Optional[str]:
+    """Return the dedented body of the first ``construct`` method in ``manim_code``.
+
+    Returns None when the code does not parse or defines no ``construct`` method.
+    Comments and blank lines inside the body are preserved.
+    """
+    source = strip_code_fences(manim_code)
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "construct":
+            first = node.body[0]
+            if first.lineno == node.lineno:
+                # One-line method: def construct(self): self.play(...)
+                return "\n".join(ast.get_source_segment(source, statement) for statement in node.body)
+
+            lines = source.splitlines()
+            start = first.lineno - 1
+            # Keep comments directly above the first statement
+            while start > node.lineno and lines[start - 1].strip().startswith("#"):
+                start -= 1
+            return textwrap.dedent("\n".join(lines[start:node.body[-1].end_lineno]))
+    return None
+
+
+def manim_names() -> Optional[Set[str]]:
+    """Names exported by ``from manim import *``, or None when manim is not importable here."""
+    global _manim_names
+    if _manim_names is None:
+        try:
+            import manim
+        except ImportError:
+            logger.debug("manim is not importable; skipping the unknown-name preflight check")
+            return None
+        _manim_names = set(getattr(manim, "__all__", None) or dir(manim))
+    return _manim_names
+
+
+def allowed_imports() -> Set[str]:
+    return {name.strip() for name in settings.SCENE_ALLOWED_IMPORTS.split(",") if name.strip()}
+
+
+def _defined_names(tree: ast.AST) -> Set[str]:
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            names.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+        elif isinstance(node, ast.arg):
+            names.add(node.arg)
+        elif isinstance(node, ast.alias):
+            names.add((node.asname or node.name).split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            names.add(node.name)
+    return names
+
+
+def _number(node: Optional[ast.AST], default: float) -> float:
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+        return float(node.value)
+    return default
+
+
+def _range_length(node: ast.AST) -> int:
+    # for ... in range(<constants>); anything else is counted as a single iteration
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "range":
+        args = [arg.value for arg in node.args if isinstance(arg, ast.Constant) and isinstance(arg.value, int)]
+        if len(args) == len(node.args) and args:
+            return max(len(range(*args)), 0)
+    return 1
+
+
+def _self_call(node: ast.AST, method: str) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == method
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+    )
+
+
+def _statements_duration(statements: List[ast.stmt]) -> float:
+    return sum(_statement_duration(statement) for statement in statements)
+
+
+def _statement_duration(statement: ast.stmt) -> float:
+    if isinstance(statement, ast.For):
+        return _range_length(statement.iter) * _statements_duration(statement.body) + _statements_duration(statement.orelse)
+    if isinstance(statement, ast.While):
+        return _statements_duration(statement.body)
+    if isinstance(statement, ast.If):
+        return max(_statements_duration(statement.body), _statements_duration(statement.orelse))
+    if isinstance(statement, (ast.With, ast.Try)):
+        return _statements_duration(statement.body)
+
+    duration = 0.0
+    for node in ast.walk(statement):
+        if _self_call(node, "wait"):
+            duration += _number(node.args[0] if node.args else next(
+                (kw.value for kw in node.keywords if kw.arg == "duration"), None
+            ), DEFAULT_WAIT_SECONDS)
+        elif _self_call(node, "play"):
+            duration += _number(next((kw.value for kw in node.keywords if kw.arg == "run_time"), None), DEFAULT_RUN_TIME)
+    return duration
+
+
+def estimate_duration(manim_code: str) -> float:
+    """Estimate the length of the scene from its ``self.wait`` and ``self.play`` calls."""
+    tree = ast.parse(manim_code)
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "construct":
+            return _statements_duration(node.body)
+    return 0.0
+
+
+def preflight_scene(manim_code: str) -> Dict[str, Any]:
+    """Check a final scene without rendering it.
+
+    Returns ``{"problems": [...], "estimated_duration": seconds}``; an empty problem list
+    means the scene compiles, defines the ``SCENE_CLASS`` scene, imports only allowed
+    modules, references only known names and fits within ``MAX_ANIMATION_DURATION``.
+    """
+    try:
+        tree = ast.parse(manim_code)
+        compile(tree, "scene.py", "exec")
+    except SyntaxError as e:
+        return {"problems": [f"SyntaxError on line {e.lineno}: {e.msg}"], "estimated_duration": None}
+
+    problems = []
+    scene = next((node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == SCENE_CLASS), None)
+    if scene is None or not any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "construct" for node in scene.body
+    ):
+        problems.append(f"The script must define `class {SCENE_CLASS}(Scene)` with a `construct(self)` method")
+
+    allowed = allowed_imports()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        else:
+            modules = []
+        for module in modules:
+            if module.split(".")[0] not in allowed:
+                problems.append(f"Line {node.lineno}: import of '{module}' is not allowed")
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in DISALLOWED_CALLS:
+            problems.append(f"Line {node.lineno}: call to '{node.func.id}' is not allowed")
+
+    known_names = manim_names()
+    if known_names is not None:
+        defined = _defined_names(tree) | known_names | set(dir(builtins))
+        unknown = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load) and node.id not in defined:
+                unknown.setdefault(node.id, node.lineno)
+        for name, lineno in sorted(unknown.items(), key=lambda item: item[1]):
+            problems.append(f"Line {lineno}: unknown name '{name}'")
+
+    estimated_duration = estimate_duration(manim_code)
+    if estimated_duration > settings.MAX_ANIMATION_DURATION:
+        problems.append(
+            f"Estimated duration {estimated_duration:.0f}s exceeds the {settings.MAX_ANIMATION_DURATION}s limit"
+        )
+
+    return {"problems": problems, "estimated_duration": estimated_duration}
@@ -0,0 +1,95 @@
+from typing import Dict, List, Optional, Tuple
+import ast
+
+
+def _is_self_call(node: ast.AST, method: str) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == method
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "self"
+    )
+
+
+def _animates(statement: ast.stmt) -> bool:
+    return any(_is_self_call(node, "play") or _is_self_call(node, "wait") for node in ast.walk(statement))
+
+
+def _section_layout(manim_code: str) -> Tuple[List[str], int, str, List[int], Dict[int, Optional[str]]]:
+    """Locate the construct body and the lines after which a new section starts.
+
+    Sections are split after every top-level ``self.wait(...)`` statement (the natural
+    pauses in a whiteboard animation) that is followed by more animation, and where the
+    script calls ``self.next_section()`` itself. Those calls must go: each would start a
+    section that is encoded whichever section is being rendered.
+    Returns ``(lines, first_body_line, body_indent, boundary_lines, rewrites)``, where
+    ``rewrites`` maps line numbers to their replacement (None drops the line).
+    """
+    lines = manim_code.split('\n')
+    try:
+        tree = ast.parse(manim_code)
+    except SyntaxError:
+        return lines, -1, "", [], {}
+
+    construct = next(
+        (
+            node for node in ast.walk(tree)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name == "construct"
+        ),
+        None
+    )
+    # A one-line method has no body lines to put markers between
+    if construct is None or construct.body[0].lineno == construct.lineno:
+        return lines, -1, "", [], {}
+
+    body = construct.body
+    first_body_line = body[0].lineno - 1
+    body_indent = lines[first_body_line][:body[0].col_offset]
+
+    boundaries = set()
+    for position, statement in enumerate(body):
+        # A section with nothing animated after its start would only be empty
+        if not any(_animates(later) for later in body[position + 1:]):
+            continue
+        if isinstance(statement, ast.Expr) and _is_self_call(statement.value, "wait"):
+            boundaries.add(statement.end_lineno - 1)
+        elif isinstance(statement, ast.Expr) and _is_self_call(statement.value, "next_section") and position > 0:
+            boundaries.add(statement.lineno - 2)
+
+    rewrites: Dict[int, Optional[str]] = {}
+    for node in ast.walk(construct):
+        if isinstance(node, ast.Expr) and _is_self_call(node.value, "next_section"):
+            # ``pass`` keeps a block that held only the call valid
+            rewrites[node.lineno - 1] = lines[node.lineno - 1][:node.col_offset] + "pass"
+            for line in range(node.lineno, node.end_lineno):
+                rewrites[line] = None
+    return lines, first_body_line, body_indent, sorted(boundaries), rewrites
+
+
+def section_count(manim_code: str) -> int:
+    return len(_section_layout(manim_code)[3]) + 1
+
+
+def section_script(manim_code: str, index: int) -> str:
+    """Return ``manim_code`` instrumented so that only section ``index`` is encoded.
+
+    The other sections still execute with ``skip_animations=True``, so Manim jumps
+    straight to their end state and the scene is correct when section ``index`` starts.
+    """
+    lines, first_body_line, body_indent, boundaries, rewrites = _section_layout(manim_code)
+    if first_body_line < 0:
+        return manim_code
+
+    def marker(number: int) -> str:
+        return f'{body_indent}self.next_section("section_{number}", skip_animations={number != index})'
+
+    instrumented = lines[:first_body_line] + [marker(0)]
+    number = 1
+    for i in range(first_body_line, len(lines)):
+        if rewrites.get(i, lines[i]) is not None:
+            instrumented.append(rewrites.get(i, lines[i]))
+        if i in boundaries:
+            instrumented.append(marker(number))
+            number += 1
+    return '\n'.join(instrumented)
@@ -0,0 +1,108 @@
+from typing import Dict, Any, List, Optional, Callable, Awaitable, AsyncIterator, Tuple, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class _SharedStream:
+    """Chunks produced so far by one in-flight stream, replayed to every consumer."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Event()
+        # The loop only keeps weak references to tasks; this one must outlive its creator
+        self.producer: Optional[asyncio.Task] = None
+
+    def notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+
+class SingleFlight:
+    """Collapse concurrent identical work into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving while it is
+    still in flight wait on the same task instead of repeating it. The task is shielded,
+    so one cancelled caller never cancels the work for the others. Coalescing is per
+    process: it complements, rather than replaces, the shared caches.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executions = 0
+        self.coalesced = 0
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Return ``fn()``'s result and whether it was shared from another caller's execution."""
+        task = self._calls.get(key)
+        coalesced = task is not None
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget_call(key, done))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task), coalesced
+
+    def _forget_call(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller has gone away
+            task.exception()
+
+    def stream(self, key: str, factory: Callable[[], AsyncIterator[T]]) -> Tuple[AsyncIterator[T], bool]:
+        """Like :meth:`do` for async iterators: late joiners replay the chunks already produced."""
+        shared = self._streams.get(key)
+        coalesced = shared is not None
+        if shared is None:
+            shared = _SharedStream()
+            self._streams[key] = shared
+            shared.producer = asyncio.create_task(self._produce(key, shared, factory))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return self._consume(shared), coalesced
+
+    async def _produce(self, key: str, shared: _SharedStream, factory: Callable[[], AsyncIterator[T]]):
+        try:
+            async for chunk in factory():
+                shared.chunks.append(chunk)
+                shared.notify()
+        except Exception as e:
+            shared.error = e
+        finally:
+            shared.done = True
+            shared.notify()
+            if self._streams.get(key) is shared:
+                del self._streams[key]
+
+    async def _consume(self, shared: _SharedStream) -> AsyncIterator[T]:
+        sent = 0
+        while True:
+            while sent < len(shared.chunks):
+                yield shared.chunks[sent]
+                sent += 1
+            if shared.done:
+                if shared.error is not None:
+                    raise shared.error
+                return
+            await shared.changed.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.executions + self.coalesced
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": self.coalesced / requests if requests else 0.0,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
+
+
+llm_flight = SingleFlight("llm")
+render_flight = SingleFlight("render")
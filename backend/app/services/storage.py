@@ -0,0 +1,199 @@
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
+import asyncio
+import mimetypes
+import os
+
+from fastapi import Request
+from fastapi.responses import Response, RedirectResponse
+
+from app.core.config import settings
+from app.services.file_delivery import Artifact, artifact_response, load_artifact, IMMUTABLE_CACHE_CONTROL
+
+STORAGE_LOCAL = "local"
+STORAGE_S3 = "s3"
+
+# Served through the API even from remote storage: playlists are tiny, and their
+# relative segment URIs must resolve against the API rather than a presigned URL
+INLINE_MEDIA_TYPES = {"application/vnd.apple.mpegurl"}
+
+MEDIA_TYPES = {
+    ".mp4": "video/mp4",
+    ".png": "image/png",
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+
+def storage_key(path: str) -> str:
+    """Location of ``path`` relative to ``ANIMATION_OUTPUT_DIR``; the same on every machine."""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(settings.ANIMATION_OUTPUT_DIR))
+    if relative.startswith(".."):
+        raise ValueError(f"{path} is outside ANIMATION_OUTPUT_DIR")
+    return Path(relative).as_posix()
+
+
+def directory_files(directory: str) -> List[str]:
+    return [os.path.join(root, name) for root, _, names in os.walk(directory) for name in names]
+
+
+class LocalStorage:
+    """Artifacts stay where the renderer wrote them and are streamed by the API."""
+
+    name = STORAGE_LOCAL
+
+    async def save(self, paths: Iterable[str]):
+        pass
+
+    async def open_artifact(self, path: str, media_type: str, filename: str, sha256: Optional[str] = None) -> Artifact:
+        return await load_artifact(path, media_type, filename, sha256=sha256)
+
+    async def response(self, request: Request, artifact: Artifact) -> Response:
+        return artifact_response(request, artifact)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+
+class S3Storage:
+    """Artifacts uploaded to an S3-compatible bucket and downloaded straight from it.
+
+    The renderer uploads each file (multipart above ``S3_MULTIPART_THRESHOLD_MB``) and
+    the API answers downloads with a redirect to a presigned URL, so video bytes never
+    pass through the app. ``S3_ENDPOINT_URL`` points it at MinIO or another stand-in.
+    """
+
+    name = STORAGE_S3
+
+    def __init__(self):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+
+        if not settings.S3_BUCKET:
+            raise Exception("S3_BUCKET must be set when STORAGE_BACKEND is s3")
+
+        self.bucket = settings.S3_BUCKET
+        self.prefix = settings.S3_PREFIX
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * 1024 * 1024,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024
+        )
+        self.uploads = 0
+        self.uploaded_bytes = 0
+        self.redirects = 0
+        self.deleted_objects = 0
+
+    def object_key(self, path: str) -> str:
+        return self.prefix + storage_key(path)
+
+    async def save(self, paths: Iterable[str]):
+        await asyncio.gather(*[asyncio.to_thread(self._upload, path) for path in paths])
+
+    def _upload(self, path: str):
+        media_type = MEDIA_TYPES.get(os.path.splitext(path)[1]) or mimetypes.guess_type(path)[0]
+        self.client.upload_file(
+            path,
+            self.bucket,
+            self.object_key(path),
+            ExtraArgs={
+                "ContentType": media_type or "application/octet-stream",
+                "CacheControl": IMMUTABLE_CACHE_CONTROL,
+            },
+            Config=self.transfer_config
+        )
+        self.uploads += 1
+        self.uploaded_bytes += os.path.getsize(path)
+
+    async def open_artifact(self, path: str, media_type: str, filename: str, sha256: Optional[str] = None) -> Artifact:
+        # The bucket serves ranges and validators itself; only check the object is there, so a
+        # missing one is the API's 404 rather than a redirect to the bucket's error page
+        size = await asyncio.to_thread(self._head, self.object_key(path))
+        return Artifact(path, media_type, filename, size, f'"{sha256}"' if sha256 else "", storage=self.name)
+
+    def _head(self, key: str) -> int:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(key) from None
+            raise
+
+    async def response(self, request: Request, artifact: Artifact) -> Response:
+        key = self.object_key(artifact.path)
+        if artifact.media_type in INLINE_MEDIA_TYPES:
+            body = await asyncio.to_thread(self._read, key)
+            return Response(body, media_type=artifact.media_type, headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseContentType": artifact.media_type,
+                "ResponseContentDisposition": f'inline; filename="{artifact.filename}"',
+            },
+            ExpiresIn=settings.S3_PRESIGN_EXPIRES
+        )
+        self.redirects += 1
+        return RedirectResponse(url, status_code=307)
+
+    def list_objects(self) -> Iterator[Tuple[str, float]]:
+        """Storage key and last-modified timestamp of every object under ``S3_PREFIX``."""
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix):], obj["LastModified"].timestamp()
+
+    def delete_objects(self, keys: List[str]):
+        # DeleteObjects takes at most 1000 keys per request
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": self.prefix + key} for key in keys[start:start + 1000]], "Quiet": True}
+            )
+        self.deleted_objects += len(keys)
+
+    def _read(self, key: str) -> bytes:
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(key) from None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "bucket": self.bucket,
+            "uploads": self.uploads,
+            "uploaded_bytes": self.uploaded_bytes,
+            "redirects": self.redirects,
+            "deleted_objects": self.deleted_objects,
+        }
+
+
+_storages: Dict[str, Any] = {}
+
+
+def get_storage(name: Optional[str] = None):
+    """Return the backend called ``name``; the configured ``STORAGE_BACKEND`` by default.
+
+    Rows remember which backend holds their artifacts, so files written before a
+    switch of backend keep being served from where they are.
+    """
+    name = name or settings.STORAGE_BACKEND
+    if name not in _storages:
+        if name == STORAGE_S3:
+            _storages[name] = S3Storage()
+        elif name == STORAGE_LOCAL:
+            _storages[name] = LocalStorage()
+        else:
+            raise Exception(f"Unknown storage backend: {name}")
+    return _storages[name]
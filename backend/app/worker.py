@@ -0,0 +1,157 @@
+"""Standalone job worker: ``python -m app.worker [--concurrency N]``.
+
+Pulls explanation and animation jobs from the durable job queue so renders can be
+scaled horizontally, independently of the API tier.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.database import init_db
+from app.models.job import Job, JobKind
+from app.services.job_queue import job_queue
+from app.services.artifact_gc import artifact_gc
+from app.services.llm_pool import init_llm_pool, close_llm_pool
+from app.services.render_pool import start_render_pool, shutdown_render_pool
+
+logger = logging.getLogger("app.worker")
+
+
+def _job_handlers():
+    # Imported lazily: the handlers live next to the endpoints that enqueue them
+    from app.api.endpoints.explanations import process_explanation
+    from app.api.endpoints.animations import generate_animation, upgrade_animation
+
+    return {
+        JobKind.EXPLANATION: process_explanation,
+        JobKind.ANIMATION: generate_animation,
+        JobKind.ANIMATION_UPGRADE: upgrade_animation,
+    }
+
+
+class Worker:
+    def __init__(self, concurrency: int, worker_id: str):
+        self.concurrency = concurrency
+        self.worker_id = worker_id
+        self.handlers = _job_handlers()
+        self.llm_pool = None
+        self._running = set()
+        self._stopping = asyncio.Event()
+        self._last_sweep = 0.0
+
+    def stop(self):
+        self._stopping.set()
+
+    async def run(self):
+        await init_db()
+        self.llm_pool = await init_llm_pool()
+        await start_render_pool()
+        # Renders, local copies of uploads and crashed workspaces accumulate on this machine too
+        artifact_gc.start(remote=False)
+
+        requeued = await job_queue.requeue_expired()
+        logger.info("Worker %s started (concurrency=%d, requeued %d expired jobs)", self.worker_id, self.concurrency, requeued)
+
+        try:
+            while not self._stopping.is_set():
+                await self._sweep_expired()
+                free_slots = self.concurrency - len(self._running)
+                jobs = await job_queue.claim(self.worker_id, free_slots) if free_slots > 0 else []
+
+                for job in jobs:
+                    task = asyncio.create_task(self._execute(job))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+
+                if not jobs:
+                    await self._wait_for_capacity()
+
+            # Graceful shutdown: finish in-flight jobs, claim nothing new
+            if self._running:
+                await asyncio.gather(*self._running, return_exceptions=True)
+        finally:
+            await artifact_gc.stop()
+            await close_llm_pool()
+            shutdown_render_pool()
+
+    async def _sweep_expired(self):
+        # Jobs whose final attempt died with its worker are never claimed again; fail them here
+        if time.monotonic() - self._last_sweep < settings.JOB_HEARTBEAT_INTERVAL:
+            return
+        self._last_sweep = time.monotonic()
+        try:
+            failed = await job_queue.fail_expired()
+        except Exception:
+            logger.exception("Failed to sweep expired jobs")
+            return
+        if failed:
+            logger.warning("Failed %d jobs whose last attempt lost its lease", failed)
+
+    async def _wait_for_capacity(self):
+        waiters = [asyncio.create_task(self._stopping.wait())]
+        if self._running:
+            waiters.append(asyncio.create_task(asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)))
+
+        done, pending = await asyncio.wait(waiters, timeout=settings.JOB_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in pending:
+            waiter.cancel()
+
+    async def _execute(self, job: Job):
+        handler = self.handlers[job.kind]
+        # Handlers record failures on their row themselves and return the error; only the
+        # last attempt marks the row failed, earlier ones leave it for the retry
+        final_attempt = job.attempts >= job.max_attempts
+        work = asyncio.create_task(handler(job.target_id, self.llm_pool, priority=job.priority, final_attempt=final_attempt))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work))
+
+        try:
+            error = await work
+            if error:
+                logger.warning("Job %s failed (attempt %d of %d): %s", job.id, job.attempts, job.max_attempts, error)
+                await job_queue.fail(job.id, self.worker_id, error)
+            else:
+                await job_queue.complete(job.id, self.worker_id)
+        except asyncio.CancelledError:
+            logger.warning("Job %s cancelled after losing its lease", job.id)
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            await job_queue.fail(job.id, self.worker_id, str(e))
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job: Job, work: asyncio.Task):
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL)
+            if not await job_queue.heartbeat(job.id, self.worker_id):
+                # Another worker reclaimed the job; stop duplicating its work
+                work.cancel()
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a whiteboard teaching job worker")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY)
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=settings.LOG_LEVEL.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    worker = Worker(args.concurrency, args.worker_id)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+        await worker.run()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
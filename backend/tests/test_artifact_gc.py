@@ -0,0 +1,56 @@
+import os
+
+from app.services.artifact_gc import ArtifactGC
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x" * size)
+
+
+def _scan(root):
+    gc = ArtifactGC()
+    gc.root = str(root)
+    return gc._scan()
+
+
+def test_units_are_files_and_artifact_directories(tmp_path):
+    _write(tmp_path / "anim_1.mp4", 10)
+    _write(tmp_path / "hls" / "anim_1" / "index.m3u8", 1)
+    _write(tmp_path / "hls" / "anim_1" / "seg0.ts", 5)
+    _write(tmp_path / "render_cache" / "abc.mp4", 100)
+    _write(tmp_path / "work" / "tmp.py", 100)
+
+    units, inodes = _scan(tmp_path)
+    assert set(units) == {str(tmp_path / "anim_1.mp4"), str(tmp_path / "hls" / "anim_1")}
+    assert inodes.usage() == 16
+
+
+def test_shared_inode_is_freed_with_its_last_link(tmp_path):
+    _write(tmp_path / "anim_1.mp4", 10)
+    os.link(tmp_path / "anim_1.mp4", tmp_path / "anim_2.mp4")
+
+    units, inodes = _scan(tmp_path)
+    # Counted once, however many units link to it
+    assert inodes.usage() == 10
+
+    table = inodes.copy()
+    assert table.release(units[str(tmp_path / "anim_1.mp4")]) == 0
+    assert table.usage() == 10
+    assert table.release(units[str(tmp_path / "anim_2.mp4")]) == 10
+    assert table.usage() == 0
+
+    # Releases on a copy leave the scanned table alone
+    assert inodes.usage() == 10
+
+
+def test_inode_linked_from_the_render_cache_is_pinned(tmp_path):
+    _write(tmp_path / "render_cache" / "abc.mp4", 10)
+    os.link(tmp_path / "render_cache" / "abc.mp4", tmp_path / "anim_1.mp4")
+    _write(tmp_path / "anim_2.mp4", 3)
+
+    units, inodes = _scan(tmp_path)
+    assert inodes.usage() == 3
+    assert inodes.release(units[str(tmp_path / "anim_1.mp4")]) == 0
+    assert inodes.release(units[str(tmp_path / "anim_2.mp4")]) == 3
@@ -0,0 +1,45 @@
+from app.services.file_delivery import MAX_RANGES, parse_range_header, etag_matches
+
+
+def test_single_ranges():
+    assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+    assert parse_range_header("bytes=900-", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+
+
+def test_ranges_are_clamped_to_the_file():
+    assert parse_range_header("bytes=900-5000", 1000) == [(900, 999)]
+    assert parse_range_header("bytes=-5000", 1000) == [(0, 999)]
+
+
+def test_unsatisfiable_ranges_give_an_empty_list():
+    assert parse_range_header("bytes=1000-1100", 1000) == []
+    assert parse_range_header("bytes=-0", 1000) == []
+
+
+def test_invalid_headers_are_ignored():
+    assert parse_range_header("items=0-1", 1000) is None
+    assert parse_range_header("bytes=", 1000) is None
+    assert parse_range_header("bytes=5", 1000) is None
+    assert parse_range_header("bytes=a-b", 1000) is None
+    assert parse_range_header("bytes=50-10", 1000) is None
+
+
+def test_too_many_ranges_are_ignored():
+    header = "bytes=" + ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(MAX_RANGES + 1))
+    assert parse_range_header(header, 10000) is None
+
+
+def test_overlapping_and_adjacent_ranges_are_coalesced():
+    assert parse_range_header("bytes=0-99,50-149", 1000) == [(0, 149)]
+    assert parse_range_header("bytes=0-99,100-199", 1000) == [(0, 199)]
+    assert parse_range_header("bytes=500-599,0-99", 1000) == [(0, 99), (500, 599)]
+    assert parse_range_header("bytes=0-499,100-199", 1000) == [(0, 499)]
+
+
+def test_etag_matching_is_weak():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('"x", "abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
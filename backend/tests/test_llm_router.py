@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services.llm_router import BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN, LLMRouter, LLMTarget
+from app.services.llm_service import LLMAPIError
+
+
+@pytest.fixture(autouse=True)
+def router_settings(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_FAILURES", 2)
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 0.0)
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(settings, "LLM_HEDGE_MIN_DELAY", 0.01)
+    monkeypatch.setattr(settings, "LLM_HEDGE_PERCENTILE", 95.0)
+
+
+def _target(name, latency=None, model=None):
+    target = LLMTarget(name, f"http://{name}", model)
+    if latency is not None:
+        for _ in range(settings.LLM_HEDGE_MIN_SAMPLES):
+            target.record("call", latency, True)
+    return target
+
+
+def test_breaker_opens_after_consecutive_failures(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 60.0)
+    target = _target("a")
+    target.record("call", 1.0, False)
+    assert target.breaker == BREAKER_CLOSED
+    target.record("call", 1.0, False)
+    assert target.breaker == BREAKER_OPEN
+    assert not target.available(target.opened_at + 1)
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    target = _target("a")
+    target.record("call", 1.0, False)
+    target.record("call", 1.0, False)
+    assert target.available(target.opened_at)
+    assert target.breaker == BREAKER_HALF_OPEN
+
+    target.probing = True
+    assert not target.available(target.opened_at)
+    target.probing = False
+
+    # A failed probe opens the breaker again at once; a successful one closes it
+    target.record("call", 1.0, False)
+    assert target.breaker == BREAKER_OPEN
+    target.available(target.opened_at)
+    target.record("call", 1.0, True)
+    assert target.breaker == BREAKER_CLOSED
+
+
+def test_candidates_rank_targets_serving_the_model_first():
+    pinned = _target("pinned", latency=0.1, model="other")
+    slow = _target("slow", latency=2.0)
+    fast = _target("fast", latency=0.5)
+    router = LLMRouter([pinned, slow, fast])
+    assert [target.name for target in router.candidates("model", "call")] == ["fast", "slow", "pinned"]
+
+
+def test_candidates_fail_open_when_every_breaker_is_open(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BREAKER_COOLDOWN", 60.0)
+    first, second = _target("first"), _target("second")
+    for target in (second, first):
+        target.record("call", 1.0, False)
+        target.record("call", 1.0, False)
+    assert [target.name for target in LLMRouter([first, second]).candidates("model", "call")] == ["second"]
+
+
+def test_candidates_require_a_target():
+    with pytest.raises(LLMAPIError):
+        LLMRouter([]).candidates("model", "call")
+
+
+def test_slow_target_is_hedged():
+    slow, fast = _target("slow", latency=0.01), _target("fast", latency=0.5)
+    router = LLMRouter([slow, fast])
+
+    async def attempt(target, model):
+        if target is slow:
+            await asyncio.sleep(5)
+        return target.name
+
+    assert asyncio.run(router.call("model", attempt)) == "fast"
+    assert (router.hedges, router.hedge_wins, router.failovers) == (1, 1, 0)
+
+
+def test_failed_target_fails_over():
+    broken, backup = _target("broken", latency=0.01), _target("backup", latency=0.5)
+    router = LLMRouter([broken, backup])
+
+    async def attempt(target, model):
+        if target is broken:
+            raise LLMAPIError("unavailable", model=model, status_code=503, retryable=True)
+        return target.name
+
+    assert asyncio.run(router.call("model", attempt)) == "backup"
+    assert router.failovers == 1
+    assert broken.failures == 1
+
+
+def test_rejected_request_does_not_fail_over():
+    first, second = _target("first", latency=0.01), _target("second", latency=0.5)
+    router = LLMRouter([first, second])
+
+    async def attempt(target, model):
+        raise LLMAPIError("bad request", model=model, status_code=400)
+
+    with pytest.raises(LLMAPIError):
+        asyncio.run(router.call("model", attempt))
+    assert router.failovers == 0
+    assert first.failures == 0
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete, select
+from sqlalchemy.orm import Session as OrmSession
+
+from app.core.database import Base
+from app.core.pagination import decode_cursor, encode_cursor, paginate
+from app.models.session import Session
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with OrmSession(engine) as session:
+        # Several rows share a timestamp, so the id must break ties
+        stamps = [datetime(2024, 1, 1, tzinfo=timezone.utc)] * 3 + [datetime(2024, 1, 2, tzinfo=timezone.utc)] * 2
+        for number, stamp in enumerate(stamps):
+            session.add(Session(session_id=f"s{number}", title=f"Session {number}", created_at=stamp))
+        session.commit()
+        yield session
+
+
+def _pages(db, limit):
+    pages, cursor = [], None
+    while True:
+        rows = db.execute(paginate(select(Session), Session, cursor, 0, limit)).scalars().all()
+        if not rows:
+            return pages
+        pages.append([row.id for row in rows])
+        cursor = encode_cursor(rows[-1])
+
+
+def test_cursor_pages_cover_every_row_once(db):
+    assert _pages(db, 2) == [[1, 2], [3, 4], [5]]
+
+
+def test_cursor_round_trip(db):
+    row = db.get(Session, 2)
+    position = decode_cursor(encode_cursor(row))
+    assert position["id"] == 2
+    assert position["created_at"].replace(tzinfo=None) == row.created_at.replace(tzinfo=None)
+
+
+def test_cursor_survives_deleted_row(db):
+    cursor = encode_cursor(db.get(Session, 2))
+    db.execute(delete(Session).where(Session.id == 2))
+    db.commit()
+    rows = db.execute(paginate(select(Session), Session, cursor, 0, 10)).scalars().all()
+    assert [row.id for row in rows] == [3, 4, 5]
+
+
+def test_offset_is_used_without_cursor(db):
+    rows = db.execute(paginate(select(Session), Session, None, 3, 10)).scalars().all()
+    assert [row.id for row in rows] == [4, 5]
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", "eyJpZCI6ICJ4IiwgImNyZWF0ZWRfYXQiOiBudWxsfQ"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor)
+    assert excinfo.value.status_code == 400
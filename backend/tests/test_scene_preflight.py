@@ -0,0 +1,84 @@
+import textwrap
+
+from app.core.config import settings
+from app.services.scene_preflight import estimate_duration, extract_construct_body, preflight_scene, strip_code_fences
+
+
+def _scene(body, header="from manim import *\n"):
+    return header + "\nclass WhiteboardAnimation(Scene):\n    def construct(self):\n" + textwrap.indent(
+        textwrap.dedent(body), " " * 8
+    )
+
+
+def _problems(code):
+    return preflight_scene(code)["problems"]
+
+
+def test_strip_code_fences():
+    assert strip_code_fences("Here you go:\n```python\nx = 1\n```\nDone") == "x = 1\n"
+    assert strip_code_fences("x = 1") == "x = 1"
+
+
+def test_extract_construct_body():
+    code = _scene('''\
+        # Title first
+        title = Text("Hi")
+        self.play(Write(title))
+    ''')
+    assert extract_construct_body(f"```python\n{code}```") == '# Title first\ntitle = Text("Hi")\nself.play(Write(title))'
+    assert extract_construct_body("class A:\n    def construct(self): self.wait()\n") == "self.wait()"
+    assert extract_construct_body("def construct(self)\n") is None
+    assert extract_construct_body("x = 1\n") is None
+
+
+def test_valid_scene_has_no_problems():
+    result = preflight_scene(_scene('''\
+        self.play(Create(Circle()), run_time=2)
+        self.wait(3)
+    ''', header="from manim import *\nimport numpy as np\n"))
+    assert result == {"problems": [], "estimated_duration": 5.0}
+
+
+def test_syntax_error():
+    result = preflight_scene(_scene("self.wait(\n"))
+    assert result["estimated_duration"] is None
+    assert result["problems"][0].startswith("SyntaxError on line")
+
+
+def test_disallowed_imports_and_calls():
+    problems = _problems(_scene('''\
+        eval("1")
+        self.wait()
+    ''', header="import os\nfrom subprocess import run\n"))
+    assert "Line 1: import of 'os' is not allowed" in problems
+    assert "Line 2: import of 'subprocess' is not allowed" in problems
+    assert any("call to 'eval' is not allowed" in problem for problem in problems)
+
+
+def test_scene_class_is_required():
+    problem = "The script must define `class WhiteboardAnimation(Scene)` with a `construct(self)` method"
+    assert problem in _problems("from manim import *\n\nclass Other(Scene):\n    def construct(self):\n        self.wait()\n")
+    assert problem in _problems("from manim import *\n\nclass WhiteboardAnimation(Scene):\n    pass\n")
+
+
+def test_duration_counts_loops_and_branches():
+    code = _scene('''\
+        for i in range(10):
+            self.play(FadeIn(Dot()), run_time=0.5)
+            self.wait()
+        if i:
+            self.wait(4)
+        else:
+            self.wait(1)
+    ''')
+    assert estimate_duration(code) == 19.0
+
+
+def test_duration_over_the_limit():
+    code = _scene(f'''\
+        for _ in range(2):
+            self.wait({settings.MAX_ANIMATION_DURATION})
+    ''')
+    result = preflight_scene(code)
+    assert result["estimated_duration"] == 2 * settings.MAX_ANIMATION_DURATION
+    assert any("exceeds the" in problem for problem in result["problems"])
@@ -0,0 +1,71 @@
+import ast
+import textwrap
+
+from app.services.scene_sections import section_count, section_script
+
+SCENE = textwrap.dedent('''\
+    from manim import *
+
+    class WhiteboardAnimation(Scene):
+        def construct(self):
+            title = Text("Hello")
+            self.play(Write(title))
+            self.wait(1)
+            self.play(FadeOut(title))
+            self.wait(2)
+            circle = Circle()
+            self.play(Create(circle))
+            self.wait()
+''')
+
+
+def _markers(script):
+    return [line.strip() for line in script.splitlines() if "self.next_section(" in line]
+
+
+def test_sections_split_after_waits_followed_by_animation():
+    assert section_count(SCENE) == 3
+
+
+def test_only_the_requested_section_is_encoded():
+    script = section_script(SCENE, 1)
+    ast.parse(script)
+    assert _markers(script) == [
+        'self.next_section("section_0", skip_animations=True)',
+        'self.next_section("section_1", skip_animations=False)',
+        'self.next_section("section_2", skip_animations=True)',
+    ]
+    lines = script.splitlines()
+    assert lines.index("        self.wait(1)") + 1 == lines.index('        self.next_section("section_1", skip_animations=False)')
+
+
+def test_next_section_calls_in_the_scene_are_replaced():
+    scene = textwrap.dedent('''\
+        class WhiteboardAnimation(Scene):
+            def construct(self):
+                self.play(Write(Text("A")))
+                self.next_section(
+                    "mine"
+                )
+                self.play(Write(Text("B")))
+                if True:
+                    self.next_section()
+    ''')
+    assert section_count(scene) == 2
+
+    script = section_script(scene, 0)
+    ast.parse(script)
+    assert _markers(script) == [
+        'self.next_section("section_0", skip_animations=False)',
+        'self.next_section("section_1", skip_animations=True)',
+    ]
+    assert '"mine"' not in script
+    assert "            pass" in script.splitlines()
+
+
+def test_unparseable_scenes_are_left_alone():
+    broken = "class WhiteboardAnimation(Scene):\n    def construct(self)\n        self.wait()\n"
+    one_line = "class WhiteboardAnimation(Scene):\n    def construct(self): self.wait()\n"
+    for scene in (broken, one_line):
+        assert section_count(scene) == 1
+        assert section_script(scene, 0) == scene
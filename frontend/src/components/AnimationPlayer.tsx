@@ -1,7 +1,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import styled from 'styled-components';
 import { Play, Pause, Volume2, VolumeX, Maximize, RotateCcw } from 'lucide-react';
-import { Animation, AnimationStatus } from '../types/api';
+import { Animation, AnimationSection, AnimationStatus } from '../types/api';
 import ApiService from '../services/api';
 
 const PlayerContainer = styled.div`
@@ -180,6 +180,12 @@ const AnimationPlayer: React.FC<AnimationPlayerProps> = ({
   const [duration, setDuration] = useState(0);
   const [videoUrl, setVideoUrl] = useState<string>('');
   const [thumbnailUrl, setThumbnailUrl] = useState<string>('');
+  const [sectionPosition, setSectionPosition] = useState(0);
+
+  // Sections rendered so far (progressive mode), playable before the whole animation is done
+  const readySections: AnimationSection[] = (animation.metadata?.sections || [])
+    .filter((section: AnimationSection) => section.status === 'ready');
+  const currentSection = readySections[sectionPosition];
 
   useEffect(() => {
     if (animation.status === AnimationStatus.COMPLETED) {
@@ -244,7 +250,7 @@ const AnimationPlayer: React.FC<AnimationPlayerProps> = ({
       case AnimationStatus.PENDING:
         return 'Animation queued for generation...';
       case AnimationStatus.GENERATING:
-        return 'Generating animation...';
+        return sectionPosition > 0 ? 'Rendering next section...' : 'Generating animation...';
       case AnimationStatus.FAILED:
         return 'Animation generation failed';
       default:
@@ -271,6 +277,14 @@ const AnimationPlayer: React.FC<AnimationPlayerProps> = ({
             autoPlay={autoPlay}
             muted={isMuted}
           />
+        ) : animation.status === AnimationStatus.GENERATING && currentSection ? (
+          <Video
+            key={currentSection.index}
+            src={ApiService.getAnimationSectionUrl(animation.id, currentSection.index)}
+            onEnded={() => setSectionPosition(sectionPosition + 1)}
+            autoPlay
+            muted={isMuted}
+          />
         ) : (
           <>
             {thumbnailUrl && <Thumbnail src={thumbnailUrl} alt="Animation thumbnail" />}
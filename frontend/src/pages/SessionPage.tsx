@@ -235,6 +235,14 @@ const LoadingState = styled.div`
   }
 `;
 
+const upsertById = <T extends { id: number }>(items: T[], item: T): T[] => {
+  const index = items.findIndex((existing) => existing.id === item.id);
+  if (index === -1) {
+    return [...items, item];
+  }
+  return items.map((existing) => (existing.id === item.id ? item : existing));
+};
+
 const SessionPage: React.FC = () => {
   const { sessionId } = useParams<{ sessionId: string }>();
   const navigate = useNavigate();
@@ -246,34 +254,73 @@ const SessionPage: React.FC = () => {
   const [isSubmitting, setIsSubmitting] = useState(false);
 
   useEffect(() => {
-    if (sessionId) {
+    if (!sessionId) return;
+    
+    // Updates are pushed over SSE; poll only while the event stream is unavailable
+    let pollInterval: ReturnType<typeof setInterval> | undefined;
+    const events = new EventSource(ApiService.getSessionEventsUrl(sessionId));
+    
+    const stopPolling = () => {
+      if (pollInterval) {
+        clearInterval(pollInterval);
+        pollInterval = undefined;
+      }
+    };
+    
+    // Sent on every (re)connect and whenever events may have been missed
+    const resync = () => {
+      stopPolling();
       loadSessionData();
-      
-      // Set up polling for updates
-      const interval = setInterval(loadSessionData, 3000);
-      return () => clearInterval(interval);
-    }
+    };
+    events.addEventListener('ready', resync);
+    events.addEventListener('resync', resync);
+    
+    events.addEventListener('explanation', (event) => {
+      const explanation: Explanation = JSON.parse((event as MessageEvent).data);
+      setExplanations((current) => upsertById(current, explanation));
+    });
+    
+    events.addEventListener('explanation.delta', (event) => {
+      const delta: { id: number; offset: number; text: string } = JSON.parse((event as MessageEvent).data);
+      setExplanations((current) => current.map((explanation) => {
+        const text = explanation.explanation_text || '';
+        if (explanation.id !== delta.id || delta.offset > text.length) {
+          return explanation;
+        }
+        return { ...explanation, explanation_text: text + delta.text.slice(text.length - delta.offset) };
+      }));
+    });
+    
+    events.addEventListener('animation', (event) => {
+      const animation: Animation = JSON.parse((event as MessageEvent).data);
+      setAnimations((current) => upsertById(current, animation));
+    });
+    
+    events.onerror = () => {
+      // EventSource keeps reconnecting on its own; poll in the meantime
+      if (!pollInterval) {
+        loadSessionData();
+        pollInterval = setInterval(loadSessionData, 3000);
+      }
+    };
+    
+    return () => {
+      events.close();
+      stopPolling();
+    };
   }, [sessionId]);
 
   const loadSessionData = async () => {
     if (!sessionId) return;
     
     try {
-      const [sessionData, explanationsData] = await Promise.all([
-        ApiService.getSession(sessionId),
-        ApiService.getExplanations(sessionId)
-      ]);
+      const snapshot = await ApiService.getSessionSnapshot(sessionId);
       
-      setSession(sessionData);
-      setExplanations(explanationsData);
-      
-      // Load animations for all explanations
-      const allAnimations: Animation[] = [];
-      for (const explanation of explanationsData) {
-        const explanationAnimations = await ApiService.getAnimations(explanation.id);
-        allAnimations.push(...explanationAnimations);
-      }
-      setAnimations(allAnimations);
+      setSession(snapshot);
+      setExplanations(snapshot.explanations);
+      setAnimations(snapshot.explanations.reduce<Animation[]>(
+        (all, explanation) => all.concat(explanation.animations), []
+      ));
       
     } catch (error) {
       console.error('Failed to load session data:', error);
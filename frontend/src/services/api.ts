@@ -2,10 +2,17 @@ import axios from 'axios';
 import { 
   Session, 
   SessionCreate, 
+  SessionSnapshot,
   Explanation, 
   ExplanationCreate, 
+  AnimatedExplanationCreate,
+  AnimatedExplanation,
+  ExplanationBatchCreate,
+  ExplanationBatch,
+  ExplanationBatchProgress,
   Animation, 
-  AnimationCreate 
+  AnimationCreate,
+  AnimationSection
 } from '../types/api';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || '/api/v1';
@@ -34,16 +41,41 @@ export class ApiService {
     return response.data;
   }
 
+  // Session with nested explanations and animations; the browser revalidates it via ETag
+  static async getSessionSnapshot(sessionId: string): Promise<SessionSnapshot> {
+    const response = await apiClient.get<SessionSnapshot>(`/sessions/${sessionId}/snapshot`);
+    return response.data;
+  }
+
   static async deleteSession(sessionId: string): Promise<void> {
     await apiClient.delete(`/sessions/${sessionId}`);
   }
 
+  static getSessionEventsUrl(sessionId: string): string {
+    return `${API_BASE_URL}/sessions/${sessionId}/events`;
+  }
+
   // Explanation endpoints
   static async createExplanation(data: ExplanationCreate): Promise<Explanation> {
     const response = await apiClient.post<Explanation>('/explanations/', data);
     return response.data;
   }
 
+  static async createAnimatedExplanation(data: AnimatedExplanationCreate): Promise<AnimatedExplanation> {
+    const response = await apiClient.post<AnimatedExplanation>('/explanations/animated', data);
+    return response.data;
+  }
+
+  static async createExplanationBatch(data: ExplanationBatchCreate): Promise<ExplanationBatch> {
+    const response = await apiClient.post<ExplanationBatch>('/explanations/batch', data);
+    return response.data;
+  }
+
+  static async getExplanationBatch(batchId: string): Promise<ExplanationBatchProgress> {
+    const response = await apiClient.get<ExplanationBatchProgress>(`/explanations/batch/${batchId}`);
+    return response.data;
+  }
+
   static async getExplanations(sessionId?: string): Promise<Explanation[]> {
     const params = sessionId ? { session_id: sessionId } : {};
     const response = await apiClient.get<Explanation[]>('/explanations/', { params });
@@ -72,8 +104,18 @@ export class ApiService {
     return response.data;
   }
 
-  static getAnimationFileUrl(animationId: number): string {
-    return `${API_BASE_URL}/animations/${animationId}/file`;
+  static async getAnimationSections(animationId: number): Promise<AnimationSection[]> {
+    const response = await apiClient.get<AnimationSection[]>(`/animations/${animationId}/sections`);
+    return response.data;
+  }
+
+  static getAnimationSectionUrl(animationId: number, index: number): string {
+    return `${API_BASE_URL}/animations/${animationId}/sections/${index}`;
+  }
+
+  static getAnimationFileUrl(animationId: number, quality?: string): string {
+    const query = quality ? `?quality=${encodeURIComponent(quality)}` : '';
+    return `${API_BASE_URL}/animations/${animationId}/file${query}`;
   }
 
   static getAnimationThumbnailUrl(animationId: number): string {
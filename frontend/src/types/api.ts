@@ -8,6 +8,10 @@ export interface Session {
   updated_at?: string;
 }
 
+export interface SessionSnapshot extends Session {
+  explanations: (Explanation & { animations: Animation[] })[];
+}
+
 export interface SessionCreate {
   title: string;
   description?: string;
@@ -39,6 +43,36 @@ export interface ExplanationCreate {
   metadata?: Record<string, any>;
 }
 
+export interface AnimatedExplanationCreate extends ExplanationCreate {
+  animation_type?: AnimationType;
+}
+
+export interface AnimatedExplanation {
+  explanation: Explanation;
+  animation: Animation;
+}
+
+export interface ExplanationBatchCreate {
+  session_id: string;
+  questions: string[];
+  metadata?: Record<string, any>;
+}
+
+export interface ExplanationBatch {
+  batch_id: string;
+  explanation_ids: number[];
+}
+
+export interface ExplanationBatchProgress {
+  batch_id: string;
+  total: number;
+  pending: number;
+  processing: number;
+  completed: number;
+  failed: number;
+  done: boolean;
+}
+
 export enum AnimationStatus {
   PENDING = "pending",
   GENERATING = "generating",
@@ -63,12 +97,20 @@ export interface Animation {
   file_path?: string;
   duration?: number;
   thumbnail_path?: string;
+  hls_playlist_url?: string;
   manim_code?: string;
   metadata?: Record<string, any>;
   created_at: string;
   updated_at?: string;
 }
 
+export interface AnimationSection {
+  index: number;
+  status: 'pending' | 'rendering' | 'ready' | 'empty' | 'failed';
+  duration?: number;
+  url?: string;
+}
+
 export interface AnimationCreate {
   explanation_id: number;
   title: string;